@@ -110,6 +110,22 @@ def regression_sphinx_py39(session, sphinx):
     _regression(session, sphinx=sphinx, ignore_deprecation_warnings=True)
 
 
+@nox_poetry.session
+def benchmark(session):
+    _install(session)
+    # timings differ between machines, so these are only compared against a
+    # baseline recorded locally
+    options = ['--baseline', 'benchmarks/baseline.json']
+    timings = 'benchmarks/timings.json'
+    if os.path.exists(timings):
+        options += ['--baseline', timings]
+    else:
+        session.log(f'No {timings}; copy the results file to it to record'
+                    ' a baseline for the timings')
+    session.run('rinoh-bench', '--output', 'benchmarks/results.json',
+                *options, *session.posargs)
+
+
 # utility functions
 
 def _install(session, docutils=None, sphinx=None, dist='wheel',
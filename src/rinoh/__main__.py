@@ -20,6 +20,7 @@ from rinoh import __version__, __release_date__
 
 from rinoh.attribute import Source
 from rinoh.color import BLACK
+from rinoh.counters import COUNTERS
 from rinoh.dimension import PT, PERCENT
 from rinoh.document import DocumentTree
 from rinoh.draw import Stroke
@@ -28,8 +29,10 @@ from rinoh.font import Typeface, FontSlant, FontWeight, FontWidth
 from rinoh.font.google import installed_google_fonts_typefaces
 from rinoh.paper import Paper, PAPER_BY_NAME
 from rinoh.paragraph import ParagraphStyle, Paragraph, TabStop
+from rinoh.profiling import create_profiler
 from rinoh.resource import find_entry_points, ResourceNotFound
-from rinoh.style import StyleSheet, StyleSheetFile
+from rinoh.server import DEFAULT_ADDRESS as DEFAULT_SERVER_ADDRESS, serve
+from rinoh.style import StyleSheet, StyleSheetFile, StyleLogMode
 from rinoh.template import DocumentTemplate, TemplateConfigurationFile
 from rinoh.templates import Article
 
@@ -41,6 +44,21 @@ DOCS_URL = 'http://www.mos6581.org/rinohtype/'
 DEFAULT = ' (default: %(default)s)'
 
 
+def page_range(string):
+    """Parse a page range ('FIRST', 'FIRST-' or 'FIRST-LAST') into a tuple"""
+    first, dash, last = string.partition('-')
+    try:
+        first = int(first)
+        last = int(last) if last else (None if dash else first)
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid page range '{}'"
+                                         .format(string))
+    if first < 1 or (last is not None and last < first):
+        raise argparse.ArgumentTypeError("invalid page range '{}'"
+                                         .format(string))
+    return first, last
+
+
 parser = argparse.ArgumentParser('rinoh', description=DESCRIPTION)
 parser.add_argument('input', type=str, nargs='?',
                     help='the document to render')
@@ -66,6 +84,42 @@ parser.add_argument('-O', '--output', type=str,
 parser.add_argument('-p', '--paper', type=str,
                     help='the paper size to render to '
                          + DEFAULT % dict(default="the template's default"))
+parser.add_argument('--style-log', type=str, choices=StyleLogMode.values,
+                    help='what to write to the style log: nothing (off), the '
+                         'number of elements styled by each style (summary) '
+                         'or the styles matching each element (full); '
+                         'overrides the template configuration')
+parser.add_argument('--pages', type=page_range, metavar='FIRST[-[LAST]]',
+                    help='only lay out the document up to page LAST and '
+                         'write pages FIRST to LAST to a separate PDF file; '
+                         'page numbers and references are taken from a '
+                         'previous complete rendering of the document. Pages '
+                         'are counted from the start of the document, '
+                         'regardless of their page number format')
+parser.add_argument('--draft', action='store_true',
+                    help='render quickly at the expense of output quality: '
+                         'show placeholders for images, compress less, '
+                         'render in a single pass (leaving page references '
+                         'unresolved) and skip the style log, outline and '
+                         'links; overrides the template configuration')
+profile_group = parser.add_mutually_exclusive_group()
+profile_group.add_argument('--profile', action='store_true',
+                           help='record the time spent in each rendering '
+                                'phase and on laying out each type of '
+                                'flowable; writes a JSON report and a '
+                                'speedscope profile next to the output file. '
+                                'Can also be enabled by setting RINOH_PROFILE')
+profile_group.add_argument('--memory-report', action='store_true',
+                           help='trace memory allocations (slow); report the '
+                                'memory allocated in each rendering phase, '
+                                'the peak RSS and the top allocating source '
+                                'files and object types, and write the report '
+                                'next to the output file')
+parser.add_argument('--counters', action='store_true',
+                    help='count style lookups, selector evaluations, layout '
+                         'exceptions and reflows, print a summary and write '
+                         'the counts per page next to the output file. Can '
+                         'also be enabled by setting RINOH_COUNTERS')
 parser.add_argument('-i', '--install-resources', action='store_true',
                     help='automatically install missing resources (fonts, '
                          'templates, style sheets) from PyPI')
@@ -91,6 +145,16 @@ parser.add_argument('--versions', action='store_true',
 parser.add_argument('--docs', action='store_true',
                     help='open the online documentation in the default '
                          'browser')
+parser.add_argument('--serve', metavar='ADDRESS', type=str, nargs='?',
+                    const=DEFAULT_SERVER_ADDRESS,
+                    help='keep running and render the documents submitted to '
+                         'ADDRESS (HOST:PORT or the path to a Unix domain '
+                         'socket); the template, style sheet and paper '
+                         'options serve as defaults for the submitted jobs'
+                         + DEFAULT % dict(default=DEFAULT_SERVER_ADDRESS))
+parser.add_argument('--workers', type=int, default=1,
+                    help='the number of processes rendering submitted '
+                         'documents' + DEFAULT)
 
 
 def get_distribution_name(dist):
@@ -227,6 +291,15 @@ def main():
     if do_exit:
         return
 
+    if args.serve:
+        try:
+            serve(args.serve, args.workers, template=args.template,
+                  stylesheet=args.stylesheet, paper=args.paper)
+        except (ValueError, OSError, ResourceNotFound) as exc:
+            raise SystemExit('Could not start the render server: {}'
+                             .format(exc))
+        return
+
     if args.input is None:
         parser.print_help()
         return
@@ -246,6 +319,10 @@ def main():
                              "out which style sheets are installed."
                              .format(args.stylesheet, parser.prog))
         template_cfg['stylesheet'] = stylesheet
+    if args.style_log:
+        template_cfg['style_log_mode'] = args.style_log
+    if args.draft:
+        template_cfg['draft'] = True
     if args.paper:
         try:
             variables['paper_size'] = Paper.from_string(args.paper.lower())
@@ -304,11 +381,16 @@ def main():
                                                **template_cfg)
     configuration.variables.update(variables)
 
-    document_tree = reader.parse(args.input)
+    if args.counters:
+        COUNTERS.enabled = True
+    profiler = create_profiler(args.profile, memory=args.memory_report)
+    with profiler.phase('parse'):
+        document_tree = reader.parse(args.input)
     while True:
         try:
-            document = template_cls(document_tree, configuration=configuration)
-            success = document.render(output_path)
+            document = template_cls(document_tree, configuration=configuration,
+                                    profiler=profiler)
+            success = document.render(output_path, pages=args.pages)
             if not success:
                 raise SystemExit('Rendering completed with errors')
             break
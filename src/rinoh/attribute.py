@@ -269,9 +269,12 @@ class WithAttributes(WithNamedDescriptors):
 
     @property
     def supported_attributes(cls):
+        seen = set()
         for mro_class in cls.__mro__:
             for name in getattr(mro_class, '_supported_attributes', ()):
-                yield name
+                if name not in seen:
+                    seen.add(name)
+                    yield name
 
 
 class AttributesDictionary(OrderedDict, metaclass=WithAttributes):
@@ -19,8 +19,9 @@ except ImportError:
 from . import cos
 from .reader import PDFReader, PDFPageReader
 from .filter import FlateDecode
+from .xobject import XObjectForm, XObjectImage, DEVICE_GRAY
 from .xobject.jpeg import JPEGReader
-from .xobject.png import PNGReader
+from .xobject.png import PNGReader, PNGHeaderReader
 
 from ...font.type1 import Type1Font
 from ...font.opentype import OpenTypeFont
@@ -28,14 +29,25 @@ from ...number import NumberFormatBase
 
 
 class Document(object):
+    """A PDF document
+
+    In `draft` mode, the page contents and embedded font files are compressed
+    using a lower (faster) compression level and no annotations (links and
+    destinations) are written.
+
+    """
+
     extension = '.pdf'
 
-    def __init__(self, creator,
-                 title=None, author=None, subject=None, keywords=None):
+    def __init__(self, creator, title=None, author=None, subject=None,
+                 keywords=None, draft=False):
         self.cos_document = cos.Document(creator, title, author, subject,
                                          keywords)
+        self.draft = draft
+        self.compression_level = 1 if draft else 6
         self.pages = []
         self.fonts = {}
+        self.named_links = []   # (page annotations, link) pairs
         self._font_number = 0
         self._image_number = 0
 
@@ -62,14 +74,17 @@ class Document(object):
                 font_file = (None if font.core else
                              cos.Type1FontFile(font.font_program.header,
                                                font.font_program.body,
-                                               filter=FlateDecode()))
+                                               filter=self._font_filter()))
                 if font.encoding_scheme == 'AdobeStandardEncoding':
                     symbolic = False
             elif isinstance(font, OpenTypeFont):
+                # also embedded in draft mode; text encoded as glyph IDs
+                # (Identity-H) is unreadable without the font program
                 ff_cls = (cos.OpenTypeFontFile if 'CFF' in font
                           else cos.TrueTypeFontFile)
                 with open(font.filename, 'rb') as font_data:
-                    font_file = ff_cls(font_data.read(), filter=FlateDecode())
+                    font_file = ff_cls(font_data.read(),
+                                       filter=self._font_filter())
             # TODO: properly determine flags
             font_desc = cos.FontDescriptor(font, symbolic, font_file)
             if isinstance(font, Type1Font):
@@ -88,6 +103,10 @@ class Document(object):
             self.fonts[font] = font_number, font_rsc
         return font_number, font_rsc
 
+    def _font_filter(self):
+        """Filter compressing font files at the (draft) compression level"""
+        return FlateDecode(level=self.compression_level)
+
     def create_outlines(self, sections_tree):
         outlines = self.cos_document.catalog['Outlines'] = cos.Outlines()
         self._create_outline_level(sections_tree, outlines, True)
@@ -114,12 +133,19 @@ class Document(object):
             parent['Last'] = current
         parent['Count'] = cos.Integer(count if top_level else - count)
 
+    def remove_dangling_links(self):
+        """Remove the links to named destinations that were not written,
+        such as those on pages outside of the rendered page range"""
+        dests = self.cos_document.dests
+        for annots, link in self.named_links:
+            if link['Dest'] not in dests:
+                annots.remove(link)
+
     def write(self, file):
+        self.remove_dangling_links()
         page_labels = self.cos_document.catalog['PageLabels']['Nums']
         for index, page in enumerate(self.pages):
-            contents = cos.Stream(filter=FlateDecode())
-            contents.write(page.canvas.getvalue())
-            page.cos_page['Contents'] = contents
+            page.finish()
             rinoh_page = page.rinoh_page
             number_format = (rinoh_page.document_part
                              .get_config_value('page_number_format',
@@ -159,6 +185,26 @@ class Page(object):
         self.canvas = PageCanvas(self)
         self.backend_document.pages.append(self)
 
+    def discard(self):
+        """Leave this page out of the output file"""
+        cos_pages = self.backend_document.cos_document.catalog['Pages']
+        kids = cos_pages['Kids']
+        del kids[next(index for index, kid in enumerate(kids)
+                      if kid is self.cos_page)]
+        cos_pages['Count'] = cos.Integer(cos_pages['Count'] - 1)
+        self.backend_document.pages.remove(self)
+
+    def finish(self):
+        """Compress the page's content stream and release its canvas"""
+        if self.canvas is None:
+            return
+        level = self.backend_document.compression_level
+        contents = cos.Stream(filter=FlateDecode(level=level))
+        contents.write(self.canvas.getvalue())
+        contents.reset()
+        self.cos_page['Contents'] = contents
+        self.canvas = None
+
     def add_font_resource(self, font_name, font_rsc):
         page_rsc = self.cos_page['Resources']
         fonts_dict = page_rsc.setdefault('Font', cos.Dictionary())
@@ -326,6 +372,48 @@ class Canvas(BytesIO):
             self.print('/Im{} Do'.format(image_number))
         return scaled_width, scaled_height
 
+    def to_form(self, bounding_box):
+        """Return the contents of this canvas as a :class:`Form`
+
+        Args:
+            bounding_box (4-tuple of floats): left, bottom, right and top
+                coordinates enclosing all of the contents of this canvas
+
+        """
+        return Form(self, bounding_box)
+
+    def place_form(self, form, document):
+        """Draw the contents of `form` (see :meth:`to_form`) onto this
+        canvas"""
+        form_number = document.backend_document.get_unique_image_number()
+        self.images[form_number] = form
+        self.print('/Im{} Do'.format(form_number))
+        self.annotations.extend(form.annotations)
+
+
+class Form(object):
+    """Canvas contents stored in a Form XObject
+
+    The contents are written to the output file only once, no matter how many
+    times they are placed on a canvas.
+
+    """
+
+    def __init__(self, canvas, bounding_box):
+        self.xobject = XObjectForm(cos.Rectangle(*bounding_box),
+                                   filter=FlateDecode())
+        self.xobject.write(canvas.getvalue())
+        resources = self.xobject['Resources'] = cos.Dictionary()
+        if canvas.fonts:
+            fonts = resources['Font'] = cos.Dictionary()
+            for font_name, font_rsc in canvas.fonts.items():
+                fonts[font_name] = font_rsc
+        if canvas.images:
+            xobjects = resources['XObject'] = cos.Dictionary()
+            for image_number, image in canvas.images.items():
+                xobjects['Im{}'.format(image_number)] = image.xobject
+        self.annotations = list(canvas.annotations)
+
 
 class PageCanvas(Canvas):
     def __init__(self, backend_page):
@@ -345,8 +433,11 @@ class PageCanvas(Canvas):
             xobjects['Im{}'.format(image_number)] = image.xobject
 
         # annotations
+        if self.backend_page.backend_document.draft:
+            return
         page_height = float(self.backend_page.height)
-        cos_document = self.backend_page.backend_document.cos_document
+        backend_document = self.backend_page.backend_document
+        cos_document = backend_document.cos_document
         cos_page = self.backend_page.cos_page
         annots = cos_page.setdefault('Annots', cos.Array())
         for annotation_location in self.annotations:
@@ -371,6 +462,7 @@ class PageCanvas(Canvas):
             elif annotation.type == 'NamedDestinationLink':
                 name = cos.String(annotation.name)
                 annot = cos.LinkAnnotation(rect, destination=name)
+                backend_document.named_links.append((annots, annot))
             else:
                 raise NotImplementedError
             annots.append(annot)
@@ -391,12 +483,14 @@ class AnnotationLocation(object):
 
 
 class Image(object):
+    readers = (PDFPageReader, PNGReader, JPEGReader)
+
     def __init__(self, filename_or_file):
         try:
             file_position = filename_or_file.tell()
         except AttributeError:
             file_position = None
-        for Reader in (PDFPageReader, PNGReader, JPEGReader):
+        for Reader in self.readers:
             try:
                 self.xobject = Reader(filename_or_file)
                 break
@@ -406,8 +500,7 @@ class Image(object):
                 if file_position is not None:
                     filename_or_file.seek(file_position)
         else:
-            png_file = self._convert_to_png(filename_or_file)
-            self.xobject = PNGReader(png_file)
+            self.xobject = self._read_other_format(filename_or_file)
 
     @property
     def width(self):
@@ -421,21 +514,70 @@ class Image(object):
     def dpi(self):
         return self.xobject.dpi
 
-    def _convert_to_png(self, filename_or_file):
+    def _read_other_format(self, filename_or_file):
+        png_file = self._convert_to_png(filename_or_file)
+        return PNGReader(png_file)
+
+    def _open_with_pillow(self, filename_or_file):
         if PILImage is None:
             raise ModuleNotFoundError('The Pillow package is required to '
                                       'handle image formats other than PNG, '
                                       'JPEG and PDF')
-        png_image = BytesIO()
         input_image = PILImage.open(filename_or_file)
-        metadata = {}
-        if 'dpi' in input_image.info and 0 not in input_image.info['dpi']:
-            metadata['dpi'] = input_image.info['dpi']
+        dpi = input_image.info.get('dpi')
+        return input_image, (dpi if dpi and 0 not in dpi else None)
+
+    def _convert_to_png(self, filename_or_file):
+        png_image = BytesIO()
+        input_image, dpi = self._open_with_pillow(filename_or_file)
+        metadata = {'dpi': dpi} if dpi else {}
         input_image.save(png_image, 'PNG', **metadata)
         png_image.seek(0)
         return png_image
 
 
+class ImagePlaceholder(Image):
+    """Stands in for an image in draft mode
+
+    A placeholder has the size of the image it replaces, but only displays a
+    box with its diagonals. Of PNG files and images in formats handled by
+    Pillow, only the header is read; their image data is not decoded.
+
+    """
+
+    readers = (PDFPageReader, PNGHeaderReader, JPEGReader)
+
+    def __init__(self, filename_or_file):
+        super().__init__(filename_or_file)
+        image = self.xobject
+        width, height = float(image.width), float(image.height)
+        self.xobject = XObjectForm(cos.Rectangle(0, 0, width, height),
+                                   filter=FlateDecode(level=1))
+        self.xobject.write('0.9 g 0.5 G 0 0 {0} {1} re B 0 0 m {0} {1} l '
+                           '0 {1} m {0} 0 l S'.format(width, height)
+                           .encode('ascii'))
+        self._size = width, height, image.dpi
+
+    @property
+    def width(self):
+        width, _, _ = self._size
+        return width
+
+    @property
+    def height(self):
+        _, height, _ = self._size
+        return height
+
+    @property
+    def dpi(self):
+        _, _, dpi = self._size
+        return dpi
+
+    def _read_other_format(self, filename_or_file):
+        input_image, dpi = self._open_with_pillow(filename_or_file)
+        return XObjectImage(*input_image.size, DEVICE_GRAY, 8, dpi)
+
+
 CODE_TO_CHAR = {}
 
 
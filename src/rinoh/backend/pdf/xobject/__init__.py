@@ -19,8 +19,8 @@ class XObject(Stream):
 class XObjectForm(XObject):
     subtype = 'Form'
 
-    def __init__(self, bounding_box):
-        super().__init__()
+    def __init__(self, bounding_box, filter=None):
+        super().__init__(filter=filter)
         self['BBox'] = bounding_box
 
 
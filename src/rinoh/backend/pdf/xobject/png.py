@@ -21,18 +21,12 @@ from . import (XObjectImage, DEVICE_GRAY, DEVICE_RGB, INDEXED, PERCEPTUAL,
 from .icc import get_icc_stream, SRGB
 
 
-__all__ = ['PNGReader']
+__all__ = ['PNGReader', 'PNGHeaderReader']
 
 
 class PNGReader(XObjectImage):
     def __init__(self, file_or_filename):
-        png = purepng.Reader(str(file_or_filename)
-                             if isinstance(file_or_filename, Path)
-                             else file_or_filename)
-        try:
-            png.preamble()
-        except purepng.FormatError as format_error:
-            raise ValueError(*format_error.args)
+        png = self._read_preamble(file_or_filename)
         color_params = FlateDecodeParams(predictor=10, colors=png.color_planes,
                                          bits_per_component=png.bitdepth,
                                          columns=png.width)
@@ -88,6 +82,17 @@ class PNGReader(XObjectImage):
                               for _ in range(2))
                     self['Mask'] = Array(Integer(value) for value in values)
 
+    @staticmethod
+    def _read_preamble(file_or_filename):
+        png = purepng.Reader(str(file_or_filename)
+                             if isinstance(file_or_filename, Path)
+                             else file_or_filename)
+        try:
+            png.preamble()
+        except purepng.FormatError as format_error:
+            raise ValueError(*format_error.args)
+        return png
+
     def _dpi(self, png):
         try:
             (x_density, y_density), unit = png.resolution
@@ -191,6 +196,21 @@ class PNGReader(XObjectImage):
         self.reset()
 
 
+class PNGHeaderReader(PNGReader):
+    """Reads only the image size and resolution from a PNG file
+
+    The image data is not read, so this image cannot be embedded in a PDF
+    file. It serves to determine the size of the placeholder for the image in
+    draft mode.
+
+    """
+
+    def __init__(self, file_or_filename):
+        png = self._read_preamble(file_or_filename)
+        XObjectImage.__init__(self, png.width, png.height, DEVICE_GRAY,
+                              png.bitdepth, self._dpi(png))
+
+
 COLOR_SPACE = {0: DEVICE_GRAY,
                2: DEVICE_RGB,
                3: DEVICE_RGB}
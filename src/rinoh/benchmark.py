@@ -0,0 +1,657 @@
+# This file is part of rinohtype, the Python document preparation system.
+#
+# Copyright (c) Brecht Machiels.
+#
+# Use of this source code is subject to the terms of the GNU Affero General
+# Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
+
+"""
+Benchmarking the rendering of synthetic documents:
+
+* :class:`BenchmarkCase`: the size of a synthetic document
+* :func:`generate_document`: builds the document tree for a benchmark case
+* :func:`run_case`: renders a benchmark case, measuring each stage
+* :func:`compare`: checks benchmark results against a stored baseline
+
+The ``rinoh-bench`` command line tool (:func:`main`) runs the benchmark suite
+(:data:`SUITE`), each case in a fresh process.
+
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import struct
+import time
+import zlib
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout, redirect_stderr
+from functools import partial
+from io import StringIO
+from pathlib import Path
+from random import Random
+from tempfile import TemporaryDirectory
+
+from . import __version__
+from .dimension import PERCENT
+from .document import DocumentTree
+from .flowable import StaticGroupedFlowables
+from .highlight import CodeBlock
+from .image import Image, Figure, Caption
+from .index import IndexTerm, InlineIndexTarget
+from .paragraph import Paragraph
+from .profiling import peak_rss
+from .reference import Note, NoteMarkerWithNote, Reference
+from .structure import Heading, Section
+from .table import Table, TableBody, TableRow, TableCell
+from .templates import Book
+from .text import SingleStyledText, MixedStyledText
+
+
+__all__ = ['BenchmarkCase', 'BenchmarkResult', 'SUITE', 'generate_document',
+           'run_case', 'run_suite', 'compare', 'main']
+
+
+class BenchmarkCase(object):
+    """The contents of a synthetic benchmark document
+
+    The numbers of elements are totals for the complete document; they are
+    spread evenly over the document's chapters.
+
+    Args:
+        name (str): identifies the case in the benchmark results
+        chapters (int): the number of chapters (top-level sections)
+        paragraphs (int): the number of body text paragraphs
+        table_rows (int): the number of table rows (in tables of up to
+            :attr:`table_size` rows)
+        images (int): the number of figures, each with its own image file
+        footnotes (int): the number of footnotes
+        listings (int): the number of (syntax-highlighted) code listings
+        index_entries (int): the number of index terms
+        references (int): the number of references to chapter numbers and
+            the pages they start on
+
+    """
+
+    #: the maximum number of rows in a table
+    table_size = 25
+
+    SIZES = ('paragraphs', 'table_rows', 'images', 'footnotes', 'listings',
+             'index_entries', 'references')
+
+    def __init__(self, name, chapters=10, paragraphs=0, table_rows=0,
+                 images=0, footnotes=0, listings=0, index_entries=0,
+                 references=0):
+        self.name = name
+        self.chapters = chapters
+        self.paragraphs = paragraphs
+        self.table_rows = table_rows
+        self.images = images
+        self.footnotes = footnotes
+        self.listings = listings
+        self.index_entries = index_entries
+        self.references = references
+
+    def __repr__(self):
+        return '{}({!r}, {})'.format(type(self).__name__, self.name,
+                                     ', '.join('{}={}'.format(key, value)
+                                               for key, value
+                                               in self.to_dict().items()
+                                               if key != 'name'))
+
+    def scaled(self, factor):
+        """Copy of this case with all element counts multiplied by `factor`
+
+        Each nonzero element count remains at least 1.
+
+        """
+        def scale(count):
+            return max(1, round(count * factor)) if count else 0
+
+        sizes = {key: scale(getattr(self, key)) for key in self.SIZES}
+        return type(self)(self.name, chapters=scale(self.chapters), **sizes)
+
+    def to_dict(self):
+        return dict(name=self.name, chapters=self.chapters,
+                    **{key: getattr(self, key) for key in self.SIZES})
+
+
+#: the benchmark cases run by default; each one stresses another part of the
+#: layout engine, the final one combines all elements
+SUITE = [
+    BenchmarkCase('paragraphs', paragraphs=600),
+    BenchmarkCase('tables', paragraphs=50, table_rows=400),
+    BenchmarkCase('images', paragraphs=100, images=50),
+    BenchmarkCase('footnotes', paragraphs=300, footnotes=200),
+    BenchmarkCase('listings', paragraphs=100, listings=80),
+    BenchmarkCase('index', paragraphs=300, index_entries=600),
+    BenchmarkCase('references', paragraphs=300, references=300),
+    BenchmarkCase('mixed', chapters=20, paragraphs=400, table_rows=100,
+                  images=10, footnotes=50, listings=20, index_entries=100,
+                  references=60),
+]
+
+
+# synthetic document generation
+
+WORDS = ('lorem ipsum dolor sit amet consectetur adipiscing elit sed do '
+         'eiusmod tempor incididunt ut labore et dolore magna aliqua enim ad '
+         'minim veniam quis nostrud exercitation ullamco laboris nisi aliquip '
+         'ex ea commodo consequat duis aute irure in reprehenderit voluptate '
+         'velit esse cillum fugiat nulla pariatur excepteur sint occaecat '
+         'cupidatat non proident sunt culpa qui officia deserunt mollit anim '
+         'id est laborum').split()
+
+LISTING = '''\
+def function_{0}(argument, *args, **kwargs):
+    """Docstring for function number {0}"""
+    result = [item * {0} for item in range(argument) if item % 3]
+    for key, value in sorted(kwargs.items()):
+        result.append('{{}}={{!r}}'.format(key, value))
+    return sum(len(str(item)) for item in result) + len(args)
+'''
+
+
+def spread(total, parts):
+    """Split `total` into `parts` integers that differ by at most one"""
+    if parts == 0:
+        return []
+    quotient, remainder = divmod(total, parts)
+    return [quotient + (1 if index < remainder else 0)
+            for index in range(parts)]
+
+
+def write_png(path, width, height, color):
+    """Write an RGB PNG image of the given size, filled with a gradient
+    based on `color`"""
+    red, green, blue = color
+    rows = b''.join(b'\0' + bytes(value for x in range(width)
+                                  for value in (red, (green + y) % 256,
+                                                (blue + x) % 256))
+                    for y in range(height))
+
+    def chunk(chunk_type, data):
+        return (struct.pack('>I', len(data)) + chunk_type + data
+                + struct.pack('>I', zlib.crc32(chunk_type + data)))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    with open(path, 'wb') as file:
+        file.write(b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+                   + chunk(b'IDAT', zlib.compress(rows))
+                   + chunk(b'IEND', b''))
+
+
+class DocumentGenerator(object):
+    """Builds the synthetic document for a benchmark case
+
+    The generated text is pseudo-random but the same for each run.
+
+    Args:
+        case (BenchmarkCase): the number of elements to generate
+        directory (Path): where to write the image files
+
+    """
+
+    def __init__(self, case, directory):
+        self.case = case
+        self.directory = Path(directory)
+        self.random = Random(0)
+        self.counters = dict.fromkeys(BenchmarkCase.SIZES, 0)
+
+    def words(self, count):
+        return ' '.join(self.random.choice(WORDS) for _ in range(count))
+
+    def next(self, kind):
+        number = self.counters[kind]
+        self.counters[kind] += 1
+        return number
+
+    def paragraph(self, footnote=False, index_entry=False, reference=False):
+        items = [SingleStyledText(self.words(30).capitalize() + ' '),
+                 SingleStyledText(self.words(2), style='emphasis'),
+                 SingleStyledText(' ' + self.words(25))]
+        if index_entry:
+            term = self.words(1) + ' {}'.format(self.next('index_entries'))
+            items.insert(1, InlineIndexTarget([IndexTerm(term)]))
+        if reference:
+            number = self.next('references')
+            target_id = 'chapter-{}'.format(number % self.case.chapters)
+            items += [SingleStyledText(' (see chapter '),
+                      Reference(target_id, type='number'),
+                      SingleStyledText(' on page '),
+                      Reference(target_id, type='page'),
+                      SingleStyledText(')')]
+        if footnote:
+            note = Note(StaticGroupedFlowables([Paragraph(self.words(20))]))
+            items.append(NoteMarkerWithNote(note))
+        items.append(SingleStyledText('.'))
+        return Paragraph(MixedStyledText(items))
+
+    def table(self, rows):
+        table_rows = [TableRow([TableCell([Paragraph(self.words(words))])
+                                for words in (1, 3, 8)])
+                      for _ in range(rows)]
+        return Table(TableBody(table_rows))
+
+    def figure(self):
+        number = self.next('images')
+        path = self.directory / 'image{}.png'.format(number)
+        write_png(path, 64, 48, (number * 37 % 256, number * 11 % 256, 128))
+        return Figure([Image(str(path), width=40*PERCENT),
+                       Caption(self.words(6).capitalize())])
+
+    def listing(self):
+        return CodeBlock(LISTING.format(self.next('listings')),
+                         language='python')
+
+    def chapter(self, index, sizes):
+        paragraphs, table_rows, images, footnotes, listings, index_entries, \
+            references = sizes
+        flowables = [Heading(self.words(3).title())]
+        tables = -(-table_rows // self.case.table_size)    # rounded up
+        others = ([self.figure] * images + [self.listing] * listings
+                  + [partial(self.table, rows)
+                     for rows in spread(table_rows, tables)])
+        paragraph_count = max(paragraphs, footnotes, index_entries,
+                              references)
+        per_paragraph = (len(others) / paragraph_count
+                         if paragraph_count else 0)
+        inserted = 0
+        for number in range(paragraph_count):
+            flowables.append(self.paragraph(footnote=number < footnotes,
+                                            index_entry=number < index_entries,
+                                            reference=number < references))
+            while inserted < len(others) and inserted < number * per_paragraph:
+                flowables.append(others[inserted]())
+                inserted += 1
+        flowables.extend(other() for other in others[inserted:])
+        return Section(flowables, id='chapter-{}'.format(index))
+
+    def document_tree(self):
+        chapters = self.case.chapters
+        per_chapter = zip(*(spread(getattr(self.case, kind), chapters)
+                            for kind in BenchmarkCase.SIZES))
+        return DocumentTree([self.chapter(index, sizes)
+                             for index, sizes in enumerate(per_chapter)])
+
+
+def generate_document(case, directory):
+    """Generate the document tree for `case`
+
+    Args:
+        case (BenchmarkCase): the size of the document
+        directory (Path): where to write the image files
+
+    Returns:
+        DocumentTree: the synthetic document
+
+    """
+    return DocumentGenerator(case, directory).document_tree()
+
+
+# measurement
+
+class StageTimer(object):
+    """Records the duration of and the peak RSS at the end of each stage"""
+
+    def __init__(self):
+        self.stages = {}
+        self._start = time.perf_counter()
+
+    def stage(self, name):
+        """End the current stage, naming it `name`"""
+        now = time.perf_counter()
+        time_spent, _ = self.stages.get(name, (0, None))
+        self.stages[name] = (time_spent + now - self._start, peak_rss())
+        self._start = now
+
+    def to_dict(self):
+        return {name: dict(time=round(time_spent, 4), peak_rss=rss)
+                for name, (time_spent, rss) in self.stages.items()}
+
+
+class BenchmarkResult(object):
+    """The measurements for a single run of a :class:`BenchmarkCase`
+
+    Args:
+        case (BenchmarkCase): the benchmarked document
+        stages (dict): maps the stage names (``generate``, ``prepare``,
+            ``layout`` and ``write``) to their duration (seconds) and the
+            peak RSS (MiB) reached by the end of the stage
+        pages (int): the number of pages in the rendered document
+        passes (int): the number of rendering passes
+        output_size (int): the size of the PDF file (bytes)
+        success (bool): ``False`` if errors were encountered while rendering
+
+    """
+
+    def __init__(self, case, stages, pages, passes, output_size, success):
+        self.case = case
+        self.stages = stages
+        self.pages = pages
+        self.passes = passes
+        self.output_size = output_size
+        self.success = success
+
+    @property
+    def time(self):
+        """The total time spent on all stages (seconds)"""
+        return sum(stage['time'] for stage in self.stages.values())
+
+    @property
+    def pages_per_second(self):
+        """The number of pages rendered per second of layout"""
+        layout_time = self.stages['layout']['time'] / self.passes
+        return self.pages / layout_time if layout_time else None
+
+    @property
+    def peak_rss(self):
+        return max((stage['peak_rss'] for stage in self.stages.values()
+                    if stage['peak_rss'] is not None), default=None)
+
+    def to_dict(self):
+        pages_per_second = self.pages_per_second
+        return dict(case=self.case.to_dict(), success=self.success,
+                    time=round(self.time, 4), pages=self.pages,
+                    passes=self.passes,
+                    pages_per_second=(round(pages_per_second, 2)
+                                      if pages_per_second else None),
+                    peak_rss=self.peak_rss, output_size=self.output_size,
+                    stages=self.stages)
+
+
+def run_case(case, directory):
+    """Generate and render the synthetic document for `case`
+
+    The rendering output is written to `directory`, which should not contain
+    the output of a previous run, since that would reduce the number of
+    rendering passes. The document's progress output and warnings are
+    suppressed.
+
+    Args:
+        case (BenchmarkCase): the document to benchmark
+        directory (Path): the directory for the image and output files
+
+    Returns:
+        BenchmarkResult: the measurements
+
+    """
+    with redirect_stdout(StringIO()), redirect_stderr(StringIO()):
+        return _run_case(case, Path(directory))
+
+
+def _run_case(case, directory):
+    timer = StageTimer()
+    document_tree = generate_document(case, directory)
+    document = Book(document_tree)
+    timer.stage('generate')
+    passes = 0
+    render_pages = document._render_pages
+
+    def timed_render_pages(*args, **kwargs):
+        nonlocal passes
+        timer.stage('prepare' if passes == 0 else 'layout')
+        passes += 1
+        try:
+            return render_pages(*args, **kwargs)
+        finally:
+            timer.stage('layout')
+
+    document._render_pages = timed_render_pages
+    output = directory / case.name
+    success = document.render(output)
+    timer.stage('write')
+    output_size = output.with_suffix('.pdf').stat().st_size
+    return BenchmarkResult(case, timer.to_dict(), document.page_count, passes,
+                           output_size, success)
+
+
+def _run_case_in_directory(case):
+    with TemporaryDirectory() as directory:
+        return run_case(case, directory).to_dict()
+
+
+def run_suite(cases, repeat=1, isolate=True):
+    """Benchmark each of `cases`
+
+    Args:
+        cases (list[BenchmarkCase]): the documents to benchmark
+        repeat (int): the number of times to run each case; the fastest run
+            is reported
+        isolate (bool): run each case in a fresh process, so that the peak
+            RSS measurements are not affected by the other cases
+
+    Returns:
+        dict: the results as they are written to the JSON file
+
+    """
+    results = {}
+    for case in cases:
+        runs = []
+        for _ in range(repeat):
+            if isolate:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context(
+                    'fork' if 'fork' in methods else None)
+                with ProcessPoolExecutor(1, mp_context=context) as executor:
+                    runs.append(executor.submit(_run_case_in_directory,
+                                                case).result())
+            else:
+                runs.append(_run_case_in_directory(case))
+        results[case.name] = min(runs, key=lambda run: run['time'])
+    return dict(rinohtype=__version__, cases=results, **environment())
+
+
+def environment():
+    """Describe the machine and interpreter running the benchmarks"""
+    return dict(python=platform.python_version(),
+                implementation=platform.python_implementation(),
+                platform=platform.platform(), host=platform.node())
+
+
+# comparison against a baseline
+
+#: the metrics compared against the baseline and whether higher values are
+#: better for each of these
+METRICS = {'time': False, 'pages_per_second': True, 'pages': False,
+           'passes': False, 'peak_rss': False, 'output_size': False}
+
+#: the metrics that depend on the machine and interpreter running the
+#: benchmarks, in addition to the stage durations
+MACHINE_METRICS = {'time', 'pages_per_second', 'peak_rss'}
+
+
+def machine_independent(results):
+    """Strip the metrics that depend on the machine and interpreter from
+    `results`, so that these can serve as a baseline on any machine"""
+    cases = {name: {key: value for key, value in result.items()
+                    if key in METRICS and key not in MACHINE_METRICS
+                    or key == 'case'}
+             for name, result in results['cases'].items()}
+    return dict(rinohtype=results['rinohtype'], cases=cases)
+
+
+def recorded_environment(baseline):
+    """Whether `baseline` holds the machine-dependent metrics and the
+    environment these were recorded in (see :func:`machine_independent`)"""
+    return any(key in baseline for key in environment())
+
+
+def environment_differences(results, baseline):
+    """Describe how the environment `results` were recorded in differs from
+    the one the `baseline` was recorded in
+
+    Returns:
+        list[str]: the differing properties of the environment
+
+    """
+    return ['{} {} -> {}'.format(key, baseline.get(key), value)
+            for key, value in environment().items()
+            if results.get(key, value) != baseline.get(key)]
+
+
+def mismatched_cases(results, baseline):
+    """The names of the cases whose documents differ from those of the
+    same name in `baseline`, for example because of a different ``--scale``"""
+    return [name for name, result in results['cases'].items()
+            if name in baseline['cases']
+            and baseline['cases'][name]['case'] != result['case']]
+
+
+def compare(results, baseline, tolerance=0.2, timings=True):
+    """Compare benchmark `results` with those in `baseline`
+
+    Stage durations are compared in addition to the :data:`METRICS`. Cases
+    that are not present in both results or whose documents differ (see
+    :func:`mismatched_cases`) are skipped, as are metrics not recorded in
+    the baseline.
+
+    Args:
+        results (dict): benchmark results as returned by :func:`run_suite`
+        baseline (dict): the stored benchmark results to compare against
+        tolerance (float): the relative deviation from the baseline that is
+            not considered a regression
+        timings (bool): also compare the durations and memory usage; these
+            are only comparable to a baseline recorded on the same machine
+            using the same interpreter (see :func:`environment_differences`)
+
+    Returns:
+        list[str]: a description of each regression
+
+    """
+    regressions = []
+    mismatched = mismatched_cases(results, baseline)
+
+    def check(case_name, metric, value, baseline_value, higher_is_better):
+        if value is None or not baseline_value:
+            return
+        change = (value - baseline_value) / baseline_value
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append('{}: {} {} -> {} ({:+.0%})'
+                               .format(case_name, metric, baseline_value,
+                                       value, change))
+
+    for name, result in results['cases'].items():
+        base = baseline['cases'].get(name)
+        if base is None or name in mismatched:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            if metric in base and (timings or metric not in MACHINE_METRICS):
+                check(name, metric, result[metric], base[metric],
+                      higher_is_better)
+        if not timings:
+            continue
+        for stage, measurements in result['stages'].items():
+            base_stage = base.get('stages', {}).get(stage)
+            if base_stage:
+                check(name, stage + ' time', measurements['time'],
+                      base_stage['time'], False)
+    return regressions
+
+
+# command line interface
+
+DESCRIPTION = ('Benchmark the rendering of synthetic documents and compare '
+               'the results against a baseline.')
+
+parser = argparse.ArgumentParser('rinoh-bench', description=DESCRIPTION)
+parser.add_argument('cases', type=str, nargs='*', metavar='CASE',
+                    help='the benchmark cases to run; all by default')
+parser.add_argument('-s', '--scale', type=float, default=1.0,
+                    help='multiply the size of the benchmark documents by '
+                         'this factor')
+parser.add_argument('-r', '--repeat', type=int, default=1,
+                    help='run each case this many times, reporting the '
+                         'fastest run')
+parser.add_argument('-o', '--output', type=str, metavar='FILENAME',
+                    help='write the results to this JSON file')
+parser.add_argument('-b', '--baseline', type=str, metavar='FILENAME',
+                    action='append', default=[],
+                    help='compare the results with those stored in this '
+                         'JSON file; exit with a nonzero status when a '
+                         'regression is detected. Timings and memory usage '
+                         'are only compared if the baseline was recorded on '
+                         'this machine using the same Python interpreter. '
+                         'Can be given multiple times')
+parser.add_argument('--save-baseline', type=str, metavar='FILENAME',
+                    help='write the results that do not depend on the '
+                         'machine (pages, passes and output size) to this '
+                         'JSON file, for use as a baseline on any machine')
+parser.add_argument('-t', '--tolerance', type=float, default=0.2,
+                    help='the relative deviation from the baseline that is '
+                         'not considered a regression (default: 0.2)')
+parser.add_argument('--list', action='store_true',
+                    help='list the benchmark cases and exit')
+
+
+def main(args=None):
+    args = parser.parse_args(args)
+    cases = {case.name: case for case in SUITE}
+    if args.list:
+        for case in SUITE:
+            print(case)
+        return
+    unknown = [name for name in args.cases if name not in cases]
+    if unknown:
+        parser.error('unknown benchmark case(s): {}'.format(', '.join(unknown)))
+    selected = [cases[name].scaled(args.scale)
+                for name in args.cases or cases]
+    results = {}
+    for case in selected:
+        print('Running {}...'.format(case.name), end=' ', flush=True)
+        case_results = run_suite([case], repeat=args.repeat)
+        result = case_results['cases'][case.name]
+        print('{pages} pages, {passes} passes, {time:.2f} s, '
+              '{pages_per_second} pages/s, {peak_rss} MiB, '
+              '{output_size} bytes'.format(**result))
+        if results:
+            results['cases'].update(case_results['cases'])
+        else:
+            results = case_results
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+            file.write('\n')
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as file:
+            json.dump(machine_independent(results), file, indent=2)
+            file.write('\n')
+    regressions = []
+    for filename in args.baseline:
+        regressions += compare_with_baseline(results, filename,
+                                             args.tolerance)
+    if regressions:
+        raise SystemExit(1)
+
+
+def compare_with_baseline(results, filename, tolerance):
+    """Compare `results` with the baseline stored in `filename`, printing
+    the outcome, and return the regressions"""
+    with open(filename) as file:
+        baseline = json.load(file)
+    timings = recorded_environment(baseline)
+    if timings:
+        differences = environment_differences(results, baseline)
+        if differences:
+            print('Warning: {} was recorded in a different environment ({}); '
+                  'not comparing timings and memory usage. Record a baseline '
+                  'on this machine to compare these.'
+                  .format(filename, ', '.join(differences)))
+            timings = False
+    for name in mismatched_cases(results, baseline):
+        print('Skipping {}: the benchmark document differs from the one in '
+              '{} (was it recorded using the same --scale?)'
+              .format(name, filename))
+    regressions = compare(results, baseline, tolerance, timings=timings)
+    for regression in regressions:
+        print('Regression: {}'.format(regression))
+    if not regressions:
+        print('No regressions with respect to {}'.format(filename))
+    return regressions
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+# This file is part of rinohtype, the Python document preparation system.
+#
+# Copyright (c) Brecht Machiels.
+#
+# Use of this source code is subject to the terms of the GNU Affero General
+# Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
+
+"""
+Counting events on the hot paths of the layout engine:
+
+* :data:`COUNTERS`: the process-wide event counters
+* :class:`CounterReport`: collects the counts per document and per page
+
+Counting is disabled by default. It is enabled by setting the
+``RINOH_COUNTERS`` environment variable to a nonzero value or by passing
+``--counters`` to the ``rinoh`` command line tool. The counted events are:
+
+* style lookups (:meth:`Document.get_style`) and misses of its cache
+* style sheet lookups (:meth:`StyleSheet._get_value_lookup`), including the
+  lookups in the parents' styles
+* style match lookups (:meth:`Document.get_matches`), misses of its cache and
+  the number of selectors evaluated on a miss
+* the exceptions that serve as control flow during layout
+* page reflows and partial rerendering of flowables
+
+"""
+
+import json
+
+from collections import Counter
+from os import getenv
+
+
+__all__ = ['COUNTERS', 'HotPathCounters', 'CounterReport']
+
+
+class HotPathCounters(object):
+    """Event counters
+
+    Code on the hot paths checks :attr:`enabled` before calling
+    :meth:`count`, so that disabled counters cost only an attribute lookup.
+
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.values = Counter()
+
+    def count(self, event):
+        self.values[event] += 1
+
+    def count_exception(self, exception):
+        """Count the raising of `exception` (an instance or class)"""
+        cls = exception if isinstance(exception, type) else type(exception)
+        self.values['exception ' + cls.__name__] += 1
+
+    def snapshot(self):
+        return self.values.copy()
+
+
+#: the counters used by rinohtype's layout engine
+COUNTERS = HotPathCounters(getenv('RINOH_COUNTERS', '0') != '0')
+
+
+class CounterReport(object):
+    """The counter values for a single document rendering
+
+    Args:
+        document (Document): the document being rendered
+
+    """
+
+    #: the number of pages listed in the summary for each of the statistics
+    top_pages = 5
+
+    def __init__(self, document):
+        self.document = document
+        self.pages = []
+        self._start = COUNTERS.snapshot()
+        self.totals = Counter()
+
+    def add_page(self, page, start):
+        """Record the events counted for `page` since `start` (a snapshot)"""
+        counts = COUNTERS.snapshot()
+        counts.subtract(start)
+        self.pages.append((self.document.rendering_passes, page.index,
+                           page.formatted_number, +counts))
+
+    def finish(self):
+        """Determine the document totals"""
+        totals = COUNTERS.snapshot()
+        totals.subtract(self._start)
+        self.totals = +totals
+
+    @staticmethod
+    def _exceptions(counts):
+        return {name[len('exception '):]: count
+                for name, count in counts.most_common()
+                if name.startswith('exception ')}
+
+    @staticmethod
+    def _hit_rate(counts, lookups, misses):
+        total = counts[lookups]
+        return (total - counts[misses]) / total if total else None
+
+    def to_dict(self):
+        def counts_dict(counts):
+            result = {name: count for name, count in sorted(counts.items())
+                      if not name.startswith('exception ')}
+            result['exceptions'] = self._exceptions(counts)
+            return result
+
+        totals = counts_dict(self.totals)
+        totals['style cache hit rate'] = self._hit_rate(
+            self.totals, 'style lookups', 'style cache misses')
+        totals['match cache hit rate'] = self._hit_rate(
+            self.totals, 'match lookups', 'match cache misses')
+        totals['rendering passes'] = self.document.rendering_passes
+        return dict(totals=totals,
+                    pages=[dict(rendering_pass=rendering_pass, index=index,
+                                number=number, **counts_dict(counts))
+                           for rendering_pass, index, number, counts
+                           in self.pages])
+
+    def summary(self):
+        """Describe the totals and the pages with the most events
+
+        Returns:
+            list[str]: the lines of the summary
+
+        """
+        totals = self.totals
+        lines = ['Hot path counters:']
+
+        def percentage(rate):
+            return 'n/a' if rate is None else '{:.1%}'.format(rate)
+
+        style_hits = self._hit_rate(totals, 'style lookups',
+                                    'style cache misses')
+        match_hits = self._hit_rate(totals, 'match lookups',
+                                    'match cache misses')
+        lines.append('  style lookups: {} ({} cache hits), style sheet '
+                     'lookups: {}'.format(totals['style lookups'],
+                                          percentage(style_hits),
+                                          totals['style sheet lookups']))
+        lines.append('  style matching: {} lookups ({} cache hits), {} '
+                     'selectors evaluated'
+                     .format(totals['match lookups'], percentage(match_hits),
+                             totals['selectors evaluated']))
+        exceptions = self._exceptions(totals)
+        lines.append('  exceptions: {}'.format(
+            ', '.join('{} {}'.format(name, count)
+                      for name, count in exceptions.items()) or 'none'))
+        lines.append('  rendering passes: {}, page reflows: {}, flowable '
+                     'rerenders: {}'.format(self.document.rendering_passes,
+                                            totals['reflows'],
+                                            totals['rerenders']))
+
+        last_pass = self.document.rendering_passes
+
+        def top_pages(title, key):     # only those in the final pass
+            pages = sorted(((key(counts), index, number)
+                            for rendering_pass, index, number, counts
+                            in self.pages if rendering_pass == last_pass),
+                           key=lambda item: item[0], reverse=True)
+            pages = [page for page in pages[:self.top_pages] if page[0]]
+            if pages:
+                lines.append('  {}: {}'.format(title, ', '.join(
+                    '{} ({})'.format(number or '#{}'.format(index), count)
+                    for count, index, number in pages)))
+
+        top_pages('pages with the most exceptions',
+                  lambda counts: sum(self._exceptions(counts).values()))
+        top_pages('pages with the most style sheet lookups',
+                  lambda counts: counts['style sheet lookups'])
+        top_pages('pages with the most selectors evaluated',
+                  lambda counts: counts['selectors evaluated'])
+        return lines
+
+    def write(self, filename_root):
+        """Write the per-document and per-page counts to
+        ``<filename_root>.counters.json``
+
+        Returns:
+            Path: the file written
+
+        """
+        path = filename_root.parent / (filename_root.name + '.counters.json')
+        with path.open('w') as file:
+            json.dump(self.to_dict(), file, indent=2)
+        return path
@@ -220,49 +220,122 @@ class Dimension(DimensionBase):
             :class:`Dimension`: this (growed) dimension itself
 
         """
+        _mutated()
         self._value += float(value)
         return self
 
+    def reset(self, value=0):
+        """Set the magnitude of this dimension to `value` (in-place)"""
+        _mutated()
+        self._value = value
+
 
 class DimensionAddition(DimensionBase):
     """The sum of a set of dimensions
 
+    Numeric addends are folded into a single constant on construction; only
+    the dimension addends are kept. Containers grow their cursor by adding
+    and removing addends; this must happen through :meth:`append`,
+    :meth:`pop` and :meth:`truncate` so that cached values are invalidated.
+
     Args:
         addends (`Dimension`\\ s):
 
     """
 
     def __init__(self, *addends):
-        self.addends = list(addends)
+        self._constant = 0.0
+        self.addends = []
+        for addend in addends:
+            if isinstance(addend, (int, float)):
+                self._constant += addend
+            else:
+                self.addends.append(addend)
+        self._evaluated = None
+
+    def append(self, addend):
+        """Add `addend` to this sum (in-place)"""
+        _mutated()
+        self.addends.append(addend)
+
+    def pop(self):
+        """Remove the last added dimension from this sum and return it"""
+        _mutated()
+        return self.addends.pop()
+
+    def truncate(self, length):
+        """Only keep the first `length` dimension addends of this sum"""
+        _mutated()
+        del self.addends[length:]
 
     def __float__(self):
-        return sum(map(float, self.addends or (0.0, )))
+        evaluated = self._evaluated
+        if evaluated and evaluated[0] == _mutations:
+            return evaluated[1]
+        value = self._constant
+        for addend in self.addends:
+            value += float(addend)
+        self._evaluated = _mutations, value
+        return value
 
 
 class DimensionSubtraction(DimensionBase):
     def __init__(self, minuend, subtrahend):
         self.minuend = minuend
         self.subtrahend = subtrahend
+        self._evaluated = None
 
     def __float__(self):
-        return float(self.minuend) - float(self.subtrahend)
+        evaluated = self._evaluated
+        if evaluated and evaluated[0] == _mutations:
+            return evaluated[1]
+        value = float(self.minuend) - float(self.subtrahend)
+        self._evaluated = _mutations, value
+        return value
 
 
 class DimensionMultiplication(DimensionBase):
     def __init__(self, multiplicand, multiplier):
+        if isinstance(multiplicand, DimensionMultiplication):
+            multiplier *= multiplicand.multiplier
+            multiplicand = multiplicand.multiplicand
         self.multiplicand = multiplicand
         self.multiplier = multiplier
+        self._evaluated = None
 
     def __float__(self):
-        return float(self.multiplicand) * self.multiplier
+        evaluated = self._evaluated
+        if evaluated and evaluated[0] == _mutations:
+            return evaluated[1]
+        value = float(self.multiplicand) * self.multiplier
+        self._evaluated = _mutations, value
+        return value
 
 
 class DimensionMaximum(DimensionBase):
     def __init__(self, *dimensions):
         self.dimensions = dimensions
+        self._evaluated = None
 
     def __float__(self):
-        return max(*(float(dimension) for dimension in self.dimensions))
+        evaluated = self._evaluated
+        if evaluated and evaluated[0] == _mutations:
+            return evaluated[1]
+        value = max(*(float(dimension) for dimension in self.dimensions))
+        self._evaluated = _mutations, value
+        return value
+
+
+# Compound dimensions cache their value until a dimension is modified in-place
+# (Dimension.grow/reset, DimensionAddition.append/pop/truncate). Any such
+# modification bumps this counter, invalidating all cached values.
+
+_mutations = 0
+
+
+def _mutated():
+    global _mutations
+    _mutations += 1
 
 
 class DimensionUnitBase(object):
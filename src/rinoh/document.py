@@ -31,21 +31,23 @@ import time
 from collections import OrderedDict, deque
 from contextlib import suppress
 from copy import copy
-from itertools import count
+from itertools import count, islice
 from operator import attrgetter
 from os import getenv
 
 from . import __version__, __release_date__
 from .attribute import OptionSet, Source
 from .backend import pdf
+from .counters import COUNTERS, CounterReport
 from .flowable import StaticGroupedFlowables
 from .language import EN
 from .layout import (Container, ReflowRequired,
                      BACKGROUND, CONTENT, HEADER_FOOTER)
 from .number import NumberFormatBase, format_number
+from .profiling import create_profiler
 from .reference import ReferenceType
 from .strings import Strings
-from .style import Match, StyleLog, ZERO_SPECIFICITY
+from .style import Match, StyleLog, StyleLogMode, ZERO_SPECIFICITY
 from .text import StyledText
 from .util import DEFAULT, WeakMutableKeyDictionary
 from .warnings import warn
@@ -111,9 +113,13 @@ class Page(Container):
         elif orientation == PageOrientation.LANDSCAPE:
             width, height = paper.height, paper.width
         document = self.document_part.document
+        document.page_count += 1
+        self.index = document.page_count    # the 1-based index in the document
         backend_document = document.backend_document
         self.backend_page = document.backend.Page(backend_document,
                                                   width, height, self)
+        if not document.page_in_range(self):
+            self.backend_page.discard()
         self._empty = True
         super().__init__('PAGE', None, 0, 0, width, height)
 
@@ -171,22 +177,35 @@ class Page(Container):
         return prefix + page_number if prefix else page_number
 
     def render(self):
-        super().render(BACKGROUND)
-        try:
-            for index in count():
-                try:
-                    super().render(CONTENT, rerender=index > 0)
-                    break
-                except ReflowRequired:
-                    print('Overflow on page {}, reflowing ({})...'
-                          .format(self.number, index + 1))
-        finally:
-            super().render(HEADER_FOOTER)
+        in_range = self.document.page_in_range(self)
+        counts = COUNTERS.snapshot() if COUNTERS.enabled else None
+        with self.document.profiler.phase('layout'):
+            if in_range:
+                super().render(BACKGROUND)
+            try:
+                for index in count():
+                    try:
+                        super().render(CONTENT, rerender=index > 0)
+                        break
+                    except ReflowRequired:
+                        self.document.register_reflow(self)
+            finally:
+                if in_range:
+                    super().render(HEADER_FOOTER)
+                if counts is not None:
+                    self.document.counter_report.add_page(self, counts)
 
     def place(self):
+        profiler = self.document.profiler
         self.before_placing()
-        self.place_children()
-        self.canvas.place_annotations()
+        self.document.style_log.flush()
+        if self.document.page_in_range(self):
+            with profiler.phase('place'):
+                self.place_children()
+                self.canvas.place_annotations()
+            with profiler.phase('compress'):
+                self.backend_page.finish()
+        self.release()
 
 
 class PartPageCount(object):
@@ -224,6 +243,27 @@ class Metadata(dict, Source):
         return 'document metadata'
 
 
+def styled_parents(styled):
+    """Generate the parents of `styled`, ending with ``None``"""
+    while styled is not None:
+        styled = styled.parent
+        yield styled
+
+
+def outlines_subset(sections, section_ids):
+    """Remove the sections not in `section_ids` from the outline tree
+    `sections`; their subsections take their place"""
+    result = []
+    for section_id, section_number, section_title, subsections in sections:
+        subsections = outlines_subset(subsections, section_ids)
+        if section_id in section_ids:
+            result.append((section_id, section_number, section_title,
+                           subsections))
+        else:
+            result.extend(subsections)
+    return result
+
+
 class Document(object):
     """Renders a document tree to pages
 
@@ -233,6 +273,10 @@ class Document(object):
         language (Language): the language to use for standard strings
         strings (Strings): overrides localized strings provided by `language`
         backend: the backend used for rendering the document
+        style_log_mode (StyleLogMode): what to write to the style log
+        draft (bool): trade output quality for rendering speed; see
+            :attr:`DocumentTemplate.draft`. This implies a single rendering
+            pass without the references cache, and disables the style log.
 
     """
 
@@ -241,12 +285,19 @@ class Document(object):
     CACHE_EXTENSION = '.rtc'
 
     def __init__(self, document_tree, stylesheet, language, strings=None,
-                 backend=None):
-        """`backend` specifies the backend to use for rendering the document."""
+                 backend=None, style_log_mode=StyleLogMode.FULL, draft=False,
+                 profiler=None):
+        """`backend` specifies the backend to use for rendering the document.
+        `profiler` records the time spent in the rendering phases; by default,
+        one is created when the ``RINOH_PROFILE`` environment variable is set
+        (see :func:`create_profiler`)."""
         super().__init__()
         self._print_version_and_license()
-        self._no_cache = getenv('RINOH_NO_CACHE', '0') != '0'
-        self._single_pass = getenv('RINOH_SINGLE_PASS', '0') != '0'
+        self.draft = draft
+        self.profiler = (profiler if profiler is not None
+                         else create_profiler())
+        self._no_cache = draft or getenv('RINOH_NO_CACHE', '0') != '0'
+        self._single_pass = draft or getenv('RINOH_SINGLE_PASS', '0') != '0'
         self.front_matter = []
         self.supporting_matter = {}
         self.document_tree = document_tree
@@ -254,6 +305,7 @@ class Document(object):
         self.language = language
         self._strings = strings or Strings()
         self.backend = backend or pdf
+        self.style_log_mode = StyleLogMode.OFF if draft else style_log_mode
         self._flowables = list(id(element)
                                for element in document_tree.elements)
 
@@ -264,7 +316,15 @@ class Document(object):
         self.references = {}           # mapping id's to reference data
         self.page_elements = {}        # mapping id's to pages
         self.page_references = {}      # mapping id's to page numbers
+        self.page_dependencies = 0     # lookups of page-dependent content
+        self.parent_style_lookups = 0  # style lookups falling back to parents
+        self.page_range = None         # (first, last) page to output
+        self.page_count = 0            # number of pages created in this pass
+        self.rendering_passes = 0      # number of rendering passes started
+        self.counter_report = None     # hot path counts (see rinoh.counters)
+        self.cell_widths = WeakMutableKeyDictionary()   # table cell widths
         self._styled_matches = WeakMutableKeyDictionary()   # cache matching styles
+        self._computed_styles = WeakMutableKeyDictionary()  # cache style values
         self._sections = []
         self.index_entries = {}
         self._glossary = {}
@@ -273,7 +333,13 @@ class Document(object):
         self.title_targets = set()
         self.error = False
 
+    _license_printed = False
+
     def _print_version_and_license(self):
+        """Print the version and license information, once per process"""
+        if Document._license_printed:
+            return
+        Document._license_printed = True
         print('rinohtype {} ({})  Copyright (c) Brecht Machiels and'
               ' contributors'.format(__version__, __release_date__))
         print('''\
@@ -310,6 +376,7 @@ to the terms of the GNU Affero General Public License version 3.''')
 
     def get_reference(self, id, reference_type, default=DEFAULT):
         if reference_type == ReferenceType.PAGE:
+            self.page_dependencies += 1
             return self.page_references.get(id, 'XX')
         try:
             return self.references[id][reference_type]
@@ -318,11 +385,51 @@ to the terms of the GNU Affero General Public License version 3.''')
                 raise
             return default
 
+    def get_style(self, styled, attribute):
+        """Return the value of the style `attribute` for `styled`
+
+        The values are looked up in the style sheet only once per document.
+        They do not depend on the container `styled` is rendered to, so they
+        remain valid across pages and rendering passes. Values inherited from
+        a parent element do depend on the parents `styled` is placed in,
+        however; some elements, such as formatted labels, are placed in
+        different parents. These values are stored along with the parents
+        they were inherited through and are looked up again when `styled`
+        has been moved to a different parent.
+
+        """
+        if COUNTERS.enabled:
+            COUNTERS.count('style lookups')
+        computed_styles = self._computed_styles
+        try:
+            values = computed_styles[styled]
+        except KeyError:
+            values = computed_styles[styled] = {}
+        try:
+            value, parents = values[attribute]
+            if all(parent is cached_parent for parent, cached_parent
+                   in zip(styled_parents(styled), parents)):
+                return value
+        except KeyError:
+            pass
+        if COUNTERS.enabled:
+            COUNTERS.count('style cache misses')
+        parent_style_lookups = self.parent_style_lookups
+        value = styled.get_config_value(attribute, self)
+        num_parents = self.parent_style_lookups - parent_style_lookups
+        parents = tuple(islice(styled_parents(styled), num_parents))
+        values[attribute] = value, parents
+        return value
+
     def get_matches(self, styled):
+        if COUNTERS.enabled:
+            COUNTERS.count('match lookups')
         styled_matches = self._styled_matches
         try:
             return styled_matches[styled]
         except KeyError:
+            if COUNTERS.enabled:
+                COUNTERS.count('match cache misses')
             stylesheet = self.stylesheet
             matches = sorted(stylesheet.find_matches(styled, self),
                              key=attrgetter('specificity'), reverse=True)
@@ -403,14 +510,34 @@ to the terms of the GNU Affero General Public License version 3.''')
     def next_sideways_float(self):
         return self.sideways_floats.popleft() if self.sideways_floats else None
 
-    def render(self, filename_root=None, file=None):
+    def render(self, filename_root=None, file=None, pages=None):
         """Render the document repeatedly until the output no longer changes due
-        to cross-references that need some iterations to converge."""
+        to cross-references that need some iterations to converge.
+
+        If `pages` is given, only that range of pages is written to the output
+        file, whose name then includes the page range. The document is laid
+        out only up to the last page in the range, and only once; the page
+        counts and page references are taken from the cache written by a
+        previous complete rendering to `filename_root`. Pages preceding the
+        range are laid out but not placed.
+
+        Args:
+            filename_root (Path or str): the output filename without extension
+            file (file): the file to write the output to instead
+            pages (tuple): the first and last page to render (1-based indices
+                counting all pages in the document); last can be ``None``
+
+        """
         self.error = False
+        self.page_range = pages
         filename_root = Path(filename_root) if filename_root else None
         if filename_root and file is None:
             ext = self.backend.Document.extension
-            filename = filename_root.parent / (filename_root.name + ext)
+            name = filename_root.name
+            if pages:
+                first, last = pages
+                name += '.pages{}-{}'.format(first, last or '')
+            filename = filename_root.parent / (name + ext)
             file = filename.open('wb')
         elif file and filename_root is None:
             filename = getattr(file, 'name', None)
@@ -420,20 +547,29 @@ to the terms of the GNU Affero General Public License version 3.''')
 
         fake_container = FakeContainer(self)
         prev_page_counts, prev_page_refs = self._load_cache(filename_root)
+        profiler = self.profiler
+        self.counter_report = CounterReport(self) if COUNTERS.enabled else None
         try:
-            self.document_tree.build_document(fake_container)
-            self.prepare(fake_container)
-            for out_of_line_flowables in self.supporting_matter.values():
-                for flowable in out_of_line_flowables:
-                    flowable.prepare(fake_container)
+            with profiler.phase('build_document'):
+                self.document_tree.build_document(fake_container)
+            with profiler.phase('prepare'):
+                self.prepare(fake_container)
+                for out_of_line_flowables in self.supporting_matter.values():
+                    for flowable in out_of_line_flowables:
+                        flowable.prepare(fake_container)
             backend_metadata = self._get_backend_metadata()
             self.page_elements.clear()
             self.part_page_counts = prev_page_counts
             self.page_references = prev_page_refs.copy()
+            self.rendering_passes = 0
             while True:
                 self.backend_document = \
-                    self.backend.Document(self.CREATOR, **backend_metadata)
-                self.part_page_counts = self._render_pages()
+                    self.backend.Document(self.CREATOR, draft=self.draft,
+                                          **backend_metadata)
+                if self.page_range:     # rely on the cached page counts
+                    self._render_pages()
+                    break
+                self.part_page_counts = self._render_pages(filename_root)
                 if (self.part_page_counts == prev_page_counts
                         and self.page_references == prev_page_refs):
                     break
@@ -444,43 +580,109 @@ to the terms of the GNU Affero General Public License version 3.''')
                 prev_page_counts = self.part_page_counts
                 prev_page_refs = self.page_references.copy()
                 del self.backend_document
-            self._create_outlines(self.backend_document)
+            if not self.draft:
+                with profiler.phase('outlines'):
+                    self._create_outlines(self.backend_document)
             if filename:
-                self._save_cache(filename_root)
-                self.style_log.write_log(self.document_tree.source_root,
-                                         filename_root)
+                if not self.page_range:
+                    with profiler.phase('cache and style log'):
+                        self._save_cache(filename_root)
+                        self.style_log.write_log()
                 print('Writing output: {}'.format(filename))
-            self.backend_document.write(file)
+            with profiler.phase('write'):
+                self.backend_document.write(file)
         finally:
             if filename_root:
                 file.close()
+        if filename_root:
+            for path in profiler.write(filename_root):
+                print('Writing profile: {}'.format(path))
+        if self.counter_report:
+            self.counter_report.finish()
+            print('\n'.join(self.counter_report.summary()))
+            if filename_root:
+                path = self.counter_report.write(filename_root)
+                print('Writing counters: {}'.format(path))
         return not self.error
 
-    def _render_pages(self):
+    def _render_pages(self, filename_root=None):
         """Render the complete document once and return the number of pages
         rendered."""
-        self.style_log = StyleLog(self.stylesheet)
+        log_path = (filename_root.parent / (filename_root.name + '.stylelog')
+                    if filename_root else None)
+        self.style_log = StyleLog(self.stylesheet, self.style_log_mode,
+                                  log_path, self.document_tree.source_root)
         self.floats = set()
         self.sideways_floats = deque()
         self.registered_sideways_floats = set()
         self.placed_footnotes = set()
+        self.reflows = {}
+        self.shared_content = {}
+        self.page_count = 0
+        self.rendering_passes += 1
         self._start_time = time.time()
+        with self.profiler.phase('pass {}'.format(self.rendering_passes)):
+            part_page_counts = self._render_parts()
+        sys.stdout.write('\n')     # for the progress indicator
+        if self.reflows:
+            print('Reflowed pages: {}'.format(', '.join(
+                '{} ({}x)'.format(number, count)
+                for number, count in self.reflows.items())))
+        return part_page_counts
 
+    def _render_parts(self):
         part_page_counts = {}
         part_page_count = PartPageCount()
         last_number_format = None
         for part_template in self.part_templates:
+            if self.page_range_rendered():
+                break
             part = part_template.document_part(self, last_number_format)
             if part is None:
                 continue
             if part.get_config_value('page_number_format', self) != 'continue':
                 part_page_count = PartPageCount()
-            part_page_count += part.render(part_page_count.count + 1)
+            with self.profiler.phase('part ' + part_template.name):
+                part_page_count += part.render(part_page_count.count + 1)
             part_page_counts[part_template.name] = part_page_count
             last_number_format = part.page_number_format
-        sys.stdout.write('\n')     # for the progress indicator
         return part_page_counts
 
+    def page_in_range(self, page):
+        """Whether `page` is to be written to the output file"""
+        if self.page_range is None:
+            return True
+        first, last = self.page_range
+        return first <= page.index and (last is None or page.index <= last)
+
+    def page_range_rendered(self):
+        """Whether the last page of the page range has been created"""
+        if self.page_range is None:
+            return False
+        _, last = self.page_range
+        return last is not None and self.page_count >= last
+
+    def register_reflow(self, page, num_flowables=None):
+        """Record that (part of) `page` had to be rendered again
+
+        Args:
+            page (Page): the page that overflowed
+            num_flowables (int): the number of flowables that are rendered
+                again, or ``None`` if the page's complete contents are
+
+        """
+        number = page.formatted_number
+        self.reflows[number] = self.reflows.get(number, 0) + 1
+        if COUNTERS.enabled:
+            COUNTERS.count('reflows' if num_flowables is None
+                           else 'rerenders')
+        if num_flowables is None:
+            print('Overflow on page {}, reflowing ({})...'
+                  .format(number, self.reflows[number]))
+        else:
+            print('Overflow on page {}, rerendering the last {} flowable(s)'
+                  .format(number, num_flowables))
+
     def _create_outlines(self, backend_document):
         """Create an outline in the output file that allows for easy navigation
         of the document. The outline is a hierarchical tree of all the sections
@@ -514,6 +716,10 @@ to the terms of the GNU Affero General Public License version 3.''')
             item = (str(section_id), section_number, section_title, current)
             parent.append(item)
             current_level = section.level
+        if self.page_range:
+            in_range = {str(id) for id, page in self.page_elements.items()
+                        if self.page_in_range(page)}
+            sections = outlines_subset(sections, in_range)
         backend_document.create_outlines(sections)
 
     def _get_backend_metadata(self):
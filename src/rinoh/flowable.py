@@ -218,6 +218,19 @@ class Flowable(Styled):
         as specified in its style's `space_above` attribute. Similarly, the
         flowed content is followed by a vertical space with a height given
         by the `space_below` style attribute."""
+        profiler = container.document.profiler
+        if not profiler.times_flowables:
+            return self._flow(container, last_descender, state=state,
+                              space_below=space_below, **kwargs)
+        profiler.enter_flowable(self)
+        try:
+            return self._flow(container, last_descender, state=state,
+                              space_below=space_below, **kwargs)
+        finally:
+            profiler.exit_flowable(self)
+
+    def _flow(self, container, last_descender, state=None, space_below=0,
+              **kwargs):
         top_to_baseline = 0
         state = state or self.initial_state(container)
         if state.initial:
@@ -448,10 +461,20 @@ class SetOutOfLineFlowables(DummyFlowable):
 # grouping flowables
 
 class GroupedFlowablesState(FlowableState):
+    """The rendering state of a :class:`GroupedFlowables`
+
+    The flowables are stored in a tuple, which is shared between a state and
+    its copies. Only the position in the tuple and the state of the flowable
+    that was interrupted are copied, so copying a state does not depend on the
+    number of grouped flowables.
+
+    """
+
     def __init__(self, groupedflowables, flowables, first_flowable_state=None,
                  _initial=True, _index=0):
         super().__init__(groupedflowables, _initial)
-        self.flowables = list(flowables)
+        self.flowables = (flowables if isinstance(flowables, tuple)
+                          else tuple(flowables))
         self.first_flowable_state = first_flowable_state
         self._index = _index
 
@@ -462,9 +485,8 @@ class GroupedFlowablesState(FlowableState):
         return self._index >= len(self.flowables)
 
     def __copy__(self):
-        copy_flowables = copy(self.flowables)
         copy_first_flowable_state = copy(self.first_flowable_state)
-        return self.__class__(self.groupedflowables, copy_flowables,
+        return self.__class__(self.groupedflowables, self.flowables,
                               copy_first_flowable_state, _initial=self.initial,
                               _index=self._index)
 
@@ -505,6 +527,11 @@ class GroupedFlowables(Flowable):
 
     style_class = GroupedFlowablesStyle
 
+    #: the maximum number of checkpoints retained for rolling back on a
+    #: :class:`ReflowRequired`; older checkpoints are discarded, leaving an
+    #: overflow that can't be resolved by the remaining ones to the parent
+    max_checkpoints = 32
+
     def flowables(self, container):
         """Generator yielding the :class:`Flowable`\\ s to group"""
         raise NotImplementedError
@@ -529,12 +556,26 @@ class GroupedFlowables(Flowable):
         empty_page = container.page._empty
         initial_state = copy(state)
         saved_state = copy(state)
+        checkpoints = []
         try:
             while True:
-                width, top_to_baseline, descender = \
-                    self._flow_with_next(state, container, descender,
-                                         first_line_only=first_line_only,
-                                         **kwargs)
+                checkpoints.append((container.checkpoint(), saved_state,
+                                    descender, max_flowable_width))
+                if len(checkpoints) > self.max_checkpoints:
+                    del checkpoints[1]      # the first one is never rolled back
+                try:
+                    width, top_to_baseline, descender = \
+                        self._flow_with_next(state, container, descender,
+                                             first_line_only=first_line_only,
+                                             **kwargs)
+                except ReflowRequired:
+                    if (same_page and not empty_page
+                            or not self._roll_back(container, checkpoints)):
+                        raise
+                    (_, saved_state, descender,
+                     max_flowable_width) = checkpoints.pop()
+                    state = copy(saved_state)
+                    continue
                 if first_top_to_baseline is None:
                     first_top_to_baseline = top_to_baseline
                 max_flowable_width = max(max_flowable_width, width)
@@ -556,6 +597,33 @@ class GroupedFlowables(Flowable):
             raise exc
         return max_flowable_width, first_top_to_baseline or 0, descender
 
+    def _roll_back(self, container, checkpoints):
+        """Remove the most recently rendered children from `container` until
+        the page no longer overflows
+
+        This handles a :class:`ReflowRequired` locally, so that only the
+        children following the last checkpoint need to be rendered again
+        instead of the complete page. `checkpoints` lists the (container
+        checkpoint, state, descender, width) tuples recorded before rendering
+        each of the children. The checkpoints following the one rolled back to
+        are removed from this list. The first checkpoint is left to the parent
+        flowable to handle.
+
+        Returns:
+            bool: whether the overflow was resolved
+
+        """
+        page = container.page
+        for index in range(len(checkpoints) - 1, 0, -1):
+            container_checkpoint, *_ = checkpoints[index]
+            container.roll_back(container_checkpoint)
+            if page.check_overflow():
+                container.document.register_reflow(page, len(checkpoints)
+                                                         - index)
+                del checkpoints[index + 1:]
+                return True
+        return False
+
     def _flow_with_next(self, state, container, descender, space_below=0,
                         **kwargs):
         try:
@@ -882,11 +950,12 @@ class Float(Flowable):
                 state = CompletedFlowableState()
                 self.page_break(container, state)
                 return 0, 0, last_descender
-        elif (float == FloatLocation.HERE and id not in document.floats):
-            super().flow(container.float_space, None)
-            document.floats.add(id)
-            if not container.page.check_overflow():
-                raise ReflowRequired
+        elif float == FloatLocation.HERE:
+            if id not in document.floats:   # else already in a float space
+                super().flow(container.float_space, None)
+                document.floats.add(id)
+                if not container.page.check_overflow():
+                    raise ReflowRequired
             return 0, 0, last_descender
         return super().flow(container, last_descender, state=state, **kwargs)
 
@@ -6,15 +6,17 @@
 # Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
 
 
-from ..xml.elementtree import Parser
-from ..xml import (ElementTreeNode, ElementTreeInlineNode, ElementTreeBodyNode,
-                   ElementTreeBodySubNode, ElementTreeGroupingNode,
+from ...attribute import Attribute, Bool
+from .. import Reader
+from ..xml import (create_parser, ElementTreeNode, ElementTreeInlineNode,
+                   ElementTreeBodyNode, ElementTreeBodySubNode,
+                   ElementTreeGroupingNode, ElementTreeMixedContentNode,
                    ElementTreeDummyNode, ElementTreeNodeMeta)
 
 
 __all__ = ['DocBookNode', 'DocBookInlineNode', 'DocBookBodyNode',
-           'DocBookBodySubNode', 'DocBookGroupingNode', 'DocBookDummyNode',
-           'DocBookReader']
+           'DocBookBodySubNode', 'DocBookGroupingNode',
+           'DocBookMixedContentNode', 'DocBookDummyNode', 'DocBookReader']
 
 
 class DocBookNode(ElementTreeNode, metaclass=ElementTreeNodeMeta):
@@ -37,6 +39,10 @@ class DocBookGroupingNode(DocBookNode, ElementTreeGroupingNode):
     pass
 
 
+class DocBookMixedContentNode(DocBookNode, ElementTreeMixedContentNode):
+    pass
+
+
 class DocBookDummyNode(DocBookNode, ElementTreeDummyNode):
     pass
 
@@ -44,18 +50,38 @@ class DocBookDummyNode(DocBookNode, ElementTreeDummyNode):
 from . import nodes
 
 
-class DocBookReader(object):
+class DocBookReader(Reader):
+    extensions = ('xml', )
     rngschema = None
     namespace = DocBookNode.NAMESPACE
 
+    streaming = Attribute(Bool, False, 'Convert each top-level element to '
+                                       'flowables as soon as it has been '
+                                       'parsed and discard its XML subtree '
+                                       'afterwards. This limits the memory '
+                                       'used by the XML tree for very large '
+                                       'documents; the flowables for the '
+                                       'complete document are still kept in '
+                                       'memory. No schema validation is '
+                                       'performed.')
+
     def parse(self, file):
-        filename = getattr(file, 'name', None)
-        parser = Parser(DocBookNode, #namespace=self.namespace,
-                        schema=self.rngschema)
-        xml_tree = parser.parse(filename)
-        doctree = xml_tree.getroot()
-        return self.from_doctree(doctree)
-
-    def from_doctree(self, doctree):
-        mapped_tree = DocBookNode.map_node(doctree)
+        if self.streaming:
+            # each rendering pass needs all of the flowables
+            return list(self.iter_flowables(file))
+        parser = create_parser(schema=self.rngschema)
+        document = parser.parse(file)
+        return self.from_doctree(document)
+
+    def iter_flowables(self, file):
+        """Generate the flowables for the top-level elements of `file` while
+        it is being parsed"""
+        parser = create_parser()
+        for document, element in parser.iterparse(file):
+            node = DocBookNode.map_node(element, document=document)
+            yield from list(node.flowables())
+
+    def from_doctree(self, document):
+        mapped_tree = DocBookNode.map_node(document.getroot(),
+                                           document=document)
         return mapped_tree.children_flowables()
@@ -7,9 +7,9 @@
 
 
 from . import (DocBookNode, DocBookInlineNode, DocBookBodyNode,
-               DocBookGroupingNode)
+               DocBookGroupingNode, DocBookMixedContentNode)
 
-from ...reference import TITLE, PAGE
+from ...reference import ReferenceType
 
 from ... import styleds
 
@@ -102,7 +102,7 @@ class VolumeNum(TextInfoField):
     pass
 
 
-class Para(DocBookGroupingNode):
+class Para(DocBookMixedContentNode):
     pass
 
 
@@ -204,6 +204,7 @@ class ListItem(DocBookGroupingNode):
 
 class XRef(DocBookBodyNode):
     def build_flowable(self):
-        section_ref = styleds.Reference(self.get('linkend'), type=TITLE)
-        page_ref = styleds.Reference(self.get('linkend'), type=PAGE)
+        linkend = self.get('linkend')
+        section_ref = styleds.Reference(linkend, type=ReferenceType.TITLE)
+        page_ref = styleds.Reference(linkend, type=ReferenceType.PAGE)
         return styleds.Paragraph(section_ref + ' on page ' + page_ref)
@@ -7,19 +7,25 @@
 
 
 import os
+import posixpath
 import xml.etree.ElementTree as etree
 
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from itertools import repeat
 from zipfile import ZipFile
 
-from ..xml.elementtree import Parser
-from ..xml import (ElementTreeNode, ElementTreeInlineNode, ElementTreeBodyNode,
-                   ElementTreeBodySubNode, ElementTreeGroupingNode,
-                   ElementTreeDummyNode, ElementTreeNodeMeta)
+from ...attribute import Attribute, Integer
+from .. import Reader
+from ..xml import (create_parser, ElementTreeNode, ElementTreeInlineNode,
+                   ElementTreeBodyNode, ElementTreeBodySubNode,
+                   ElementTreeGroupingNode, ElementTreeDummyNode,
+                   ElementTreeNodeMeta)
 
 
 __all__ = ['EPubNode', 'EPubInlineNode', 'EPubBodyNode', 'EPubBodySubNode',
            'EPubGroupingNode', 'EPubDummyNode',
-           'EPubReader', 'BadEPub']
+           'EPubReader', 'EPubImageFile', 'BadEPub']
 
 
 NS_MAP = dict(cnt='urn:oasis:names:tc:opendocument:xmlns:container',
@@ -54,6 +60,49 @@ class EPubDummyNode(EPubNode, ElementTreeDummyNode):
     pass
 
 
+class EPubImageFile(object):
+    """File-like object for an image stored in an ePUB archive
+
+    The image is only decompressed when it is first read, typically when the
+    image is placed on the page.
+
+    Args:
+        archive (str or ZipFile): path to the ePUB file or the opened archive
+        name (str): the image's path within the archive
+
+    """
+
+    def __init__(self, archive, name):
+        self.archive = archive
+        self.name = name
+        self._file = None
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, self.name)
+
+    def __getstate__(self):     # don't pickle the decompressed image
+        return dict(self.__dict__, _file=None)
+
+    def _open(self):
+        if self._file is None:
+            if isinstance(self.archive, ZipFile):
+                data = self.archive.read(self.name)
+            else:
+                with ZipFile(self.archive) as epub:
+                    data = epub.read(self.name)
+            self._file = BytesIO(data)
+        return self._file
+
+    def read(self, *args):
+        return self._open().read(*args)
+
+    def seek(self, *args):
+        return self._open().seek(*args)
+
+    def tell(self):
+        return self._open().tell()
+
+
 from . import nodes
 
 
@@ -62,11 +111,42 @@ class BadEPub(Exception):
         super().__init__('File is not an ePUB file')
 
 
-class EPubReader(object):
+class EPubReader(Reader):
+    extensions = ('epub', )
+
+    workers = Attribute(Integer, 1, 'The number of threads decompressing and '
+                                    'parsing the chapters (spine items) '
+                                    'ahead of mapping them to flowables, in '
+                                    'spine order. 0 selects the number of '
+                                    'CPUs.')
+
     def parse(self, file):
+        epub_path = file if isinstance(file, str) else None
         epub = ZipFile(file)
-        if epub.read('mimetype') != 'application/epub+zip'.encode('ascii'):
-            raise BadEPub
+        try:
+            if epub.read('mimetype') != 'application/epub+zip'.encode('ascii'):
+                raise BadEPub
+            chapters = self.spine(epub)
+        finally:
+            if epub_path:
+                epub.close()
+        # images are only read from the archive when rendering the document
+        archive = epub_path or epub
+        workers = min(self.workers or os.cpu_count() or 1, len(chapters))
+        if epub_path and workers > 1:   # each thread opens the archive
+            with ThreadPoolExecutor(workers) as executor:
+                documents = executor.map(read_chapter, repeat(archive),
+                                         chapters)
+                return [flowable for document in documents
+                        for flowable in self.from_doctree(document, archive)]
+        return [flowable for chapter in chapters
+                for flowable in self.from_doctree(read_chapter(archive,
+                                                               chapter),
+                                                  archive)]
+
+    @staticmethod
+    def spine(epub):
+        """The archive paths of the XHTML documents in the ePUB's spine"""
         with epub.open('META-INF/container.xml') as container_file:
             container = etree.parse(container_file).getroot()
         rootfiles = container.find('./cnt:rootfiles', NS_MAP)
@@ -75,32 +155,41 @@ class EPubReader(object):
                 raise BadEPub
             content_path = rootfile.get('full-path')
             break   # only try the first rootfile
-        content_dir = os.path.dirname(content_path)
-        flowables = []
+        content_dir = posixpath.dirname(content_path)
         with epub.open(content_path) as content_file:
             package = etree.parse(content_file).getroot()
-            metadata = package.find('./opf:metadata', NS_MAP)
-            print(metadata.find('./dc:title', NS_MAP).text)
-            print(metadata.find('./dc:creator', NS_MAP).text)
-            manifest = package.find('./opf:manifest', NS_MAP)
-            items = {item.get('id'): item
-                     for item in manifest.findall('./opf:item', NS_MAP)}
-            spine = package.find('./opf:spine', NS_MAP)
-            for itemref in spine.findall('./opf:itemref', NS_MAP):
-                item = items[itemref.get('idref')]
-                filename = os.path.join(content_dir, item.get('href'))
-                if filename.endswith('pt04.html'):
-                    break
-                print(filename)
-                with epub.open(filename) as xhtml_file:
-                    xhtml_parser = Parser(EPubNode)
-                    xhtml_tree = xhtml_parser.parse(xhtml_file)
-                for flowable in self.from_doctree(xhtml_tree.getroot()):
-                    flowables.append(flowable)
-        return flowables
-
-    def from_doctree(self, xhtml_root):
+        manifest = package.find('./opf:manifest', NS_MAP)
+        items = {item.get('id'): item
+                 for item in manifest.findall('./opf:item', NS_MAP)}
+        spine = package.find('./opf:spine', NS_MAP)
+        return [posixpath.join(content_dir,
+                               items[itemref.get('idref')].get('href'))
+                for itemref in spine.findall('./opf:itemref', NS_MAP)]
+
+    def from_doctree(self, xhtml_document, archive=None):
+        xhtml_root = xhtml_document.getroot()
         xhtml_body = xhtml_root.find('./xhtml:body', NS_MAP)
         #self.replace_secondary_ids(doctree)
-        mapped_tree = EPubNode.map_node(xhtml_body)
+        mapped_tree = EPubNode.map_node(xhtml_body, document=xhtml_document,
+                                        archive=archive)
         return mapped_tree.children_flowables()
+
+
+def read_chapter(archive, filename):
+    """Decompress and parse an XHTML document in an ePUB archive
+
+    Args:
+        archive (str or ZipFile): path to the ePUB file or the opened archive
+        filename (str): the XHTML document's path within the archive
+
+    Returns:
+        XMLDocument: the parsed XHTML document
+
+    """
+    epub = archive if isinstance(archive, ZipFile) else ZipFile(archive)
+    try:
+        with epub.open(filename) as xhtml_file:
+            return create_parser().parse(xhtml_file)
+    finally:
+        if epub is not archive:
+            epub.close()
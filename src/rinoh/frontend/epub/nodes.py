@@ -6,12 +6,13 @@
 # Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
 
 
+import posixpath
 import re
 
 from ... import styleds
 from ...annotation import HyperLink, NamedDestination
 
-from . import EPubInlineNode, EPubBodyNode, EPubGroupingNode
+from . import EPubInlineNode, EPubBodyNode, EPubGroupingNode, EPubImageFile
 
 
 class Body(EPubBodyNode):
@@ -40,11 +41,20 @@ class Img(EPubBodyNode, EPubInlineNode):
     def image_path(self):
         return self.get('src')
 
+    @property
+    def image_file(self):
+        archive = self.context.get('archive')
+        if archive is None:
+            return self.image_path
+        chapter_dir = posixpath.dirname(self.filename)
+        path = posixpath.normpath(posixpath.join(chapter_dir, self.image_path))
+        return EPubImageFile(archive, path)
+
     def build_flowable(self):
-        return styleds.Image(self.image_path)
+        return styleds.Image(self.image_file)
 
     def build_styled_text(self, strip_leading_whitespace=False):
-        return styleds.InlineImage(self.image_path)
+        return styleds.InlineImage(self.image_file)
 
 
 class P(EPubBodyNode):
@@ -175,7 +185,7 @@ class LI(EPubGroupingNode):
 
 class DL(EPubBodyNode):
     def build_flowable(self):
-        items = [(dt.flowable(), dd.flowable())
+        items = [styleds.LabeledFlowable(dt.flowable(), dd.flowable())
                  for dt, dd in zip(self.dt, self.dd)]
         return styleds.DefinitionList(items)
 
@@ -183,8 +193,8 @@ class DL(EPubBodyNode):
 class DT(EPubBodyNode):
     def build_flowable(self):
         term = styleds.Paragraph(self.process_content())
-        return styleds.DefinitionTerm([term])
+        return styleds.StaticGroupedFlowables([term], style='definition term')
 
 
 class DD(EPubGroupingNode):
-    grouped_flowables_class = styleds.Definition
+    style = 'definition'
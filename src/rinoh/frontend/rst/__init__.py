@@ -5,12 +5,21 @@
 # Use of this source code is subject to the terms of the GNU Affero General
 # Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
 
+import hashlib
+import pickle
+import sys
+
+from contextlib import suppress
 from pathlib import Path
 
+import docutils
+
+from appdirs import AppDirs
 from docutils.core import publish_doctree
 from docutils.io import FileInput
 from docutils.parsers.rst import Parser as ReStructuredTextParser
 
+from ...attribute import Attribute, Bool
 from ...text import MixedStyledText
 
 from .. import (TreeNode, TreeNodeMeta, InlineNode, BodyNode, BodySubNode,
@@ -20,7 +29,7 @@ from .. import (TreeNode, TreeNodeMeta, InlineNode, BodyNode, BodySubNode,
 __all__ = ['DocutilsNode', 'DocutilsInlineNode',
            'DocutilsBodyNode', 'DocutilsBodySubNode',
            'DocutilsGroupingNode', 'DocutilsDummyNode',
-           'ReStructuredTextReader', 'from_doctree']
+           'ReStructuredTextReader', 'DoctreeCache', 'from_doctree']
 
 
 class DocutilsNode(TreeNode, metaclass=TreeNodeMeta):
@@ -127,6 +136,12 @@ from . import nodes
 class DocutilsReader(Reader):
     parser_class = None
 
+    doctree_cache = Attribute(Bool, False, 'Store the parsed document tree in '
+                                           'the user cache directory and '
+                                           'reuse it as long as the input '
+                                           'file, the files it includes and '
+                                           'the parser versions are unchanged')
+
     def parse(self, filename_or_file, **context):
         try:
             file, filename = None, Path(filename_or_file)
@@ -134,10 +149,95 @@ class DocutilsReader(Reader):
                           settings_overrides=dict(input_encoding='utf-8'))
         except TypeError:
             file, kwargs = filename_or_file, {}
-        doctree = publish_doctree(file, source_class=FileInput,
-                                  parser=self.parser_class(), **kwargs)
+        if self.doctree_cache and file is None:
+            doctree = self._cached_doctree(filename, kwargs)
+        else:
+            doctree = publish_doctree(file, source_class=FileInput,
+                                      parser=self.parser_class(), **kwargs)
         return from_doctree(doctree, **context)
 
+    def _cached_doctree(self, filename, kwargs):
+        cache = DoctreeCache()
+        key = cache.key(filename, self.parser_class,
+                        kwargs['settings_overrides'])
+        doctree = cache.load(filename, key)
+        if doctree is None:
+            doctree = publish_doctree(None, source_class=FileInput,
+                                      parser=self.parser_class(), **kwargs)
+            cache.store(filename, key, doctree)
+        return doctree
+
+
+class DoctreeCache(object):
+    """On-disk cache of document trees parsed by docutils
+
+    Each input file's pickled document tree is stored along with a key
+    identifying the source file's contents, the parser and its settings, and
+    the digests of the files the source includes (the dependencies recorded
+    by docutils). The cached document tree is only returned if all of these
+    are unchanged.
+
+    Args:
+        directory (Path): where to store the document trees; defaults to the
+            'doctrees' directory in the user's cache directory
+
+    """
+
+    VERSION = 1
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory or self.default_directory())
+
+    @staticmethod
+    def default_directory():
+        return Path(AppDirs("rinohtype", "opqode").user_cache_dir) / 'doctrees'
+
+    def path(self, filename):
+        """The path of the cache file for the input file `filename`"""
+        name = hashlib.sha1(str(Path(filename).resolve()).encode('utf-8'))
+        return self.directory / (name.hexdigest() + '.doctree')
+
+    def key(self, filename, parser_class, settings_overrides):
+        parser_package = parser_class.__module__.split('.')[0]
+        parser_version = getattr(sys.modules[parser_package], '__version__',
+                                 None)
+        return (self.VERSION, sys.version, docutils.__version__,
+                parser_class.__module__, parser_class.__qualname__,
+                parser_version, sorted(settings_overrides.items()),
+                self.digest(filename))
+
+    @staticmethod
+    def digest(filename):
+        try:
+            return hashlib.sha1(Path(filename).read_bytes()).hexdigest()
+        except OSError:
+            return None
+
+    def load(self, filename, key):
+        """Return the cached document tree for `filename` or ``None`` if
+        there is no up-to-date cached version"""
+        try:
+            with self.path(filename).open('rb') as file:
+                cached_key, dependencies, doctree = pickle.load(file)
+        except Exception:       # missing, corrupt or incompatible cache file
+            return None
+        if cached_key != key or any(self.digest(path) != digest
+                                    for path, digest in dependencies):
+            return None
+        return doctree
+
+    def store(self, filename, key, doctree):
+        dependencies = [(str(Path(path).resolve()), self.digest(path))
+                        for path in doctree.settings.record_dependencies.list]
+        path = self.path(filename)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open('wb') as file:
+                pickle.dump((key, dependencies, doctree), file)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            with suppress(OSError):
+                path.unlink()
+
 
 class ReStructuredTextReader(DocutilsReader):
     extensions = ('rst', )
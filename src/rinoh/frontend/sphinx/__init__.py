@@ -6,6 +6,8 @@
 # Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
 
 
+import hashlib
+import json
 import os
 import re
 
@@ -25,9 +27,10 @@ from sphinx.util.console import darkgreen
 from sphinx.util.nodes import inline_all_toctrees
 from sphinx.util.osutil import ensuredir, os_path, SEP
 from sphinx.util import logging
+from sphinx.util.parallel import ParallelTasks
 from sphinx.util.i18n import format_date
 
-from rinoh.attribute import Source
+from rinoh.attribute import Source, RuleSet, RuleSetFile
 from rinoh.flowable import StaticGroupedFlowables
 from rinoh.index import IndexSection, IndexLabel, IndexEntry
 from rinoh.language import Language
@@ -110,6 +113,7 @@ class RinohBuilder(Builder, Source):
     format = 'pdf'
     supported_image_types = ['application/pdf', 'image/png', 'image/jpeg']
     supported_remote_images = False
+    allow_parallel = True       # render rinoh_documents in parallel
 
     @property
     def root(self):
@@ -210,9 +214,11 @@ class RinohBuilder(Builder, Source):
         self.env.resolve_references(largetree, indexfile, self)
         # resolve :ref:s to other PDF files -- we can't add a cross-reference,
         # but append the document name
+        self._referenced_docnames = set()
         for pendingnode in largetree.traverse(addnodes.pending_xref):
             docname = pendingnode['refdocname']
             sectname = pendingnode['refsectname']
+            self._referenced_docnames.add(docname)
             newnodes = [nodes.emphasis(sectname, sectname)]
             for subdir, title in self.titles:
                 if docname.startswith(subdir):
@@ -250,13 +256,53 @@ class RinohBuilder(Builder, Source):
                     yield IndexSection(SingleStyledText(index_section_label),
                                        index_flowables(content))
 
-    def write(self, *ignored):
+    def write(self, build_docnames=None, updated_docnames=None,
+              method='update'):
         variable_removed_warnings(self.config, logger)
         document_data = self.document_data(logger)
+        build_info = BuildInfo(self.outdir)
+        if method != 'all':     # sphinx-build -a renders all documents
+            build_info.load()
+            up_to_date = [entry for entry in document_data
+                          if build_info.is_up_to_date(entry['target'], self)]
+            for entry in up_to_date:
+                logger.info("%s is up to date; not rendering",
+                            entry['target'])
+            document_data = [entry for entry in document_data
+                             if entry not in up_to_date]
+        if getattr(self, 'parallel_ok', False) and len(document_data) > 1:
+            self._write_parallel_documents(document_data, build_info)
+        else:
+            for entry in document_data:
+                build_info.record(entry['target'], self.write_document(entry))
+        build_info.save()
+
+    def _write_parallel_documents(self, document_data, build_info):
+        """Render each of the documents in a forked worker process
+
+        The log messages emitted by each worker are collected and passed on to
+        the main process' logger when the document has been rendered.
+
+        """
+        def done(entry, fingerprint):
+            build_info.record(entry['target'], fingerprint)
+            logger.info("%s written", entry['target'])
+
+        nproc = min(self.app.parallel, len(document_data))
+        logger.info("rendering %d documents using %d processes",
+                    len(document_data), nproc)
+        tasks = ParallelTasks(nproc)
         for entry in document_data:
-            self.write_document(entry)
+            tasks.add_task(self.write_document, entry, done)
+        tasks.join()
 
     def write_document(self, document_data):
+        """Render a document listed in :confval:`rinoh_documents`
+
+        Returns the document's build fingerprint (see :class:`BuildInfo`), or
+        ``None`` if errors were encountered while rendering the document.
+
+        """
         data = copy(document_data)
         target = data.pop('target')
         logger.info("processing %s... ", target, nonl=1)
@@ -264,8 +310,45 @@ class RinohBuilder(Builder, Source):
         outfilename = path.join(self.outdir, os_path(target))
         ensuredir(path.dirname(outfilename))
         logger.info("rendering... ")
-        rinoh_document.render(outfilename)
+        success = rinoh_document.render(outfilename)
         logger.info("done")
+        if success:
+            return self.build_fingerprint(document_data, rinoh_document)
+
+    def build_fingerprint(self, document_data, rinoh_document):
+        """Describe the inputs used to render `rinoh_document`
+
+        These are the source documents included in or referenced from the
+        document, the template configuration and style sheet files, the logo
+        and the configuration values.
+
+        """
+        docnames = self._docnames | self._referenced_docnames
+        files = set(rule_set_files(rinoh_document.configuration))
+        files.update(rule_set_files(rinoh_document.stylesheet))
+        logo = rinoh_document.metadata.get('logo')
+        if logo:
+            files.add(Path(logo))
+        return dict(rinohtype=rinoh_version,
+                    config=self.config_digest(document_data),
+                    docs={docname: self.env.all_docs.get(docname)
+                          for docname in sorted(docnames)},
+                    files={str(path): file_digest(path)
+                           for path in sorted(files)})
+
+    def config_digest(self, document_data):
+        """Digest of the :confval:`rinoh_documents` entry and the
+        configuration values that affect the rendered document
+
+        Objects that have no stable representation yield a different digest
+        for each build, causing the document to be always rendered.
+
+        """
+        config_values = [(name, self.config[name])
+                         for name in BuildInfo.CONFIG_VALUES
+                         if name in self.config]
+        data = repr((sorted(document_data.items()), config_values))
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()
 
     def construct_rinohtype_document(self, document_data):
         doc = document_data.pop('doc')
@@ -327,6 +410,88 @@ class RinohBuilder(Builder, Source):
                 rinoh_document.metadata[key] = default(self.config)
 
 
+class BuildInfo(dict):
+    """Fingerprints of the rendered documents, stored in the output directory
+
+    A document is up to date when none of the inputs recorded in its
+    fingerprint has changed since it was rendered. Sphinx updates the
+    timestamp of a source document in the environment when the document is
+    read again, which happens when the document or one of its dependencies
+    (such as included files or images) is modified.
+
+    Args:
+        outdir (str): the builder's output directory
+
+    """
+
+    FILENAME = '.rinoh_buildinfo'
+    CONFIG_VALUES = ('project', 'release', 'version', 'author', 'copyright',
+                     'today', 'today_fmt', 'language', 'highlight_language')
+
+    def __init__(self, outdir):
+        super().__init__()
+        self.path = Path(outdir) / self.FILENAME
+
+    def load(self):
+        try:
+            with self.path.open(encoding='utf-8') as file:
+                self.update(json.load(file))
+        except (OSError, ValueError):
+            pass
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open('w', encoding='utf-8') as file:
+            json.dump(self, file, indent=1, sort_keys=True)
+
+    def record(self, target, fingerprint):
+        if fingerprint:
+            self[target] = fingerprint
+        else:
+            self.pop(target, None)
+
+    def is_up_to_date(self, target, builder):
+        """Check whether `target` needs to be rendered again"""
+        try:
+            fingerprint = self[target]
+        except KeyError:
+            return False
+        output_path = Path(builder.outdir) / (os_path(target) + '.pdf')
+        if not output_path.exists():
+            return False
+        entry = next(entry for entry in builder.document_data(logger)
+                     if entry['target'] == target)
+        if (fingerprint['rinohtype'] != rinoh_version
+                or fingerprint['config'] != builder.config_digest(entry)):
+            return False
+        if any(builder.env.all_docs.get(docname) != timestamp
+               for docname, timestamp in fingerprint['docs'].items()):
+            return False
+        return all(file_digest(Path(filename)) == digest
+                   for filename, digest in fingerprint['files'].items())
+
+
+def rule_set_files(rule_set):
+    """Yield the paths of the files `rule_set` and its bases were loaded from,
+    including those of the style sheets set in template configurations"""
+    while isinstance(rule_set, RuleSet):
+        if isinstance(rule_set, RuleSetFile):
+            yield rule_set.filename.resolve()
+        stylesheet = rule_set.get('stylesheet')
+        if isinstance(stylesheet, RuleSet):
+            yield from rule_set_files(stylesheet)
+        rule_set = rule_set.base
+
+
+def file_digest(path):
+    """SHA-1 digest of the contents of the file at `path`, or ``None`` if it
+    does not exist"""
+    try:
+        return hashlib.sha1(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
 METADATA_DEFAULTS = dict(
     title=lambda cfg: '{} documentation'.format(cfg.project),
     subtitle=lambda cfg: '{} {}'.format(_('Release'), cfg.release),
@@ -398,4 +563,5 @@ def setup(app):
     app.add_config_value('rinoh_stylesheet', None, 'html')
     app.add_config_value('rinoh_paper_size', None, 'html')
     return dict(version=rinoh_version,
-                parallel_read_safe=True)
+                parallel_read_safe=True,
+                parallel_write_safe=True)
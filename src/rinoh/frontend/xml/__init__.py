@@ -9,6 +9,7 @@
 import os
 import re
 
+from pathlib import Path
 from urllib.parse import urljoin
 from urllib.request import pathname2url
 
@@ -22,7 +23,7 @@ from .. import (TreeNode, InlineNode, BodyNode, BodySubNode, GroupingNode,
                 DummyNode, TreeNodeMeta)
 
 
-__all__ = ['filter', 'strip_and_filter',
+__all__ = ['create_parser', 'filter', 'strip_and_filter',
            'ElementTreeNode', 'ElementTreeInlineNode', 'ElementTreeBodyNode',
            'ElementTreeBodySubNode', 'ElementTreeGroupingNode',
            'ElementTreeMixedContentNode', 'ElementTreeDummyNode',
@@ -37,15 +38,52 @@ CATALOG_NS = "urn:oasis:names:tc:entity:xmlns:xml:catalog"
 RE_WHITESPACE = re.compile('[\t\r\n ]+')
 
 
+def create_parser(namespace=None, schema=None):
+    """Create an XML parser
+
+    Returns the parser based on the C-accelerated :mod:`xml.etree.ElementTree`
+    unless a `schema` is given and lxml is installed, since only the lxml-based
+    parser supports schema validation (and XInclude). Mapping lxml elements to
+    flowables is considerably slower.
+
+    """
+    if schema:
+        try:
+            from .lxml import Parser
+        except ImportError:
+            from .elementtree import Parser
+    else:
+        from .elementtree import Parser
+    return Parser(namespace=namespace, schema=schema)
+
+
+def source_filenames(file_or_filename, root_directory=None):
+    """Return the relative and absolute filename of an XML source
+
+    Args:
+        file_or_filename (str or file): the path or file object
+        root_directory (str): directory the relative filename is relative to
+
+    """
+    filename = (file_or_filename if isinstance(file_or_filename, str)
+                else getattr(file_or_filename, 'name', None))
+    if not filename:
+        return None, None
+    relative_filename = (filename if root_directory is None
+                         else os.path.relpath(filename, root_directory))
+    return relative_filename, os.path.abspath(filename)
+
+
 def ends_with_space(node):
-    while node.getchildren():
-        node = node.getchildren()[-1]
-        if node.tail:
-            text = node.tail
+    element = node.node     # avoid mapping the descendants
+    while len(element):
+        element = element[-1]
+        if element.tail:
+            text = element.tail
             break
     else:
-        text = node.text or ''
-    return text.endswith(' ')
+        text = element.text or ''
+    return text.endswith((' ', '\t', '\r', '\n'))
 
 
 def filter_styled_text_node(node, strip_leading_ws):
@@ -95,29 +133,62 @@ class ElementTreeNode(TreeNode):
     def node_tag_name(cls, node):
         return cls.strip_namespace(node.tag)
 
-    @staticmethod
-    def node_parent(node):
-        return node._parent
+    @classmethod
+    def map_node(cls, node, **context):
+        try:
+            node_cls = cls._tag_mapping[node.tag]
+        except KeyError:
+            node_cls = cls._tag_mapping[node.tag] = cls._node_class(node,
+                                                                    context)
+        return node_cls(node, **context)
+
+    @classmethod
+    def _node_class(cls, node, context):
+        node_name = cls.node_tag_name(node)
+        try:
+            return cls._mapping[node_name.replace('-', '_')]
+        except KeyError:
+            document = context.get('document')
+            filename = document.filename if document else None
+            line = document.sourceline(node) if document else None
+            raise NotImplementedError("{}:{} the '{}' node is not yet supported "
+                                      "({})" .format(filename, line, node_name,
+                                                     cls.__module__))
+
+    @property
+    def document(self):
+        """The :class:`XMLDocument` this node is part of"""
+        return self.context['document']
+
+    def node_parent(self, node):
+        return self.document.parent(node)
 
     @staticmethod
     def node_children(node):
-        return node.getchildren()
+        return list(node)
 
     @property
     def location(self):
-        return self.node._root._filename, self.node.sourceline, self.tag_name
+        return (self.filename, self.document.sourceline(self.node),
+                self.tag_name)
 
     @property
     def _id(self):
         return self.get('id')
 
     @property
-    def _location(self):
-        return self.node_location(self.node)
+    def _ids(self):
+        id = self._id
+        return [id] if id else []
 
     @property
     def filename(self):
-        return self.node._root._filename
+        return self.document.filename
+
+    @property
+    def root(self):
+        abs_filename = self.document.abs_filename
+        return Path(abs_filename).parent if abs_filename else None
 
     @property
     def text(self):
@@ -208,3 +279,9 @@ class ElementTreeNodeMeta(TreeNodeMeta):
     root = ElementTreeNode
     bases = (ElementTreeInlineNode, ElementTreeBodyNode, ElementTreeBodySubNode,
              ElementTreeGroupingNode, ElementTreeDummyNode)
+
+    def __new__(metaclass, name, bases, namespace):
+        cls = super().__new__(metaclass, name, bases, namespace)
+        if metaclass.root in bases:
+            cls._tag_mapping = {}   # node classes by (namespaced) element tag
+        return cls
@@ -6,75 +6,139 @@
 # Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
 
 
-import sys
-
-from os import path
 from urllib.parse import urlparse, urljoin
 from urllib.request import urlopen
 from warnings import warn
-
-# this module depends on internals of the Python ElementTree implementation, so
-# we can't use the C accelerated versions (which are the default in Python 3.3+)
-_cached_etree_modules = {}
-for name in list(sys.modules.keys()):
-    if name.startswith('xml.etree') or name == '_elementtree':
-        _cached_etree_modules[name] = sys.modules.pop(name)
-sys.modules['_elementtree'] = None
-
+from weakref import WeakKeyDictionary
 from xml.etree import ElementTree
 from xml.etree.ElementTree import Element, SubElement
+from xml.parsers import expat
 
-for name in list(sys.modules.keys()):
-    if name.startswith('xml.etree'):
-        del sys.modules[name]
-sys.modules.update(_cached_etree_modules)
+from . import CATALOG_PATH, CATALOG_URL, CATALOG_NS, source_filenames
 
-from . import CATALOG_PATH, CATALOG_URL, CATALOG_NS
 
+__all__ = ['Parser', 'XMLDocument', 'ElementTree', 'Element', 'SubElement']
 
-__all__ = ['Parser', 'ElementTree', 'Element', 'SubElement']
 
+CHUNK_SIZE = 64 * 1024
 
-class TreeBuilder(ElementTree.TreeBuilder):
-    def __init__(self, namespace, line_callback, element_factory=None):
-        super().__init__(element_factory)
-        self._namespace = namespace
-        self._line_callback = line_callback
 
-    def start(self, tag, attrs):
-        elem = super().start(tag, attrs)
-        elem.sourceline = self._line_callback()
-        return elem
+class XMLDocument(object):
+    """A parsed XML document
 
-    def end(self, tag):
-        last = super().end(tag)
-        try:
-            last._parent = self._elem[-1]
-            last._root = self._elem[0]
-        except IndexError:
-            last._parent = None
-            last._root = last
-        last._namespace = self._namespace
-        return last
+    The C-accelerated :mod:`xml.etree.ElementTree` elements do not accept
+    additional attributes and do not record their source line. The source
+    line numbers and parent links of the elements are therefore stored in
+    side tables, which are only built when first needed. The line numbers are
+    obtained by a second pass of the (much faster) expat parser over the
+    source; the elements are matched to the expat start-element events by
+    their document order.
+
+    Args:
+        root (Element): the document's root element
+        filename (str): the document's filename, relative to the root
+            directory passed to :meth:`Parser.parse`
+        abs_filename (str): the document's absolute filename
+        source (str or bytes): the path to the source file or its contents,
+            for determining the source line numbers
+
+    """
+
+    def __init__(self, root, filename, abs_filename, source):
+        self.root = root
+        self.filename = filename
+        self.abs_filename = abs_filename
+        self._source = source
+        self._source_lines = None
+        self._parents = None
+
+    def getroot(self):
+        return self.root
+
+    def sourceline(self, element):
+        """The line number in the source file where `element` starts"""
+        return self._get_source_lines().get(element)
+
+    def parent(self, element):
+        """The parent of `element`, or ``None`` for the root element"""
+        return self._get_parents().get(element)
+
+    def release(self, element):
+        """Remove `element` from the tree and discard its contents
+
+        The emptied elements still report their tag and source line, so that
+        the nodes mapped from them can still report their location. For a
+        document produced by :meth:`Parser.iterparse`, the source lines of
+        the released elements are discarded once these are no longer
+        referenced.
+
+        """
+        self._get_source_lines()    # index the lines while the tree is intact
+        parents = self._get_parents()
+        parent = parents.get(element)
+        if parent is not None:
+            parent.remove(element)
+        for elem in list(element.iter()):
+            parents.pop(elem, None)
+            elem.clear()
+
+    def _get_source_lines(self):
+        if self._source_lines is None:
+            lines = source_line_numbers(self._source)
+            self._source_lines = dict(zip(self.root.iter(), lines))
+        return self._source_lines
+
+    def _get_parents(self):
+        if self._parents is None:
+            self._parents = {child: parent for parent in self.root.iter()
+                             for child in parent}
+        return self._parents
+
+
+def source_line_numbers(source):
+    """Return the line numbers of the start tags in the XML `source`, in
+    document order
+
+    Args:
+        source (str or bytes): path to the XML file or the XML data
+
+    """
+    lines = []
+    append = lines.append
+    parser = expat.ParserCreate()
+
+    def start_element(tag, attributes):
+        append(parser.CurrentLineNumber)
+
+    parser.StartElementHandler = start_element
+    if isinstance(source, str):
+        with open(source, 'rb') as file:
+            parser.ParseFile(file)
+    else:
+        parser.Parse(source, True)
+    return lines
+
+
+class Parser(object):
+    """XML parser building a C-accelerated ElementTree
+
+    Args:
+        namespace (str): the document's default namespace (unused)
+        schema (str): not supported; use the lxml-based parser to validate
 
+    """
 
-class Parser(ElementTree.XMLParser):
     def __init__(self, namespace=None, schema=None):
         if schema:
             warn('The ElementTree based XML parser does not support '
                  'validation. Please use the lxml frontend if you require '
                  'validation.')
         self.namespace = '{{{}}}'.format(namespace) if namespace else ''
-        tree_builder = TreeBuilder(self.namespace, self.get_current_line_number)
-        super().__init__(target=tree_builder)
         # uri_rewrite_map = self.create_uri_rewrite_map()
         # self.parser.SetParamEntityParsing(expat.XML_PARAM_ENTITY_PARSING_ALWAYS)
         # self.parser.ExternalEntityRefHandler \
         #     = ExternalEntityRefHandler(self.parser, uri_rewrite_map)
 
-    def get_current_line_number(self):
-        return self.parser.CurrentLineNumber
-
     def create_uri_rewrite_map(self):
         rewrite_map = {}
         catalog = ElementTree.parse(CATALOG_PATH).getroot()
@@ -86,19 +150,141 @@ class Parser(ElementTree.XMLParser):
         return rewrite_map
 
     def parse(self, file_or_filename, root_directory=None):
-        filename = (file_or_filename if isinstance(file_or_filename, str)
-                    else getattr(file_or_filename, 'name', None))
-        element_tree = ElementTree.ElementTree()
-        element_tree.parse(file_or_filename, self)
-        root_node = element_tree.getroot()
-        if filename:
-            relative_filename = (filename if root_directory is None
-                                 else path.relpath(filename, root_directory))
-            root_node._filename = relative_filename
-            root_node._abs_filename = path.abspath(filename)
+        """Parse an XML file
+
+        Args:
+            file_or_filename (str or file): the file to parse
+            root_directory (str): directory `filename` is made relative to
+
+        Returns:
+            XMLDocument: the parsed document
+
+        """
+        parser = ElementTree.XMLParser()
+        if isinstance(file_or_filename, str):
+            source = file_or_filename
+            with open(source, 'rb') as file:
+                for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+                    parser.feed(chunk)
+        else:   # the file might not be seekable; hold on to its contents
+            source = file_or_filename.read()
+            parser.feed(source)
+        root = parser.close()
+        filename, abs_filename = source_filenames(file_or_filename,
+                                                  root_directory)
+        return XMLDocument(root, filename, abs_filename, source)
+
+    def iterparse(self, file_or_filename, root_directory=None):
+        """Parse an XML file incrementally
+
+        Yields each of the root element's children as soon as it has been
+        parsed completely. When the next child is requested, the previous one
+        is released (see :meth:`XMLDocument.release`). This keeps only a
+        single top-level subtree in memory at any time; the elements
+        referenced by the nodes mapped from it are emptied, but kept alive.
+
+        Args:
+            file_or_filename (str or file): the file to parse
+            root_directory (str): directory `filename` is made relative to
+
+        Yields:
+            (XMLDocument, Element): the document and the completed element
+
+        """
+        filename, abs_filename = source_filenames(file_or_filename,
+                                                  root_directory)
+        document = XMLDocument(None, filename, abs_filename, None)
+        # released elements are dropped from the side tables once these are
+        # no longer referenced by the nodes mapped from them
+        document._source_lines = WeakKeyDictionary()
+        document._parents = WeakKeyDictionary()
+        builder = IncrementalTreeBuilder(document)
+        if isinstance(file_or_filename, str):
+            file = open(file_or_filename, 'rb')
         else:
-            root_node._filename = root_node._abs_filename = None
-        return root_node
+            file = file_or_filename
+        try:
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+                for element in builder.feed(chunk):
+                    yield document, element
+                    document.release(element)
+            for element in builder.close():
+                yield document, element
+                document.release(element)
+        finally:
+            if file is not file_or_filename:
+                file.close()
+
+
+class IncrementalTreeBuilder(object):
+    """Builds the tree for an :class:`XMLDocument` from expat parser events
+
+    Records the source line and parent of each element in the document's side
+    tables while parsing, since the tree's top-level subtrees are released
+    before the document has been parsed completely.
+
+    Args:
+        document (XMLDocument): receives the root element and the side tables
+
+    """
+
+    def __init__(self, document):
+        self.document = document
+        self.tree_builder = ElementTree.TreeBuilder()
+        self.stack = []
+        self.completed = []
+        self._names = {}
+        self.parser = expat.ParserCreate(None, '}')
+        self.parser.buffer_text = True
+        self.parser.StartElementHandler = self.start
+        self.parser.EndElementHandler = self.end
+        self.parser.CharacterDataHandler = self.tree_builder.data
+
+    def fixname(self, name):
+        """Convert expat's 'uri}name' to ElementTree's '{uri}name'"""
+        try:
+            return self._names[name]
+        except KeyError:
+            fixed = self._names[name] = '{' + name if '}' in name else name
+            return fixed
+
+    def start(self, tag, attributes):
+        fixname = self.fixname
+        if attributes:
+            attributes = {fixname(key): value
+                          for key, value in attributes.items()}
+        element = self.tree_builder.start(fixname(tag), attributes)
+        stack = self.stack
+        if stack:
+            self.document._parents[element] = stack[-1]
+        else:
+            self.document.root = element
+        self.document._source_lines[element] = self.parser.CurrentLineNumber
+        stack.append(element)
+
+    def end(self, tag):
+        element = self.tree_builder.end(tag)
+        self.stack.pop()
+        if len(self.stack) == 1:
+            self.completed.append(element)
+
+    def feed(self, data, final=False):
+        """Feed `data` to the parser and return the top-level elements that
+        were completed"""
+        try:
+            self.parser.Parse(data, final)
+        except expat.ExpatError as exception:
+            error = ElementTree.ParseError(str(exception))
+            error.code = exception.code
+            error.position = exception.lineno, exception.offset
+            raise error
+        completed, self.completed = self.completed, []
+        return completed
+
+    def close(self):
+        completed = self.feed(b'', final=True)
+        self.tree_builder.close()
+        return completed
 
 
 class ExternalEntityRefHandler(object):
@@ -8,10 +8,12 @@
 
 import os
 
-from lxml import etree, objectify
+from lxml import etree
 
-from ...util import all_subclasses
-from . import CATALOG_URL
+from . import CATALOG_URL, source_filenames
+
+
+__all__ = ['Parser', 'XMLDocument']
 
 
 try:
@@ -20,29 +22,83 @@ except KeyError:
     os.environ['XML_CATALOG_FILES'] = CATALOG_URL
 
 
+class XMLDocument(object):
+    """A parsed XML document
+
+    Offers the same interface as :class:`.elementtree.XMLDocument`. lxml
+    elements track their source line and parent themselves.
+
+    """
+
+    def __init__(self, root, filename, abs_filename):
+        self.root = root
+        self.filename = filename
+        self.abs_filename = abs_filename
+
+    def getroot(self):
+        return self.root
+
+    def sourceline(self, element):
+        return element.sourceline
+
+    def parent(self, element):
+        return element.getparent()
+
+    def release(self, element):
+        parent = element.getparent()
+        if parent is not None:
+            parent.remove(element)
+        for elem in list(element.iter()):
+            elem.clear()
+
+
 class Parser(object):
-    def __init__(self, element_class, namespace=None, schema=None):
-        self.element_class = element_class
-        lookup = etree.ElementNamespaceClassLookup()
-        namespace = lookup.get_namespace(namespace)
-        namespace[None] = self.element_class
-        namespace.update({cls.__name__.lower(): cls
-                          for cls in all_subclasses(self.element_class)})
-        self.parser = objectify.makeparser(remove_comments=True,
-                                           no_network=True)
-        self.parser.set_element_class_lookup(lookup)
-        self.schema = etree.RelaxNG(etree.parse(schema))
-
-    def parse(self, xmlfile):
-        xml = objectify.parse(xmlfile, self.parser)#, base_url=".")
+    """XML parser based on lxml
+
+    Args:
+        namespace (str): the document's default namespace (unused)
+        schema (str): path to a RELAX NG schema to validate the document
+            against
+
+    """
+
+    PARSER_OPTIONS = dict(remove_comments=True, remove_pis=True,
+                          no_network=True)
+
+    def __init__(self, namespace=None, schema=None):
+        self.parser = etree.XMLParser(**self.PARSER_OPTIONS)
+        self.schema = etree.RelaxNG(etree.parse(schema)) if schema else None
+
+    def parse(self, file_or_filename, root_directory=None):
+        xml = etree.parse(file_or_filename, self.parser)
         xml.xinclude()
-        if not self.schema.validate(xml):
+        if self.schema and not self.schema.validate(xml):
             err = self.schema.error_log
             raise Exception("XML file didn't pass schema validation:\n%s" % err)
-        return xml
+        filename, abs_filename = source_filenames(file_or_filename,
+                                                  root_directory)
+        return XMLDocument(xml.getroot(), filename, abs_filename)
+
+    def iterparse(self, file_or_filename, root_directory=None):
+        """Parse an XML file incrementally
 
+        See :meth:`.elementtree.Parser.iterparse`. The document is not
+        validated against the schema and XIncludes are not processed.
 
-class BaseElement(objectify.ObjectifiedElement):
-    @property
-    def filename(self):
-        return self.getroottree().docinfo.URL
+        """
+        filename, abs_filename = source_filenames(file_or_filename,
+                                                  root_directory)
+        document = XMLDocument(None, filename, abs_filename)
+        depth = 0
+        for event, element in etree.iterparse(file_or_filename,
+                                              events=('start', 'end'),
+                                              **self.PARSER_OPTIONS):
+            if event == 'start':
+                if document.root is None:
+                    document.root = element
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:
+                yield document, element
+                document.release(element)
@@ -240,7 +240,7 @@ class ImageBase(Flowable):
     def _absolute_path_or_file(self):
         try:
             file_path = Path(self.filename_or_file)
-        except AttributeError:          # self.filename_or_file is a file
+        except (AttributeError, TypeError):     # filename_or_file is a file
             return self.filename_or_file
         if file_path.is_absolute():
             return file_path
@@ -252,7 +252,10 @@ class ImageBase(Flowable):
     def render(self, container, last_descender, state, **kwargs):
         try:
             filename_or_file = self._absolute_path_or_file()
-            image = container.document.backend.Image(filename_or_file)
+            document = container.document
+            image_cls = (document.backend.ImagePlaceholder if document.draft
+                         else document.backend.Image)
+            image = image_cls(filename_or_file)
         except OSError as err:
             container.document.error = True
             message = "Error opening image file: {}".format(err)
@@ -0,0 +1,423 @@
+# This file is part of rinohtype, the Python document preparation system.
+#
+# Copyright (c) Brecht Machiels.
+#
+# Use of this source code is subject to the terms of the GNU Affero General
+# Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
+
+"""
+Rendering documents described by a job specification:
+
+* :class:`RenderJob`: the input file, template, style sheet and options for
+                      rendering a single document
+* :class:`ResourceCache`: keeps style sheets and template configurations
+                          loaded from file for reuse by later jobs
+* :func:`render_many`: renders a batch of jobs using a pool of processes
+
+These are used by processes that render many documents, such as the render
+server (:mod:`rinoh.server`).
+
+"""
+
+import multiprocessing
+import os
+import time
+import warnings
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout, redirect_stderr, suppress
+from io import StringIO
+from pathlib import Path
+
+from .attribute import Source
+from .paper import Paper
+from .resource import ResourceNotFound, find_entry_points
+from .style import StyleSheet, StyleSheetFile
+from .template import DocumentTemplate, TemplateConfigurationFile
+from .warnings import showwarning
+
+
+__all__ = ['RenderJob', 'JobResult', 'BatchResult', 'ResourceCache',
+           'render_many']
+
+
+class DirectorySource(Source):
+    """Resolves relative paths with respect to `directory`"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    @property
+    def location(self):
+        return str(self.directory)
+
+    @property
+    def root(self):
+        return self.directory
+
+
+class ResourceCache(object):
+    """Style sheets and template configurations loaded from file
+
+    Parsing style sheet and template configuration files takes a significant
+    amount of time compared to rendering a short document. This cache returns
+    the previously loaded object as long as the file's modification time did
+    not change. Note that changes to base style sheets or template
+    configurations loaded from file are not detected.
+
+    Installed style sheets, templates and typefaces are loaded only once per
+    process anyway, as are the fonts and hyphenation dictionaries.
+
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stylesheet(self, name, source):
+        """Return the installed style sheet `name` or load it from file"""
+        path = self._file_path(name, source)
+        if path is None:
+            return StyleSheet.from_string(name, source=source)
+        return self._load(StyleSheetFile, path, source)
+
+    def template_configuration(self, filename, source):
+        """Load a template configuration file"""
+        path = self._file_path(filename, source)
+        if path is None:
+            raise FileNotFoundError(filename)
+        return self._load(TemplateConfigurationFile, path, source)
+
+    def _load(self, cls, path, source):
+        mtime = path.stat().st_mtime_ns
+        key = cls, path
+        try:
+            cached_mtime, obj = self._entries[key]
+            if cached_mtime == mtime:
+                return obj
+        except KeyError:
+            pass
+        obj = cls(str(path), source=source)
+        self._entries[key] = mtime, obj
+        return obj
+
+    @staticmethod
+    def _file_path(filename, source):
+        path = Path(filename)
+        if not path.is_absolute():
+            path = source.root / path
+        return path.resolve() if path.is_file() else None
+
+
+class RenderJob(object):
+    """Describes a document to render
+
+    Relative paths are resolved with respect to `directory`, which defaults to
+    the current working directory.
+
+    Args:
+        input (str): path to the input file
+        output (str): path to write the output to, without extension, or an
+            existing directory; defaults to the input path without extension
+        format (str): name of the frontend for parsing the input file; by
+            default, this is determined from the input file's extension
+        template (str): name of an installed document template or path to a
+            template configuration file
+        stylesheet (str): name of an installed style sheet or path to a style
+            sheet file; overrides the template's default style sheet
+        paper (str): name of the paper size to render to
+        options (dict): options passed to the frontend; values can be strings
+            that are parsed according to the option's type
+        directory (str): directory for resolving relative paths
+
+    """
+
+    def __init__(self, input, output=None, format=None, template='article',
+                 stylesheet=None, paper=None, options=None, directory=None):
+        self.directory = Path(directory or os.getcwd())
+        self.input = self.directory / input
+        self.output = self.directory / output if output else None
+        self.format = format
+        self.template = template
+        self.stylesheet = stylesheet
+        self.paper = paper
+        self.options = options or {}
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, str(self.input))
+
+    @property
+    def output_path(self):
+        """Path to the output file, without the extension"""
+        input_root = self.input.stem
+        if self.output is None:
+            return self.input.parent / input_root
+        if self.output.is_dir():
+            return self.output / input_root
+        return self.output
+
+    def reader(self):
+        """Create the frontend reader for parsing the input file"""
+        reader_cls = self._reader_class()
+        options = {}
+        for key, value in self.options.items():
+            try:
+                attr_def = reader_cls.attribute_definition(key)
+            except KeyError:
+                raise ValueError('The {} frontend does not accept the option '
+                                 '{}'.format(reader_cls.__name__, key))
+            if isinstance(value, str):
+                value = attr_def.accepted_type.from_string(value)
+            options[key] = value
+        return reader_cls(**options)
+
+    def _reader_class(self):
+        if self.format:
+            for entry_point, _ in find_entry_points('rinoh.frontends',
+                                                    self.format):
+                return entry_point.load()
+            raise ValueError("Unknown format '{}'".format(self.format))
+        extension = self.input.suffix[1:]
+        for entry_point, _ in find_entry_points('rinoh.frontends'):
+            reader_cls = entry_point.load()
+            if extension in reader_cls.extensions:
+                return reader_cls
+        (entry_point, _), = find_entry_points('rinoh.frontends',
+                                              'reStructuredText')
+        return entry_point.load()
+
+    def template_configuration(self, cache):
+        """Create the template configuration for this job
+
+        Style sheets and template configuration files are obtained from
+        `cache`.
+
+        """
+        source = DirectorySource(self.directory)
+        template_cfg = {}
+        if self.stylesheet:
+            template_cfg['stylesheet'] = cache.stylesheet(self.stylesheet,
+                                                          source)
+        if (self.directory / self.template).is_file():
+            base = cache.template_configuration(self.template, source)
+            template_cfg['base'] = base
+            template_cls = base.template
+        else:
+            template_cls = DocumentTemplate.from_string(self.template)
+        configuration = template_cls.Configuration('render job options',
+                                                   **template_cfg)
+        if self.paper:
+            paper = Paper.from_string(self.paper.lower())
+            configuration.variables['paper_size'] = paper
+        return configuration
+
+    def render(self, cache=None):
+        """Parse the input file and render the document
+
+        Args:
+            cache (ResourceCache): reuse style sheets and template
+                configurations loaded by earlier jobs
+
+        Returns:
+            JobResult: the outcome of rendering the document
+
+        """
+        cache = cache if cache is not None else ResourceCache()
+        start_time = time.perf_counter()
+        if not self.input.is_file():
+            raise FileNotFoundError('{}: No such file'.format(self.input))
+        configuration = self.template_configuration(cache)
+        document_tree = self.reader().parse(str(self.input))
+        parse_time = time.perf_counter()
+        document = configuration.document(document_tree)
+        output_path = self.output_path
+        success = document.render(output_path)
+        end_time = time.perf_counter()
+        output_file = output_path.parent / (output_path.name
+                                            + document.backend.Document
+                                                      .extension)
+        return JobResult(success, output_file, parse_time - start_time,
+                         end_time - parse_time)
+
+
+class JobResult(object):
+    """The outcome of a :class:`RenderJob`
+
+    Args:
+        success (bool): ``False`` if errors were encountered while rendering
+        output (Path): the rendered output file
+        parse_time (float): time spent parsing the input (seconds)
+        render_time (float): time spent rendering the document (seconds)
+        error (str): describes the exception that aborted the job
+        log (str): the output printed while rendering the document
+
+    """
+
+    def __init__(self, success, output, parse_time, render_time, error=None,
+                 log=None):
+        self.success = success
+        self.output = output
+        self.parse_time = parse_time
+        self.render_time = render_time
+        self.error = error
+        self.log = log
+
+    def __repr__(self):
+        return ('{}({}, {!r})'.format(type(self).__name__, self.success,
+                                      self.error or str(self.output)))
+
+    @classmethod
+    def from_exception(cls, exception, log=None):
+        """Result for a job that was aborted by `exception`"""
+        if isinstance(exception, ResourceNotFound):
+            error = ("{} '{}' not installed"
+                     .format(exception.resource_type.title(),
+                             exception.resource_name))
+        else:
+            error = '{}: {}'.format(type(exception).__name__, exception)
+        return cls(False, None, None, None, error=error, log=log)
+
+    def to_dict(self):
+        result = dict(success=self.success,
+                      output=str(self.output) if self.output else None,
+                      parse_time=self.parse_time, render_time=self.render_time)
+        if self.error:
+            result['error'] = self.error
+        return result
+
+
+class BatchResult(list):
+    """The results for a batch of jobs, in job order
+
+    Args:
+        results (list[JobResult]): the results for each of the jobs
+        wall_time (float): time it took to complete the batch (seconds)
+        workers (int): the number of processes that rendered the jobs
+
+    """
+
+    def __init__(self, results, wall_time, workers):
+        super().__init__(results)
+        self.wall_time = wall_time
+        self.workers = workers
+
+    @property
+    def succeeded(self):
+        return [result for result in self if result.success]
+
+    @property
+    def failed(self):
+        return [result for result in self if not result.success]
+
+    @property
+    def parse_time(self):
+        """Total time spent parsing input files, summed over all jobs"""
+        return sum(result.parse_time or 0 for result in self)
+
+    @property
+    def render_time(self):
+        """Total time spent rendering documents, summed over all jobs"""
+        return sum(result.render_time or 0 for result in self)
+
+    @property
+    def documents_per_minute(self):
+        return 60 * len(self) / self.wall_time if self.wall_time else 0
+
+    def statistics(self):
+        return dict(jobs=len(self), succeeded=len(self.succeeded),
+                    failed=len(self.failed), workers=self.workers,
+                    wall_time=self.wall_time, parse_time=self.parse_time,
+                    render_time=self.render_time,
+                    documents_per_minute=self.documents_per_minute)
+
+
+# the resource cache used by render_many's worker processes
+_worker_cache = None
+
+
+def _initialize_worker(cache):
+    global _worker_cache
+    _worker_cache = cache
+
+
+def _render_job(job):
+    log = StringIO()
+    try:
+        with redirect_stdout(log), redirect_stderr(log), \
+                warnings.catch_warnings():
+            warnings.showwarning = showwarning  # write warnings to the log
+            result = job.render(_worker_cache)
+    except Exception as exception:
+        return JobResult.from_exception(exception, log.getvalue())
+    result.log = log.getvalue()
+    return result
+
+
+def render_many(jobs, workers=None, cache=None):
+    """Render a batch of documents
+
+    The jobs are distributed over a pool of worker processes. Where
+    supported, the workers are forked after the templates, style sheets and
+    frontends needed by the jobs have been loaded, so that these are shared
+    by all workers. The output and warnings printed while rendering a
+    document are captured in its :attr:`JobResult.log`.
+
+    Exceptions raised while processing a job do not abort the batch; they
+    are reported in the :attr:`JobResult.error` for that job. This includes
+    a worker process terminating abruptly, which fails the jobs that had not
+    completed at that time.
+
+    Args:
+        jobs (list[RenderJob]): the documents to render
+        workers (int): the number of worker processes; defaults to the
+            number of CPUs. If 1, the jobs are rendered in this process.
+        cache (ResourceCache): style sheets and template configurations
+            loaded from file
+
+    Returns:
+        BatchResult: the results in the order of `jobs`
+
+    """
+    jobs = list(jobs)
+    cache = cache if cache is not None else ResourceCache()
+    workers = min(workers or os.cpu_count() or 1, len(jobs)) or 1
+    start_time = time.perf_counter()
+    _warm_up(jobs, cache)
+    if workers == 1:
+        _initialize_worker(cache)
+        results = [_render_job(job) for job in jobs]
+    else:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods
+                                              else None)
+        with ProcessPoolExecutor(workers, mp_context=context,
+                                 initializer=_initialize_worker,
+                                 initargs=(cache, )) as executor:
+            futures = [executor.submit(_render_job, job) for job in jobs]
+            results = [_job_result(future) for future in futures]
+    return BatchResult(results, time.perf_counter() - start_time, workers)
+
+
+def _job_result(future):
+    try:
+        return future.result()
+    except Exception as exception:  # e.g. BrokenProcessPool
+        return JobResult.from_exception(exception)
+
+
+def _warm_up(jobs, cache):
+    """Load the templates, style sheets and frontends used by `jobs`"""
+    loaded = set()
+    for job in jobs:
+        key = job.directory, job.template, job.stylesheet, job.format
+        if key in loaded:
+            continue
+        loaded.add(key)
+        with suppress(Exception):   # errors are reported when rendering
+            job.template_configuration(cache)
+            job._reader_class()
@@ -31,6 +31,7 @@ from collections import deque
 from contextlib import contextmanager
 from copy import copy
 
+from .counters import COUNTERS
 from .dimension import Dimension, PT, DimensionAddition
 from .util import ContextManager
 
@@ -53,6 +54,8 @@ class EndOfContainer(Exception):
         """`flowable_state` represents the rendering state of the
         :class:`Flowable` at the time the :class:`FlowableContainer`" overflows.
         """
+        if COUNTERS.enabled:
+            COUNTERS.count_exception(self)
         self.flowable_state = flowable_state
         self.page_break = page_break
 
@@ -60,6 +63,8 @@ class EndOfContainer(Exception):
 class PageBreakException(ContainerOverflow):
     def __init__(self, break_type, chain, flowable_state):
         super().__init__()
+        if COUNTERS.enabled:
+            COUNTERS.count_exception(self)
         self.break_type = break_type
         self.chain = chain
         self.flowable_state = flowable_state
@@ -68,6 +73,11 @@ class PageBreakException(ContainerOverflow):
 class ReflowRequired(Exception):
     """Reflow of the current page is required due to insertion of a float."""
 
+    def __init__(self):
+        super().__init__()
+        if COUNTERS.enabled:
+            COUNTERS.count_exception(self)
+
 
 class FlowableTarget(object):
     """Something that takes :class:`Flowable`\\ s to be rendered."""
@@ -84,7 +94,11 @@ class FlowableTarget(object):
 
     @property
     def document(self):
-        return self.document_part.document
+        try:
+            return self._document
+        except AttributeError:
+            self._document = document = self.document_part.document
+            return document
 
     def append_flowable(self, flowable):
         """Append a `flowable` to the list of flowables to be rendered."""
@@ -162,7 +176,12 @@ class Container(object):
 
     @property
     def document(self):
-        return self.document_part.document
+        # the document doesn't change, even when the parent container does
+        try:
+            return self._document
+        except AttributeError:
+            self._document = document = self.document_part.document
+            return document
 
     @property
     def never_placed(self):
@@ -219,6 +238,16 @@ class Container(object):
         for child in self.children:
             child.before_placing(preallocate)
 
+    def release(self):
+        """Drop this container's children and canvas once it has been placed
+
+        This releases the rendered contents and the flowables that were
+        rendered to the container tree of a finished page."""
+        for child in self.children:
+            child.release()
+        self.children = []
+        self.canvas = None
+
 
 BACKGROUND = 'background'
 CONTENT = 'content'
@@ -253,8 +282,25 @@ class FlowablesContainerBase(Container):
         super().clear()
         del self.children[:]
         self._placed_styleds.clear()
-        self._self_cursor._value = 0  # initialized at container's top edge
-        del self._cursor.addends[1:]
+        self._self_cursor.reset()  # initialized at container's top edge
+        self._cursor.truncate(1)
+
+    def checkpoint(self):
+        """Return the current fill state of this container, to be passed to
+        :meth:`roll_back`"""
+        return (len(self.children), len(self._cursor.addends),
+                float(self._self_cursor))
+
+    def roll_back(self, checkpoint):
+        """Discard the child containers added and undo the cursor advances made
+        since `checkpoint` was obtained from :meth:`checkpoint`"""
+        num_children, num_addends, cursor = checkpoint
+        del self.children[num_children:]
+        for index in [index for index in self._placed_styleds
+                      if index > num_children]:
+            del self._placed_styleds[index]
+        self._cursor.truncate(num_addends)
+        self._self_cursor.reset(cursor)
 
     def mark_page_nonempty(self):
         if self.type == CONTENT:
@@ -325,17 +371,97 @@ class FlowablesContainerBase(Container):
             child.before_placing(preallocate)
             log_styleds(i)
 
+    def release(self):
+        super().release()
+        self._placed_styleds = {}
+
 
 FLOATING_POINT_FUZZ = 1e-10
 
 
 class _FlowablesContainer(FlowableTarget, FlowablesContainerBase):
+    #: if set, containers with the same key (and size) on other pages render
+    #: the same flowables, so that their rendered contents can be shared if
+    #: these don't depend on the page (see :class:`SharedContent`)
+    shared_content_key = None
+
     def __init__(self, name, type, parent, *args, **kwargs):
         super().__init__(parent.document_part, name, type, parent,
                          *args, **kwargs)
+        self._shared_content = None
 
     def _render(self, type, rerender):
-        self.flowables.flow(self, last_descender=None)
+        if self.shared_content_key is None or self.sideways:
+            self.flowables.flow(self, last_descender=None)
+            return
+        document = self.document
+        key = (self.shared_content_key, float(self.width), float(self.height))
+        try:
+            self._shared_content = document.shared_content[key]
+        except KeyError:
+            page_dependencies = document.page_dependencies
+            self.flowables.flow(self, last_descender=None)
+            if document.page_dependencies == page_dependencies:
+                self._shared_content = SharedContent(self)
+                document.shared_content[key] = self._shared_content
+        else:
+            self._shared_content.reuse(self)
+
+    def place_children(self):
+        super().place_children()
+        if self._shared_content:
+            self._shared_content.place(self)
+
+    def release(self):
+        super().release()
+        self.flowables = None
+        self._shared_content = None
+
+
+def placed_styleds(container):
+    """Generate the styleds registered with `container` and its descendants,
+    in the order they are handled by :meth:`ContainerBase.before_placing`"""
+    registered = getattr(container, '_placed_styleds', {})
+    yield from registered.get(0, ())
+    for index, child in enumerate(container.children, start=1):
+        yield from placed_styleds(child)
+        yield from registered.get(index, ())
+
+
+class SharedContent(object):
+    """The rendered contents of a container that don't depend on the page
+
+    Containers on subsequent pages that render the same flowables reuse these
+    contents instead of rendering the flowables again. The contents are stored
+    in the output file only once (as a Form XObject for PDF).
+
+    Args:
+        container (_FlowablesContainer): the container whose flowables were
+            just rendered
+
+    """
+
+    def __init__(self, container):
+        self.height = float(container._cursor)
+        self.styleds = list(placed_styleds(container))
+        self.form = None
+
+    def reuse(self, container):
+        """Make `container` hold the shared contents"""
+        container._self_cursor.reset(self.height)
+        for styled, continued in self.styleds:
+            container.register_styled(styled, continued)
+
+    def place(self, container):
+        """Replace the contents of `container`'s canvas with the shared
+        contents; the first container to be placed provides them"""
+        if self.form is None:
+            page = container.page
+            width, height = float(page.width), float(page.height)
+            self.form = container.canvas.to_form((- width, - height,
+                                                  width, height))
+        container.empty_canvas()
+        container.canvas.place_form(self.form, container.document)
 
 
 class FlowablesContainer(_FlowablesContainer):
@@ -365,6 +491,10 @@ class ChainedContainer(FlowablesContainerBase):
     def _render(self, type, rerender):
         self.chain.render(self, rerender=rerender)
 
+    def release(self):
+        super().release()
+        self.chain.containers.remove(self)
+
 
 class ExpandingContainerBase(FlowablesContainerBase):
     """A dynamically, vertically growing :class:`Container`."""
@@ -378,7 +508,7 @@ class ExpandingContainerBase(FlowablesContainerBase):
         height = DimensionAddition()
         super().__init__(name, type, parent, left=left, top=top,
                          width=width, height=height, right=right, bottom=bottom)
-        self.height.addends.append(self._cursor)
+        self.height.append(self._cursor)
         self.max_height = max_height or float('+inf')
 
     @property
@@ -446,7 +576,7 @@ class InlineDownExpandingContainer(ConditionalDownExpandingContainerBase):
                          width=width, right=right,
                          max_height=parent.remaining_height, place=place)
         if advance_parent:
-            parent._cursor.addends.append(self._cursor)
+            parent._cursor.append(self._cursor)
 
 
 class UpExpandingContainer(_FlowablesContainer, ExpandingContainerBase):
@@ -574,7 +704,7 @@ class FootnoteContainer(UpExpandingContainer):
             self._allocation_phase = False
             self._placed_footnotes.clear()
         if self._reflowed:
-            self._cursor.addends.pop()
+            self._cursor.pop()
             self._descenders.pop()
         maybe_container = _MaybeContainer(self)
         for i, footnote in enumerate(self.footnotes):
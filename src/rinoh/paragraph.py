@@ -24,6 +24,7 @@ from . import DATA_PATH
 from .annotation import AnnotatedSpan
 from .attribute import (Attribute, AttributeType, OptionSet, ParseError,
                         OverrideDefault, Integer)
+from .counters import COUNTERS
 from .dimension import Dimension, PT
 from .flowable import Flowable, FlowableStyle, FlowableState, FlowableWidth
 from .font import MissingGlyphException
@@ -446,11 +447,15 @@ def handle_missing_glyphs(span, container):
 
 
 class LinePart(object):
+    __slots__ = ()
+
     def hyphenate(self, container):
         return iter([])
 
 
 class SpecialCharacter(LinePart):
+    __slots__ = ('glyphs_span', )
+
     def __init__(self, span, chars_to_glyphs):
         self.glyphs_span = GlyphsSpan(span, chars_to_glyphs)
 
@@ -463,6 +468,7 @@ class SpecialCharacter(LinePart):
 
 
 class Space(SpecialCharacter):
+    __slots__ = ()
     char = ' '
 
     def __init__(self, span, chars_to_glyphs):
@@ -478,6 +484,7 @@ class SpaceException(Exception):
 
 
 class Tab(SpecialCharacter):
+    __slots__ = ()
     char = '\t'
 
     def __getitem__(self, index):
@@ -489,6 +496,7 @@ class TabException(Exception):
 
 
 class NewLine(SpecialCharacter):
+    __slots__ = ()
     char = '\n'
 
     def __getitem__(self, index):
@@ -500,6 +508,7 @@ class NewLineException(Exception):
 
 
 class ZeroWidthSpace(SpecialCharacter):
+    __slots__ = ()
     char = '\N{ZERO WIDTH SPACE}'
 
     def __getitem__(self, index):
@@ -508,6 +517,7 @@ class ZeroWidthSpace(SpecialCharacter):
 
 
 class ForwardSlash(SpecialCharacter):
+    __slots__ = ()
     char = '/'
 
     def __getitem__(self, index):
@@ -952,8 +962,9 @@ def create_hyphenate(span, container):
 
 
 class GlyphsSpan(list):
-    def __init__(self, span, chars_to_glyphs, glyphs=[]):
-        super().__init__()
+    __slots__ = ('span', 'filled_tabs', 'chars_to_glyphs', 'space')
+
+    def __init__(self, span, chars_to_glyphs, glyphs=()):
         self.span = span
         self.filled_tabs = {}
         self.chars_to_glyphs = chars_to_glyphs
@@ -1001,6 +1012,8 @@ class GlyphsSpan(list):
 
 
 class Word(LinePart, list):
+    __slots__ = ()
+
     def __init__(self, glyphs_spans=()):
         super().__init__(glyphs_spans)
 
@@ -1046,6 +1059,10 @@ class Line(list):
 
     """
 
+    __slots__ = ('tab_stops', 'width', 'indent', 'container', 'cursor',
+                 'advance', 'significant_whitespace', '_has_tab',
+                 '_current_tab', '_current_tab_stop')
+
     def __init__(self, tab_stops, width, container, indent=0,
                  significant_whitespace=False):
         super().__init__()
@@ -1093,10 +1110,14 @@ class Line(list):
         try:
             first_glyphs_span = word_or_inline[0]
         except SpaceException:
+            if COUNTERS.enabled:
+                COUNTERS.count_exception(SpaceException)
             if not self and not self.significant_whitespace:
                 return True
             first_glyphs_span = word_or_inline.glyphs_span
         except TabException:
+            if COUNTERS.enabled:
+                COUNTERS.count_exception(TabException)
             empty_glyphs_span = copy(word_or_inline.glyphs_span)
             self._handle_tab(empty_glyphs_span)
             self.append(empty_glyphs_span)
@@ -1161,9 +1182,11 @@ class Line(list):
         # Temporarily advance with descender so that overflow on
         # before_placing (e.g. footnotes) can be detected
         assert container.advance2(- descender)
-        if not container.never_placed:
-            for glyph_span in self:
-                glyph_span.span.before_placing(container, preallocate=True)
+        if container.never_placed:      # only measuring; skip canvas output
+            assert container.advance2(descender)
+            return
+        for glyph_span in self:
+            glyph_span.span.before_placing(container, preallocate=True)
         assert container.advance2(descender)
 
         # horizontal displacement
@@ -0,0 +1,482 @@
+# This file is part of rinohtype, the Python document preparation system.
+#
+# Copyright (c) Brecht Machiels.
+#
+# Use of this source code is subject to the terms of the GNU Affero General
+# Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
+
+"""
+Recording where the time goes while rendering a document:
+
+* :class:`Profiler`: records the wall-clock and CPU time spent in each phase
+                     of the rendering process and in laying out each type of
+                     flowable
+* :class:`MemoryProfiler`: records the memory allocated in each phase of the
+                           rendering process and the top allocators
+* :class:`NullProfiler`: stand-in for the profilers that records nothing
+* :func:`create_profiler`: returns a profiler if profiling is enabled
+
+Profiling is enabled by setting the ``RINOH_PROFILE`` environment variable to
+a nonzero value or by passing ``--profile`` to the ``rinoh`` command line
+tool. Memory profiling is enabled by the ``--memory-report`` option.
+
+"""
+
+import gc
+import json
+import sys
+import tracemalloc
+
+from collections import Counter
+from contextlib import contextmanager, nullcontext, suppress
+from os import getenv
+from pathlib import Path
+from time import perf_counter, process_time
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+from . import __version__
+
+
+__all__ = ['Profiler', 'MemoryProfiler', 'NullProfiler', 'create_profiler',
+           'peak_rss']
+
+
+def create_profiler(enable=False, memory=False):
+    """Return a :class:`MemoryProfiler` if `memory` is true, a
+    :class:`Profiler` if `enable` is true or the ``RINOH_PROFILE`` environment
+    variable is set to a nonzero value, a :class:`NullProfiler` otherwise"""
+    if memory:
+        return MemoryProfiler()
+    if enable or getenv('RINOH_PROFILE', '0') != '0':
+        return Profiler()
+    return NullProfiler()
+
+
+def peak_rss():
+    """The peak resident set size of this process in MiB, or ``None`` if
+    this cannot be determined on this platform"""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    bytes_per_unit = 1 if sys.platform == 'darwin' else 1024
+    return round(max_rss * bytes_per_unit / 2**20, 1)
+
+
+class NullProfiler(object):
+    """Does not record anything; keeps profiling overhead to a minimum"""
+
+    #: whether :meth:`Flowable.flow <rinoh.flowable.Flowable.flow>` needs to
+    #: call :meth:`Profiler.enter_flowable` and :meth:`Profiler.exit_flowable`
+    times_flowables = False
+
+    def phase(self, name):
+        return nullcontext()
+
+    def write(self, filename_root):
+        return []
+
+
+class PhaseNode(object):
+    """The time spent in a phase, aggregated over all of its occurrences
+    within the same parent phase"""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.children = {}
+
+    def child(self, name):
+        try:
+            return self.children[name]
+        except KeyError:
+            node = self.children[name] = PhaseNode(name)
+            return node
+
+    def to_dict(self):
+        return dict(name=self.name, calls=self.calls,
+                    wall=round(self.wall, 6), cpu=round(self.cpu, 6),
+                    children=[child.to_dict()
+                              for child in self.children.values()])
+
+
+class FlowableTimes(object):
+    """The time spent laying out flowables of a single type
+
+    The inclusive times (`wall`, `cpu`) include the time spent on nested
+    flowables, but count only the outermost of nested flowables of the same
+    type. The self times exclude the time spent on nested flowables.
+
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.active = 0
+        self.wall = self.cpu = 0.0
+        self.self_wall = self.self_cpu = 0.0
+
+    def to_dict(self):
+        return dict(calls=self.calls, wall=round(self.wall, 6),
+                    cpu=round(self.cpu, 6), self_wall=round(self.self_wall, 6),
+                    self_cpu=round(self.self_cpu, 6))
+
+
+class Profiler(object):
+    """Records the wall-clock and CPU time spent in the rendering phases
+
+    Phases are delimited using :meth:`phase` and can be nested. Phases with
+    the same name within the same parent phase are aggregated. The time spent
+    laying out flowables is recorded per flowable class by
+    :meth:`enter_flowable` and :meth:`exit_flowable`, which are called by
+    :meth:`Flowable.flow <rinoh.flowable.Flowable.flow>`.
+
+    Besides the aggregated times, the profiler records the start and end time
+    of each phase and flowable, which are written to a file that can be
+    loaded into the speedscope_ profile viewer.
+
+    .. _speedscope: https://www.speedscope.app
+
+    """
+
+    times_flowables = True
+
+    def __init__(self):
+        self.start_time = perf_counter()
+        self.root = PhaseNode('total')
+        self.root.calls = 1
+        self.flowables = {}
+        self._phases = []
+        self._flowables = []
+        self._frames = {}
+        self._events = []
+
+    def _frame(self, name):
+        try:
+            return self._frames[name]
+        except KeyError:
+            index = self._frames[name] = len(self._frames)
+            return index
+
+    def _open(self, name):
+        wall, cpu = perf_counter(), process_time()
+        self._events.append(('O', self._frame(name), wall - self.start_time))
+        return wall, cpu
+
+    def _close(self, name, wall, cpu):
+        """Record the end of the phase or flowable `name`; return the wall
+        clock and CPU time it took"""
+        end_wall, end_cpu = perf_counter(), process_time()
+        self._events.append(('C', self._frame(name),
+                             end_wall - self.start_time))
+        return end_wall - wall, end_cpu - cpu
+
+    @contextmanager
+    def phase(self, name):
+        """Context manager timing the phase `name`"""
+        parent = self._phases[-1] if self._phases else self.root
+        node = parent.child(name)
+        wall, cpu = self._open(name)
+        self._phases.append(node)
+        try:
+            yield node
+        finally:
+            self._phases.pop()
+            wall, cpu = self._close(name, wall, cpu)
+            node.calls += 1
+            node.wall += wall
+            node.cpu += cpu
+            if parent is self.root:
+                self.root.wall += wall
+                self.root.cpu += cpu
+
+    def enter_flowable(self, flowable):
+        """Start timing the layout of `flowable`"""
+        name = type(flowable).__name__
+        try:
+            times = self.flowables[name]
+        except KeyError:
+            times = self.flowables[name] = FlowableTimes()
+        wall, cpu = self._open(name)
+        times.active += 1
+        self._flowables.append((times, wall, cpu, [0.0, 0.0]))
+
+    def exit_flowable(self, flowable):
+        """Stop timing the layout of `flowable`"""
+        name = type(flowable).__name__
+        times, wall, cpu, (child_wall, child_cpu) = self._flowables.pop()
+        wall, cpu = self._close(name, wall, cpu)
+        times.active -= 1
+        times.calls += 1
+        if not times.active:
+            times.wall += wall
+            times.cpu += cpu
+        times.self_wall += wall - child_wall
+        times.self_cpu += cpu - child_cpu
+        if self._flowables:     # nested in another flowable
+            parent_child_times = self._flowables[-1][3]
+            parent_child_times[0] += wall
+            parent_child_times[1] += cpu
+
+    def to_dict(self):
+        """The aggregated phase and flowable times"""
+        flowables = sorted(self.flowables.items(),
+                           key=lambda item: item[1].wall, reverse=True)
+        return dict(rinohtype=__version__,
+                    phases=self.root.to_dict(),
+                    flowables={name: times.to_dict()
+                               for name, times in flowables})
+
+    def to_speedscope(self, name):
+        """The recorded phases and flowables in speedscope's evented profile
+        format"""
+        frames = sorted(self._frames, key=self._frames.get)
+        end = self._events[-1][2] if self._events else 0
+        events = [dict(type=type, frame=frame, at=round(at, 7))
+                  for type, frame, at in self._events]
+        profile = dict(type='evented', name=name, unit='seconds',
+                       startValue=0, endValue=round(end, 7), events=events)
+        return {'$schema': 'https://www.speedscope.app/'
+                           'file-format-schema.json',
+                'shared': dict(frames=[dict(name=frame) for frame in frames]),
+                'profiles': [profile],
+                'name': name,
+                'exporter': 'rinohtype {}'.format(__version__)}
+
+    def write(self, filename_root):
+        """Write the timing report to ``<filename_root>.profile.json`` and the
+        speedscope profile to ``<filename_root>.speedscope.json``
+
+        Returns:
+            list[Path]: the files written
+
+        """
+        report_path = filename_root.parent / (filename_root.name
+                                              + '.profile.json')
+        speedscope_path = filename_root.parent / (filename_root.name
+                                                  + '.speedscope.json')
+        with report_path.open('w') as file:
+            json.dump(self.to_dict(), file, indent=2)
+        with speedscope_path.open('w') as file:
+            json.dump(self.to_speedscope(filename_root.name), file)
+        return [report_path, speedscope_path]
+
+
+class MemoryPhaseNode(PhaseNode):
+    """The memory allocated in a phase, aggregated over all of its occurrences
+    within the same parent phase
+
+    Attributes:
+        allocated (int): the net number of bytes allocated (and not freed)
+        peak (int): the maximum amount of memory allocated at any time during
+            the phase (bytes)
+        peak_rss (float): the peak resident set size at the end of the phase
+        top_modules (list): the source files that allocated the most memory
+            that is still in use at the end of the phase
+        top_types (list): the object types taking up the most memory at the
+            end of the phase
+
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.allocated = 0
+        self.peak = 0
+        self.peak_rss = None
+        self.top_modules = None
+        self.top_types = None
+
+    def child(self, name):
+        try:
+            return self.children[name]
+        except KeyError:
+            node = self.children[name] = MemoryPhaseNode(name)
+            return node
+
+    def to_dict(self):
+        result = dict(name=self.name, calls=self.calls,
+                      allocated=self.allocated, peak=self.peak,
+                      peak_rss=self.peak_rss)
+        if self.top_modules is not None:
+            result.update(top_modules=self.top_modules,
+                          top_types=self.top_types)
+        result['children'] = [child.to_dict()
+                              for child in self.children.values()]
+        return result
+
+
+class MemoryProfiler(object):
+    """Records the memory allocated in the rendering phases
+
+    Memory allocations are traced using :mod:`tracemalloc`, which slows down
+    rendering considerably. Phases are delimited using :meth:`phase`, like
+    for :class:`Profiler`. For each phase, the net amount of memory allocated,
+    the peak amount of memory allocated during the phase and the peak resident
+    set size (RSS) are recorded.
+
+    At the end of phases that are nested no deeper than
+    :attr:`snapshot_depth` (the top-level phases, the rendering passes and the
+    document parts), a snapshot of the allocations determines the source
+    files that allocated the most memory still in use, and the live objects
+    are counted by type. Types with instance dictionaries are attributed the
+    size of the dictionary; the size of other referenced objects is not
+    included. Taking these snapshots takes a few seconds each for large
+    documents.
+
+    Args:
+        top (int): the number of source files and object types to report
+
+    """
+
+    times_flowables = False
+
+    #: the maximum nesting level of the phases to take snapshots for
+    snapshot_depth = 2
+
+    def __init__(self, top=10):
+        self.top = top
+        self.root = MemoryPhaseNode('total')
+        self.root.calls = 1
+        self._phases = []
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        self._start_size, _ = tracemalloc.get_traced_memory()
+        self._reset_peak()
+
+    @staticmethod
+    def _reset_peak():
+        with suppress(AttributeError):      # Python < 3.9
+            tracemalloc.reset_peak()
+
+    @contextmanager
+    def phase(self, name):
+        """Context manager recording the allocations during the phase
+        `name`"""
+        parent = self._phases[-1] if self._phases else self.root
+        node = parent.child(name)
+        take_snapshot = len(self._phases) < self.snapshot_depth
+        current, peak = tracemalloc.get_traced_memory()
+        parent.peak = max(parent.peak, peak)    # the peak is reset below
+        self._reset_peak()
+        self._phases.append(node)
+        try:
+            yield node
+        finally:
+            self._phases.pop()
+            end, peak = tracemalloc.get_traced_memory()
+            node.calls += 1
+            node.allocated += end - current
+            node.peak = max(node.peak, peak)
+            parent.peak = max(parent.peak, node.peak)
+            node.peak_rss = peak_rss()
+            if take_snapshot:
+                node.top_modules = self._top_modules()
+                node.top_types = self._top_types()
+
+    def _top_modules(self):
+        statistics = tracemalloc.take_snapshot().statistics('filename')
+        return [dict(file=module_name(stat.traceback[0].filename),
+                     size=stat.size, count=stat.count)
+                for stat in statistics[:self.top]]
+
+    def _top_types(self):
+        counts, sizes = Counter(), Counter()
+        names = {}
+        for obj in gc.get_objects():
+            cls = type(obj)
+            try:
+                name = names[cls]
+            except KeyError:
+                name = names[cls] = type_name(cls)
+            size = sys.getsizeof(obj)
+            with suppress(AttributeError, TypeError):
+                size += sys.getsizeof(obj.__dict__)
+            counts[name] += 1
+            sizes[name] += size
+        return [dict(type=name, size=size, count=counts[name])
+                for name, size in sizes.most_common(self.top)]
+
+    def stop(self):
+        """Stop tracing memory allocations, if they were not being traced
+        already when this profiler was created"""
+        end, peak = tracemalloc.get_traced_memory()
+        self.root.allocated = end - self._start_size
+        self.root.peak = max(self.root.peak, peak)
+        self.root.peak_rss = peak_rss()
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def to_dict(self):
+        return dict(rinohtype=__version__, phases=self.root.to_dict())
+
+    def summary(self):
+        """Describe the memory usage of the top-level phases and the top
+        allocators during the rendering passes
+
+        Returns:
+            list[str]: the lines of the summary
+
+        """
+        lines = ['Memory usage (allocated, peak, peak RSS):']
+        for node in self.root.children.values():
+            lines.append('  {}: {}, {}, {} MiB'
+                         .format(node.name, format_size(node.allocated),
+                                 format_size(node.peak), node.peak_rss))
+        last_pass = [node for node in self.root.children.values()
+                     if node.name.startswith('pass ')][-1:]
+        for node in last_pass:
+            lines.append('Top allocating files after {}:'.format(node.name))
+            lines.extend('  {}: {} ({} blocks)'
+                         .format(top['file'], format_size(top['size']),
+                                 top['count'])
+                         for top in node.top_modules)
+            lines.append('Largest object types after {}:'.format(node.name))
+            lines.extend('  {}: {} ({} objects)'
+                         .format(top['type'], format_size(top['size']),
+                                 top['count'])
+                         for top in node.top_types)
+        return lines
+
+    def write(self, filename_root):
+        """Stop tracing, print a summary and write the report to
+        ``<filename_root>.memory.json``
+
+        Returns:
+            list[Path]: the file written
+
+        """
+        self.stop()
+        print('\n'.join(self.summary()))
+        path = filename_root.parent / (filename_root.name + '.memory.json')
+        with path.open('w') as file:
+            json.dump(self.to_dict(), file, indent=2)
+        return [path]
+
+
+def type_name(cls):
+    """The qualified name of `cls`, including its module"""
+    module = type.__dict__['__module__'].__get__(cls)
+    return '{}.{}'.format(module, cls.__qualname__)
+
+
+def module_name(filename):
+    """Shorten `filename` to the path relative to the directory on
+    :data:`sys.path` that contains it"""
+    path = Path(filename)
+    for entry in sorted(sys.path, key=len, reverse=True):
+        if entry:
+            with suppress(ValueError):
+                return path.relative_to(entry).as_posix()
+    return filename
+
+
+def format_size(size):
+    """Format `size` (bytes) in KiB or MiB"""
+    if abs(size) >= 2**20:
+        return '{:.1f} MiB'.format(size / 2**20)
+    return '{:.1f} KiB'.format(size / 2**10)
@@ -406,8 +406,10 @@ class Field(MixedStyledTextBase):
         if container is None:
             text = '${}'.format(self.type)
         elif self.type == PAGE_NUMBER:
+            container.document.page_dependencies += 1
             text = container.page.formatted_number
         elif self.type == NUMBER_OF_PAGES:
+            container.document.page_dependencies += 1
             part = container.document_part
             text = format_number(part.number_of_pages, part.page_number_format)
         elif self.type == DOCUMENT_TITLE:
@@ -418,6 +420,7 @@ class Field(MixedStyledTextBase):
             text = container.document.get_metadata('author')
         elif isinstance(self.type, SectionFieldType):
             doc = container.document
+            doc.page_dependencies += 1
             section = container.page.get_current_section(self.type.level)
             section_id = section.get_id(doc) if section else None
             if section_id:
@@ -5,9 +5,13 @@
 # Use of this source code is subject to the terms of the GNU Affero General
 # Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
 
+import pickle
 import string
 import sys
 
+from contextlib import suppress
+from os import getenv, stat, curdir
+from pathlib import Path
 from subprocess import Popen, PIPE
 
 try:         # required on Python < 3.8, but always used if available
@@ -16,11 +20,14 @@ except ImportError:
     from importlib import metadata as ilm
 from warnings import warn
 
+from appdirs import AppDirs
+
 from .attribute import AttributeType
 from .util import NotImplementedAttribute, class_property
 
 
-__all__ = ['Resource', 'ResourceNotFound', 'find_entry_points']
+__all__ = ['Resource', 'ResourceNotFound', 'ResourceIndex',
+           'find_entry_points']
 
 
 class Resource(AttributeType):
@@ -50,11 +57,7 @@ class Resource(AttributeType):
 
     @class_property
     def installed_resources(cls):
-        try:    # Python >= 3.10 and importlib_metadata >= 3.6
-            entry_points = ilm.entry_points(group=cls.entry_point_group)
-        except TypeError:
-            entry_points = ilm.entry_points()[cls.entry_point_group]
-        for entry_point in entry_points:
+        for entry_point, _ in find_entry_points(cls.entry_point_group):
             yield entry_point.name, entry_point
 
     @classmethod
@@ -66,7 +69,9 @@ class Resource(AttributeType):
         for line in pip.stdout:
             if not line.startswith('Requirement already satisfied'):
                 sys.stdout.write(line)
-        return pip.wait() == 0
+        success = pip.wait() == 0
+        RESOURCE_INDEX.invalidate()
+        return success
 
 
 class ResourceNotFound(Exception):
@@ -103,24 +108,130 @@ def entry_point_name_to_identifier(entry_point_name):
 def find_entry_points(group, name=None):
     """Find all entry points in `group`, optionally filtered by `name`
 
+    Entry points in the ``rinoh.*`` groups are looked up in the
+    :class:`ResourceIndex`. Entry points registered at runtime are yielded
+    after those provided by the installed distributions.
+
     Yields:
         (EntryPoint, Distribution): entry point and distribution it belongs to
 
     """
-    yield from ((ep, dist) for dist in ilm.distributions()
-                for ep in dist.entry_points
+    if group.startswith(ResourceIndex.GROUP_PREFIX):
+        candidates = RESOURCE_INDEX.lookup(group)
+    else:
+        candidates = ((ep, dist) for dist in ilm.distributions()
+                      if dist is not _DISTRIBUTION
+                      for ep in dist.entry_points if ep.group == group)
+    yield from ((ep, dist) for ep, dist in candidates
+                if name is None or ep.name.lower() == name.lower())
+    yield from ((ep, _DISTRIBUTION) for ep in _DISTRIBUTION.entry_points
                 if ep.group == group and (name is None
                                           or ep.name.lower() == name.lower()))
 
 
-# dynamic entry point creation
+class ResourceIndex(object):
+    """Maps the ``rinoh.*`` entry point groups to installed entry points
 
-GROUPS = ('rinoh.templates', 'rinoh.typefaces')
+    Iterating over the entry points of all installed distributions is slow
+    when many packages are installed. The index performs this scan only once
+    and reuses the result until one of the directories on :data:`sys.path` is
+    modified, which happens when a distribution is installed or removed.
 
-_installed_entry_points = {(ep.group, ep.name): dist
-                           for dist in ilm.distributions()
-                           for ep in dist.entry_points
-                           if ep.group in GROUPS}
+    When `cache_path` is given, the index is additionally stored to that file
+    so that subsequent processes can skip the scan too. The stored index is
+    discarded when the Python version or the :data:`sys.path` modification
+    times no longer match.
+
+    Entry points registered at runtime (:func:`rinoh.register_template` and
+    :func:`rinoh.register_typeface`) are not part of the index.
+
+    Args:
+        cache_path (Path): file to store the index to (optional)
+
+    """
+
+    GROUP_PREFIX = 'rinoh.'
+    VERSION = 1
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+        self._stamp = None
+        self._index = None
+
+    def invalidate(self):
+        """Force a rescan of the installed distributions on the next lookup"""
+        self._stamp = self._index = None
+        if self.cache_path:
+            with suppress(OSError):
+                self.cache_path.unlink()
+
+    def lookup(self, group):
+        """Return the (EntryPoint, Distribution) pairs for `group`, ordered
+        like :func:`importlib.metadata.distributions` orders them"""
+        stamp = self._sys_path_stamp()
+        if self._index is None or stamp != self._stamp:
+            self._index = self._load(stamp)
+            if self._index is None:
+                self._index = self._scan()
+                self._save(stamp)
+            self._stamp = stamp
+        return self._index.get(group, ())
+
+    @staticmethod
+    def _sys_path_stamp():
+        stamp = []
+        for path in sys.path:
+            with suppress(OSError):
+                stamp.append((path, stat(path or curdir).st_mtime_ns))
+        return tuple(stamp)
+
+    def _scan(self):
+        index = {}
+        for dist in ilm.distributions():
+            if dist is _DISTRIBUTION:
+                continue
+            for entry_point in dist.entry_points:
+                if entry_point.group.startswith(self.GROUP_PREFIX):
+                    group_entries = index.setdefault(entry_point.group, [])
+                    group_entries.append((entry_point, dist))
+        return index
+
+    def _cache_key(self, stamp):
+        return self.VERSION, sys.version, stamp
+
+    def _load(self, stamp):
+        if not self.cache_path:
+            return None
+        try:
+            with self.cache_path.open('rb') as file:
+                key, index = pickle.load(file)
+        except Exception:   # missing, corrupt or incompatible cache file
+            return None
+        return index if key == self._cache_key(stamp) else None
+
+    def _save(self, stamp):
+        if not self.cache_path:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.cache_path.open('wb') as file:
+                pickle.dump((self._cache_key(stamp), self._index), file)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            with suppress(OSError):
+                self.cache_path.unlink()
+
+
+def _resource_index_cache_path():
+    if getenv('RINOH_RESOURCE_INDEX', '0') == '0':
+        return None
+    cache_dir = AppDirs("rinohtype", "opqode").user_cache_dir
+    return Path(cache_dir) / 'resource_index.pickle'
+
+
+RESOURCE_INDEX = ResourceIndex(_resource_index_cache_path())
+
+
+# dynamic entry point creation
 
 
 class DynamicEntryPoint(ilm.EntryPoint):
@@ -159,10 +270,12 @@ class DynamicRinohDistribution(ilm.Distribution):
 
     def _check_existing_entry_point(self, resource_type, name):
         group = 'rinoh.{}s'.format(resource_type)
-        try:
-            dist = _installed_entry_points[(group, name)]
-            existing = "by the distribution '{}'".format(dist.metadata['Name'])
-        except KeyError:
+        for entry_point, dist in RESOURCE_INDEX.lookup(group):
+            if entry_point.name == name:
+                existing = ("by the distribution '{}'"
+                            .format(dist.metadata['Name']))
+                break
+        else:
             if name in self._entry_point_groups[group]:
                 existing = "using 'register_{}'".format(resource_type)
             else:
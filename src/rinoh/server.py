@@ -0,0 +1,228 @@
+# This file is part of rinohtype, the Python document preparation system.
+#
+# Copyright (c) Brecht Machiels.
+#
+# Use of this source code is subject to the terms of the GNU Affero General
+# Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
+
+"""
+A long-running process that renders documents on request
+
+Importing rinohtype and loading templates, style sheets, fonts and hyphenation
+dictionaries can take longer than rendering a short document. The render
+server performs this work only once and then keeps accepting render jobs.
+
+Jobs are submitted as a JSON object in the body of a ``POST /render`` request.
+The object's items are the arguments to :class:`.RenderJob`; relative paths
+are resolved with respect to the ``directory`` item or else the server's
+working directory. The response is a JSON object with these items:
+
+* ``success``: ``false`` if rendering failed or completed with errors
+* ``output``: the path of the rendered document
+* ``parse_time`` and ``render_time``: time spent in both phases (seconds)
+* ``error``: a description of the problem if the job could not be rendered
+
+``GET /status`` returns the server's version, process ID and number of jobs
+rendered so far.
+
+The server listens on a TCP port (``HOST:PORT``) or on a Unix domain socket
+(a file system path). Jobs are rendered sequentially by each worker process.
+
+"""
+
+import json
+import os
+import signal
+import sys
+import traceback
+
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+try:
+    from socketserver import UnixStreamServer
+except ImportError:     # no Unix domain socket support (Windows)
+    UnixStreamServer = None
+
+from . import __version__
+from .job import RenderJob, JobResult, ResourceCache
+from .resource import ResourceNotFound, find_entry_points
+
+
+__all__ = ['serve', 'create_server', 'RenderServer', 'UnixRenderServer']
+
+
+DEFAULT_ADDRESS = 'localhost:8642'
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'rinohtype/{}'.format(__version__)
+
+    def do_GET(self):
+        if self.path != '/status':
+            return self._send_json(404, dict(error='Not found'))
+        self._send_json(200, self.server.status())
+
+    def do_POST(self):
+        if self.path != '/render':
+            return self._send_json(404, dict(error='Not found'))
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            return self.send_error(400, 'Invalid Content-Length header')
+        try:
+            arguments = json.loads(self.rfile.read(length))
+            job = self.server.create_job(arguments)
+        except (ValueError, TypeError) as exc:
+            return self._send_json(400, dict(success=False, error=str(exc)))
+        self._send_json(200, self.server.render(job))
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        return self.client_address[0] if self.client_address else 'local'
+
+
+class RenderServerMixin(object):
+    """Renders the jobs received by the server
+
+    Args:
+        job_defaults (dict): default :class:`.RenderJob` arguments for jobs
+            that do not specify these
+
+    """
+
+    def __init__(self, address, job_defaults=None):
+        super().__init__(address, RenderRequestHandler)
+        self.job_defaults = {key: value
+                             for key, value in (job_defaults or {}).items()
+                             if value is not None}
+        self.cache = ResourceCache()
+        self.jobs_rendered = 0
+
+    def warm_up(self):
+        """Load the default template and style sheet before accepting jobs"""
+        job = RenderJob('', template=self.job_defaults.get('template',
+                                                           'article'),
+                        stylesheet=self.job_defaults.get('stylesheet'))
+        configuration = job.template_configuration(self.cache)
+        configuration.get_attribute_value('stylesheet')
+        for entry_point, _ in find_entry_points('rinoh.frontends'):
+            entry_point.load()
+
+    def create_job(self, arguments):
+        if not isinstance(arguments, dict):
+            raise ValueError('The job description should be a JSON object')
+        return RenderJob(**dict(self.job_defaults, **arguments))
+
+    def render(self, job):
+        try:
+            result = job.render(self.cache)
+        except Exception as exception:
+            if not isinstance(exception, ResourceNotFound):
+                traceback.print_exc()
+            result = JobResult.from_exception(exception)
+        self.jobs_rendered += 1
+        return result.to_dict()
+
+    def status(self):
+        return dict(version=__version__, pid=os.getpid(),
+                    jobs=self.jobs_rendered, cached_files=len(self.cache))
+
+
+class RenderServer(RenderServerMixin, HTTPServer):
+    """Render server listening on a TCP port"""
+
+
+if UnixStreamServer:
+    class UnixRenderServer(RenderServerMixin, UnixStreamServer):
+        """Render server listening on a Unix domain socket"""
+
+        def server_bind(self):
+            if os.path.exists(self.server_address):
+                os.unlink(self.server_address)
+            super().server_bind()
+
+        def server_close(self):
+            super().server_close()
+            if os.path.exists(self.server_address):
+                os.unlink(self.server_address)
+else:
+    UnixRenderServer = None
+
+
+def parse_address(address):
+    """Split `address` into a (host, port) tuple, or return a path to a Unix
+    domain socket unchanged"""
+    if os.sep in address or (os.altsep and os.altsep in address):
+        return address
+    host, _, port = address.rpartition(':')
+    try:
+        return host or 'localhost', int(port)
+    except ValueError:
+        raise ValueError("Invalid server address '{}'; expecting HOST:PORT, "
+                         "PORT or a path to a Unix domain socket"
+                         .format(address))
+
+
+def create_server(address=DEFAULT_ADDRESS, **job_defaults):
+    """Create a render server listening on `address`
+
+    Args:
+        address (str): ``HOST:PORT``, ``PORT`` or the path to a Unix domain
+            socket
+        job_defaults: default :class:`.RenderJob` arguments
+
+    """
+    address = parse_address(address)
+    if isinstance(address, tuple):
+        return RenderServer(address, job_defaults)
+    if UnixRenderServer is None:
+        raise ValueError('Unix domain sockets are not supported on this '
+                         'platform')
+    return UnixRenderServer(address, job_defaults)
+
+
+def serve(address=DEFAULT_ADDRESS, workers=1, **job_defaults):
+    """Render documents submitted to `address` until interrupted
+
+    Args:
+        address (str): see :func:`create_server`
+        workers (int): number of processes accepting jobs; the additional
+            worker processes are forked after loading the default template
+            and style sheet, so that they share these
+        job_defaults: default :class:`.RenderJob` arguments
+
+    """
+    if workers > 1 and not hasattr(os, 'fork'):
+        raise ValueError('Multiple workers are not supported on this platform')
+    server = create_server(address, **job_defaults)
+    server.warm_up()
+    children = []
+    for _ in range(workers - 1):
+        pid = os.fork()
+        if pid == 0:        # worker process
+            signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+            try:
+                server.serve_forever()
+            finally:
+                os._exit(0)
+        children.append(pid)
+    print('Accepting render jobs on {} ({} worker{})'
+          .format(address, workers, 's' if workers > 1 else ''))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+        server.server_close()
@@ -28,17 +28,19 @@ from pathlib import Path
 
 from .attribute import (WithAttributes, AttributesDictionary,
                         RuleSet, RuleSetFile, Configurable,
-                        DefaultValueException, Attribute, Bool)
+                        DefaultValueException, Attribute, Bool, OptionSet)
+from .counters import COUNTERS
 from .element import DocumentElement
 from .resource import Resource, ResourceNotFound
-from .util import (cached, all_subclasses, NotImplementedAttribute,
+from .util import (all_subclasses, NotImplementedAttribute,
                    class_property)
 from .warnings import warn
 
 
 __all__ = ['Style', 'Styled', 'StyledMeta',
            'StyledMatcher', 'StyleSheet', 'StyleSheetFile',
-           'ClassSelector', 'ContextSelector', 'PARENT_STYLE']
+           'ClassSelector', 'ContextSelector', 'PARENT_STYLE',
+           'StyleLogMode']
 
 
 class StyleMeta(WithAttributes):
@@ -502,9 +504,8 @@ class Styled(DocumentElement, Configurable, metaclass=StyledMeta):
     def get_annotation(self, container):
         return self.annotation
 
-    @cached
     def get_style(self, attribute, container):
-        return self.get_config_value(attribute, container.document)
+        return container.document.get_style(self, attribute)
 
     @property
     def has_id(self):
@@ -613,6 +614,8 @@ class StyledMatcher(dict):
             style_str = styled.style if isinstance(styled.style, str) else None
             for style in set((style_str, None)):
                 for name, selector in self[cls].get(style, {}).items():
+                    if COUNTERS.enabled:
+                        COUNTERS.count('selectors evaluated')
                     selector = selector.flatten(stylesheet)
                     specificity = selector.match(styled, stylesheet, document)
                     if specificity:
@@ -688,6 +691,8 @@ class StyleSheet(RuleSet, Resource):
                 '``{}`` extension)'.format(cls.extension))
 
     def _get_value_lookup(self, styled, attribute, document):
+        if COUNTERS.enabled:
+            COUNTERS.count('style sheet lookups')
         if isinstance(styled.style, Style) and attribute in styled.style:
             return styled.style[attribute]
         try:
@@ -701,6 +706,7 @@ class StyleSheet(RuleSet, Resource):
                 raise
         except ParentStyleException:      # fallback to parent's style
             pass
+        document.parent_style_lookups += 1
         return self._get_value_lookup(styled.parent, attribute, document)
 
     def get_styled(self, name):
@@ -1030,13 +1036,60 @@ class StyleLogEntry(object):
         return self.container.page.formatted_number
 
 
+class StyleLogMode(OptionSet):
+    """What to write to the style log
+
+    - ``off``: no style log is written
+    - ``summary``: the number of styled elements each style is applied to
+    - ``full``: the styles matching each of the placed styled elements
+
+    """
+
+    values = 'off', 'summary', 'full'
+
+
 class StyleLog(object):
-    def __init__(self, stylesheet):
+    """Log of the styles matching the styled elements placed on the pages
+
+    In full mode, the entries are written to the log file as each page is
+    placed (see :meth:`flush`), so that the styled elements and their
+    containers are not kept in memory until the document has been rendered.
+    In summary mode, only the number of styled elements each style applies to
+    is recorded. Nothing is recorded when `mode` is ``off`` or no `log_path`
+    is given.
+
+    Args:
+        stylesheet (StyleSheet): the style sheet used to style the document
+        mode (StyleLogMode): the amount of detail to log
+        log_path (Path): the file to write the style log to
+        document_source_root (Path): stylesheet and source file paths are
+            written relative to this directory
+
+    """
+
+    def __init__(self, stylesheet, mode=StyleLogMode.FULL, log_path=None,
+                 document_source_root=None):
         self.stylesheet = stylesheet
+        self.mode = mode if log_path else StyleLogMode.OFF
+        self.log_path = log_path
+        self.document_source_root = document_source_root
         self.entries = []
+        self.style_counts = {}
+        self._log_created = False
+        self._current_page = None
+        self._current_container = None
 
     def log_styled(self, styled, container, continued, custom_message=None):
+        if self.mode == StyleLogMode.OFF:
+            return
         matches = container.document.get_matches(styled)
+        if self.mode == StyleLogMode.SUMMARY:
+            if not continued:
+                style_name = next((match.style_name for match in matches
+                                   if match.stylesheet), None)
+                counts = self.style_counts
+                counts[style_name] = counts.get(style_name, 0) + 1
+            return
         log_entry = StyleLogEntry(styled, container, matches, continued,
                                   custom_message)
         self.entries.append(log_entry)
@@ -1044,95 +1097,121 @@ class StyleLog(object):
     def log_out_of_line(self):
         raise NotImplementedError
 
-    def write_log(self, document_source_root, filename_root):
-        log_path = filename_root.parent / (filename_root.name + '.stylelog')
-        with log_path.open('w', encoding='utf-8') as log:
-            current_page = None
-            current_container = None
+    def flush(self):
+        """Write the logged entries to the log file and discard them"""
+        if not self.entries:
+            return
+        with self.log_path.open('a' if self._log_created else 'w',
+                                encoding='utf-8') as log:
+            self._log_created = True
             for entry in self.entries:
-                if entry.page_number != current_page:
-                    current_page = entry.page_number
-                    log.write('{line} page {} {line}\n'.format(current_page,
-                                                               line='-' * 34))
-                container = entry.container
-                if container.top_level_container is not current_container:
-                    current_container = container.top_level_container
-                    log.write("#### {}('{}')\n"
-                              .format(type(current_container).__name__,
-                                      current_container.name))
-                styled = entry.styled
-                level = styled.nesting_level
-                attrs = OrderedDict()
-                style = None
-                indent = '  ' * level
-                loc = ''
-                if styled.source:
+                self._write_entry(log, entry)
+        self.entries = []
+
+    def write_log(self):
+        """Complete the log file"""
+        if self.mode == StyleLogMode.FULL:
+            self.flush()
+            if not self._log_created:       # no styled elements were placed
+                self.log_path.write_text('', encoding='utf-8')
+        elif self.mode == StyleLogMode.SUMMARY:
+            with self.log_path.open('w', encoding='utf-8') as log:
+                self._write_summary(log)
+
+    def _write_summary(self, log):
+        counts = sorted(self.style_counts.items(),
+                        key=lambda item: (-item[1], item[0] or ''))
+        total = sum(self.style_counts.values())
+        log.write('{} styled elements\n'.format(total))
+        for style_name, count in counts:
+            log.write('{:8d}  {}\n'.format(count, style_name
+                                           or '(no matching style)'))
+
+    def _write_entry(self, log, entry):
+        if entry.page_number != self._current_page:
+            self._current_page = entry.page_number
+            log.write('{line} page {} {line}\n'.format(self._current_page,
+                                                       line='-' * 34))
+        container = entry.container
+        if container.top_level_container is not self._current_container:
+            current_container = container.top_level_container
+            self._current_container = current_container
+            log.write("#### {}('{}')\n"
+                      .format(type(current_container).__name__,
+                              current_container.name))
+        styled = entry.styled
+        level = styled.nesting_level
+        attrs = OrderedDict()
+        style = None
+        indent = '  ' * level
+        loc = ''
+        if styled.source:
+            try:
+                filename, line, tag_name = styled.source.location
+            except ValueError:
+                loc = f'   {styled.source.location}'
+            else:
+                if filename:
                     try:
-                        filename, line, tag_name = styled.source.location
+                        filename, extra = filename.split(':')
                     except ValueError:
-                        loc = f'   {styled.source.location}'
+                        extra = None
+                    file_path = Path(filename)
+                    if file_path.is_absolute():
+                        try:
+                            file_path = file_path.relative_to(
+                                self.document_source_root)
+                        except ValueError:
+                            pass
+                    loc = f'   {file_path}'
+                    if line:
+                        loc += f':{line}'
+                    if extra:
+                        loc += f' ({extra})'
+                if tag_name:
+                    loc += f'   <{tag_name}>'
+        continued_text = '(continued) ' if entry.continued else ''
+        log.write('  {}{}{}{}'
+                  .format(indent, continued_text,
+                          styled.short_repr(container), loc))
+        if entry.custom_message:
+            log.write('\n      {} ! {}\n'.format(indent,
+                                                 entry.custom_message))
+            return
+        first = True
+        if style is not None:
+            first = False
+            style_attrs = ', '.join(key + '=' + value
+                                    for key, value in style.items())
+            log.write('\n      {} > {}({})'
+                      .format(indent, attrs['style'], style_attrs))
+        if entry:
+            for match in entry.matches:
+                base = ''
+                stylesheet = match.stylesheet
+                if stylesheet:
+                    if first:
+                        label = '>'
+                        first = False
                     else:
-                        if filename:
-                            try:
-                                filename, extra = filename.split(':')
-                            except ValueError:
-                                extra = None
-                            file_path = Path(filename)
-                            if file_path.is_absolute():
-                                try:
-                                    file_path = file_path.relative_to(
-                                        document_source_root)
-                                except ValueError:
-                                    pass
-                            loc = f'   {file_path}'
-                            if line:
-                                loc += f':{line}'
-                            if extra:
-                                loc += f' ({extra})'
-                        if tag_name:
-                            loc += f'   <{tag_name}>'
-                continued_text = '(continued) ' if entry.continued else ''
-                log.write('  {}{}{}{}'
-                          .format(indent, continued_text,
-                                  styled.short_repr(container), loc))
-                if entry.custom_message:
-                    log.write('\n      {} ! {}\n'.format(indent,
-                                                         entry.custom_message))
-                    continue
-                first = True
-                if style is not None:
-                    first = False
-                    style_attrs = ', '.join(key + '=' + value
-                                            for key, value in style.items())
-                    log.write('\n      {} > {}({})'
-                              .format(indent, attrs['style'], style_attrs))
-                if entry:
-                    for match in entry.matches:
-                        base = ''
-                        stylesheet = match.stylesheet
-                        if stylesheet:
-                            if first:
-                                label = '>'
-                                first = False
-                            else:
-                                label = ' '
-                            name = match.style_name
-                            style = self.stylesheet.get_configuration(name)
-                            base_name = ("DEFAULT" if style.base is None
-                                         else str(style.base))
-                            base = f' > {base_name}'
-                            stylesheet_path = Path(stylesheet)
-                            if stylesheet_path.is_absolute():
-                                stylesheet = stylesheet_path.relative_to(
-                                    document_source_root)
-                        else:
-                            label = 'x'
-                        specificity = ','.join(str(score)
-                                               for score in match.specificity)
-
-                        log.write('\n      {} {} ({}) {}{}{}'
-                                  .format(indent, label, specificity,
-                                          match.style_name,
-                                          f' [{stylesheet}]' if stylesheet
-                                          else '', base))
-                log.write('\n')
+                        label = ' '
+                    name = match.style_name
+                    style = self.stylesheet.get_configuration(name)
+                    base_name = ("DEFAULT" if style.base is None
+                                 else str(style.base))
+                    base = f' > {base_name}'
+                    stylesheet_path = Path(stylesheet)
+                    if stylesheet_path.is_absolute():
+                        stylesheet = stylesheet_path.relative_to(
+                            self.document_source_root)
+                else:
+                    label = 'x'
+                specificity = ','.join(str(score)
+                                       for score in match.specificity)
+
+                log.write('\n      {} {} ({}) {}{}{}'
+                          .format(indent, label, specificity,
+                                  match.style_name,
+                                  f' [{stylesheet}]' if stylesheet
+                                  else '', base))
+        log.write('\n')
@@ -7,7 +7,7 @@
 
 
 from collections.abc import Iterable
-from itertools import chain
+from itertools import chain, islice
 from functools import partial
 from math import sqrt
 from token import NAME
@@ -107,6 +107,13 @@ class TableStyle(FlowableStyle):
                                                'split across pages')
     repeat_head = Attribute(Bool, False, 'Repeat the head when the table is '
                                          'split across pages')
+    streaming = Attribute(Bool, False, 'Determine the column widths from '
+                                       'the head and the first sample_rows '
+                                       'body rows only (for very long '
+                                       'tables)')
+    sample_rows = Attribute(Integer, 100, 'The number of body rows to measure '
+                                          'the column widths from in '
+                                          'streaming mode')
 
 
 NEVER_SPLIT = float('+inf')
@@ -153,10 +160,19 @@ class Table(Flowable):
         get_style = partial(self.get_style, container=container)
         with MaybeContainer(container) as maybe_container:
             def render_rows(section, next_row_index=0):
-                rows = section[next_row_index:]
-                rendered_spans = self._render_section(container, rows,
+                rendered_spans = self._render_section(container, section,
+                                                      next_row_index,
                                                       state.column_widths)
-                for rendered_rows, is_last_span in rendered_spans:
+                while True:
+                    try:
+                        rendered_rows, is_last_span = next(rendered_spans)
+                    except StopIteration:
+                        break
+                    except EndOfContainer:
+                        # a cell's content doesn't fit on this page (e.g. a
+                        # footnote); it carries the cell's state, so move the
+                        # row to the next page as if it were too tall
+                        break
                     sum_row_heights = sum(row.height for row in rendered_rows)
                     remaining_height = maybe_container.remaining_height
                     if isinstance(section, TableBody) and is_last_span:
@@ -221,8 +237,20 @@ class Table(Flowable):
                       ' available width')
 
         # minimum (wrap content) and maximum (non wrapping) column widths
-        min_widths = self._widths_from_content(final, 0, container)
-        max_widths = self._widths_from_content(final, INF, container)
+        body_rows = self.body
+        if self.get_style('streaming', container):
+            body_rows = islice(body_rows,
+                               self.get_style('sample_rows', container))
+        cell_widths = []
+        for row in chain(self.head or [], body_rows):
+            for cell in row:
+                col = int(cell.column_index)
+                if cell.colspan == 1 and col in fixed_cols:
+                    continue
+                cell_widths.append((col, cell.colspan,
+                                    self._cell_widths(cell, container)))
+        min_widths = self._widths_from_content(final, cell_widths, 0)
+        max_widths = self._widths_from_content(final, cell_widths, 1)
 
         # calculate max column widths respecting the specified relative
         #   column widths (padding columns with whitespace)
@@ -294,32 +322,66 @@ class Table(Flowable):
                 final[i] += per_column_surplus
         return final
 
-    def _widths_from_content(self, fixed, max_cell_width, container):
-        """Calculate required column widths given a maximum cell width"""
-        def cell_content_width(cell):
+    @staticmethod
+    def _cell_widths(cell, container):
+        """Return the minimum (wrap content) and maximum (non wrapping)
+        content width of `cell`
+
+        The cell is flowed into a virtual container that is never placed, so
+        no output is generated for the page's canvas. The measurements are
+        stored in the document, which keeps them across rendering passes.
+        Cells whose contents depend on the page they end up on (page numbers
+        and page references) are measured again each time.
+
+        """
+        document = container.document
+        key = float(container.width)
+        try:
+            return document.cell_widths[cell][key]
+        except KeyError:
+            pass
+        page_dependencies = document.page_dependencies
+        widths = []
+        for max_cell_width in (0, INF):
             buffer = VirtualContainer(container, width=max_cell_width,
                                       never_placed=True)
             width, _, _ = cell.flow(buffer, None)
-            return float(width)
+            widths.append(float(width))
+        widths = tuple(widths)
+        if document.page_dependencies == page_dependencies:
+            try:
+                cell_widths = document.cell_widths[cell]
+            except KeyError:
+                cell_widths = document.cell_widths[cell] = {}
+            cell_widths[key] = widths
+        return widths
+
+    @staticmethod
+    def _widths_from_content(fixed, cell_widths, index):
+        """Calculate required column widths given the measured cell widths
+
+        Args:
+            fixed (list): the fixed column widths (``None`` for others)
+            cell_widths (list): (column index, column span, (minimum width,
+                maximum width)) tuples for each of the table's cells
+            index (int): selects the minimum (0) or maximum (1) cell widths
 
+        """
         widths = [width if width else 0 for width in fixed]
         fixed_width_cols = set(i for i, width in enumerate(widths) if width)
 
         # find the maximum content width for all non-column-spanning cells for
         #   each non-fixed-width column
-        for row in chain(self.head or [], self.body):
-            for cell in (cell for cell in row if cell.colspan == 1):
-                col = int(cell.column_index)
-                if col not in fixed_width_cols:
-                    widths[col] = max(widths[col], cell_content_width(cell))
+        for col, colspan, cell_width in cell_widths:
+            if colspan == 1 and col not in fixed_width_cols:
+                widths[col] = max(widths[col], cell_width[index])
 
         # divide the extra space needed for column-spanning cells equally over
         #   the spanned columns (skipping fixed-width columns)
-        for row in chain(self.head or [], self.body):
-            for cell in (cell for cell in row if cell.colspan > 1):
-                c = int(cell.column_index)
-                c_end = c + cell.colspan
-                extra = cell_content_width(cell) - sum(widths[c:c_end])
+        for c, colspan, cell_width in cell_widths:
+            if colspan > 1:
+                c_end = c + colspan
+                extra = cell_width[index] - sum(widths[c:c_end])
                 non_fixed_cols = [i for i in range(c, c_end)
                                   if i not in fixed_width_cols]
                 if extra > 0 and non_fixed_cols:
@@ -329,22 +391,31 @@ class Table(Flowable):
         return widths
 
     @classmethod
-    def _render_section(cls, container, rows, column_widths):
+    def _render_section(cls, container, section, start_index, column_widths):
+        """Render the rows of `section`, starting at `start_index`
+
+        The rows are rendered lazily; the rows are yielded in groups of rows
+        connected by row-spanning cells.
+
+        """
         rendered_rows = []
         rows_left_in_span = 0
-        for row in rows:
+        last_index = len(section) - 1
+        for index in range(start_index, last_index + 1):
+            row = section[index]
             rows_left_in_span = max(row.maximum_rowspan, rows_left_in_span) - 1
-            rendered_row = cls._render_row(column_widths, container, row)
+            rendered_row = cls._render_row(column_widths, container, row,
+                                           index)
             rendered_rows.append(rendered_row)
             if rows_left_in_span == 0:
-                is_last_span = row == rows[-1]
+                is_last_span = index == last_index
                 yield cls._vertically_size_cells(rendered_rows), is_last_span
                 rendered_rows = []
         assert not rendered_rows
 
     @staticmethod
-    def _render_row(column_widths, container, row):
-        rendered_row = RenderedRow(int(row._index), row)
+    def _render_row(column_widths, container, row, index):
+        rendered_row = RenderedRow(index, row)
         for cell in row:
             col_idx = int(cell.column_index)
             left = sum(column_widths[:col_idx])
@@ -437,6 +508,22 @@ class TableSection(Styled, list):
     def num_columns(self):
         return sum(cell.colspan for cell in self[0])
 
+    def row_index(self, row):
+        """Return the index of `row` in this section
+
+        The indices are looked up in a mapping that is rebuilt when it is
+        found to be out of date, avoiding a linear search for each lookup.
+
+        """
+        try:
+            index = self._row_indices[id(row)]
+            if self[index] is row:
+                return index
+        except (AttributeError, KeyError, IndexError):
+            pass
+        self._row_indices = {id(item): i for i, item in enumerate(self)}
+        return self._row_indices[id(row)]
+
 
 class TableHead(TableSection):
     pass
@@ -463,7 +550,7 @@ class TableRow(Styled, list):
 
     @property
     def _index(self):
-        return next(i for i, item in enumerate(self.parent) if item is self)
+        return self.parent.row_index(self)
 
     def get_rowspanned_columns(self):
         """Return a dictionary mapping column indices to the number of columns
@@ -472,10 +559,11 @@ class TableRow(Styled, list):
         spanned_columns = {}
         current_row_index = self._index
         current_row_cols = sum(cell.colspan for cell in self)
-        prev_rows = iter(reversed(section[:current_row_index]))
+        row_index = current_row_index
         while current_row_cols < section.num_columns:
-            row = next(prev_rows)
-            min_rowspan = current_row_index - int(row._index)
+            row_index -= 1
+            row = section[row_index]
+            min_rowspan = current_row_index - row_index
             if row.maximum_rowspan > min_rowspan:
                 for cell in (c for c in row if c.rowspan > min_rowspan):
                     col_index = int(cell.column_index)
@@ -545,8 +633,7 @@ class Index(object):
 
 class RowIndex(Index):
     def __int__(self):
-        return next(i for i, row in enumerate(self.table_section)
-                    if row is self.row)
+        return self.row._index
 
     def __iter__(self):
         index = int(self)
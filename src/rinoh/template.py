@@ -38,7 +38,8 @@ from .resource import Resource
 from .text import StyledText, Tab
 from .strings import StringCollection, Strings
 from .structure import Header, Footer, HorizontalRule, NewChapterException
-from .style import StyleSheet, Specificity, DocumentLocationType
+from .style import (StyleSheet, StyleLogMode, Specificity,
+                    DocumentLocationType)
 from .stylesheets import sphinx
 from .util import NamedDescriptor
 
@@ -195,15 +196,23 @@ class PageBase(Page, Templated):
         self.background = FlowablesContainer('background', BACKGROUND, self)
         background_image = self.background_image
         if background_image:
+            self.background.shared_content_key = (template.name,
+                                                  self.background_option)
             self.background << background_image
 
+    background_option = 'background'
+
     @property
     def background_image(self):
-        return self.get_option('background')
+        return self.get_option(self.background_option)
 
     def get_option(self, name, document=None):
         return self.get_config_value(name, document or self.document)
 
+    def release(self):
+        super().release()
+        self.background = None
+
 
 def try_copy(obj, parent=None):
     try:
@@ -228,13 +237,17 @@ class BodyPageBase(PageBase):
         self.footnote_space = FootnoteContainer('footnotes', self.body, 0*PT,
                                                 self.body.height)
         self.body._footnote_space = self.footnote_space
-        header, footer, self.content_top = self.get_header_footer_contenttop()
+        header_option, footer_option, self.content_top = \
+            self.get_header_footer_contenttop()
+        header = try_copy(self.get_option(header_option))
+        footer = try_copy(self.get_option(footer_option))
         if header:
             header_bottom = self.body.top - header_footer_distance
             self.header = UpExpandingContainer('header', HEADER_FOOTER, self,
                                                left=self.left_margin,
                                                bottom=header_bottom,
                                                width=self.body_width)
+            self.header.shared_content_key = (template.name, header_option)
             self.header.append_flowable(Header(header))
         if footer:
             footer_vpos = self.body.bottom + header_footer_distance
@@ -242,16 +255,22 @@ class BodyPageBase(PageBase):
                                                  left=self.left_margin,
                                                  top=footer_vpos,
                                                  width=self.body_width)
+            self.footer.shared_content_key = (template.name, footer_option)
             self.footer.append_flowable(Footer(footer))
 
     def get_header_footer_contenttop(self):
+        """Return the names of the header and footer text options and the top
+        of the content area"""
         max_height = self.body_height / 2
         self.float_space = DownExpandingContainer('floats', CONTENT, self.body,
                                                   0, 0, max_height=max_height)
         self.body.float_space = self.float_space
-        header = try_copy(self.get_option('header_text'))
-        footer = try_copy(self.get_option('footer_text'))
-        return header, footer, self.float_space.bottom
+        return 'header_text', 'footer_text', self.float_space.bottom
+
+    def release(self):
+        super().release()
+        self.body = self.footnote_space = self.float_space = None
+        self.header = self.footer = self.chapter_title = None
 
 
 class BodyPage(BodyPageBase):
@@ -270,20 +289,21 @@ class BodyPage(BodyPageBase):
                                          bottom=self.footnote_space.top)
                         for i in range(num_cols)]
 
+    def release(self):
+        super().release()
+        self.columns = []
+
 
 class NewChapterBodyPage(BodyPage):
-    @property
-    def background_image(self):
-        return self.get_option('after_break_background')
+    background_option = 'after_break_background'
 
     def get_header_footer_contenttop(self):
         height = self.get_option('chapter_title_height')
         self.chapter_title = FlowablesContainer('chapter title',
                                                 CHAPTER_TITLE, self.body,
                                                 0, 0, height=height)
-        header = try_copy(self.get_option('chapter_header_text'))
-        footer = try_copy(self.get_option('chapter_footer_text'))
-        return header, footer, self.chapter_title.bottom
+        return ('chapter_header_text', 'chapter_footer_text',
+                self.chapter_title.bottom)
 
     def create_chapter_title(self, heading):
         create_destination(heading.section, self.chapter_title, False)
@@ -455,6 +475,8 @@ class DocumentPart(Templated, metaclass=DocumentLocationType):
             except PageBreakException as pbe:
                 break_type = None
             page.place()
+            if self.document.page_range_rendered():
+                break
             next_page_type = 'left' if page.number % 2 else 'right'
             if not sideways_chain or sideways_chain.done:
                 sideways_float = self.document.next_sideways_float()
@@ -757,18 +779,30 @@ class DocumentTemplate(Document, AttributesDictionary, Resource,
                                                'styling document elements')
 
     parts = Attribute(PartsList, [], 'The parts making up this document')
+    style_log_mode = Attribute(StyleLogMode, 'full', 'What to write to the '
+                                                     'style log (.stylelog '
+                                                     'file)')
+    draft = Attribute(Bool, False, 'Render quickly at the expense of the '
+                                   'output quality: show placeholders for '
+                                   'images, compress less, render in a '
+                                   'single pass and skip the style log, '
+                                   'outline and links')
 
     variables = {'paper_size': A4}      # default variable values
 
-    def __init__(self, document_tree, configuration=None, backend=None):
+    def __init__(self, document_tree, configuration=None, backend=None,
+                 profiler=None):
         self.configuration = (configuration if configuration is not None
                               else self.Configuration('empty'))
         self.options = document_tree.options
         stylesheet = self.get_option('stylesheet')
         language = self.get_option('language')
         strings = self.get_option('strings')
+        style_log_mode = self.get_option('style_log_mode')
+        draft = self.get_option('draft')
         super().__init__(document_tree, stylesheet, language, strings=strings,
-                         backend=backend)
+                         backend=backend, style_log_mode=style_log_mode,
+                         draft=draft, profiler=profiler)
         parts = self.get_option('parts')
         try:
             self.part_templates = [next(self._find_templates(name))
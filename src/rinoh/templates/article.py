@@ -14,7 +14,7 @@ from ..paragraph import Paragraph
 from ..structure import TableOfContentsSection
 from ..stylesheets import sphinx_article
 from ..template import (DocumentTemplate, BodyPageTemplateBase,
-                        ContentsPartTemplate, BodyPage, try_copy, Option)
+                        ContentsPartTemplate, BodyPage, Option)
 from ..text import StyledText
 
 
@@ -66,11 +66,13 @@ class ArticleBodyPage(BodyPage):
             with suppress(KeyError):
                 self.title << metadata['abstract']
 
-        header = try_copy(self.get_option('title_page_header_text'))
-        footer = try_copy(self.get_option('title_page_footer_text'))
-        return (header, footer,
+        return ('title_page_header_text', 'title_page_footer_text',
                 self.title.bottom + self.get_option('title_spacing'))
 
+    def release(self):
+        super().release()
+        self.title = None
+
 
 class AbstractLocation(OptionSet):
     """Where to place the article's abstract"""
@@ -0,0 +1,91 @@
+# This file is part of rinohtype, the Python document preparation system.
+#
+# Copyright (c) Brecht Machiels.
+#
+# Use of this source code is subject to the terms of the GNU Affero General
+# Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
+
+
+from copy import deepcopy
+
+from rinoh.benchmark import (BenchmarkCase, SUITE, run_case, compare,
+                             environment, environment_differences,
+                             mismatched_cases, machine_independent,
+                             recorded_environment)
+
+
+CASE = BenchmarkCase('test', chapters=2, paragraphs=6, table_rows=3,
+                     images=1, footnotes=2, listings=1, index_entries=2,
+                     references=2)
+
+
+def test_scaled():
+    case = BenchmarkCase('case', paragraphs=100, images=3, footnotes=0)
+    scaled = case.scaled(0.1)
+    assert scaled.to_dict() == dict(name='case', chapters=1, paragraphs=10,
+                                    table_rows=0, images=1, footnotes=0,
+                                    listings=0, index_entries=0, references=0)
+    assert len({case.name for case in SUITE}) == len(SUITE)
+
+
+def test_run_case(tmp_path):
+    result = run_case(CASE, tmp_path).to_dict()
+    assert result['success']
+    assert result['case'] == CASE.to_dict()
+    assert result['passes'] == 2    # page references require a second pass
+    assert result['pages'] > 1
+    assert result['output_size'] == (tmp_path / 'test.pdf').stat().st_size
+    assert list(result['stages']) == ['generate', 'prepare', 'layout',
+                                      'write']
+    assert len(list(tmp_path.glob('image*.png'))) == 1
+
+
+def test_compare():
+    case = dict(time=10.0, pages=20, passes=2, pages_per_second=4.0,
+                peak_rss=100.0, output_size=1000, case=CASE.to_dict(),
+                stages=dict(layout=dict(time=9.0, peak_rss=100.0)))
+    baseline = dict(cases=dict(test=case))
+    results = deepcopy(baseline)
+    assert compare(results, baseline) == []
+    results['cases']['test'].update(time=11.0, pages_per_second=3.0)
+    results['cases']['test']['stages']['layout']['time'] = 12.0
+    regressions = compare(results, baseline, tolerance=0.2)
+    assert regressions == ['test: pages_per_second 4.0 -> 3.0 (-25%)',
+                           'test: layout time 9.0 -> 12.0 (+33%)']
+    assert compare(results, baseline, timings=False) == []
+    results['cases']['test']['output_size'] = 1500
+    assert compare(results, baseline, timings=False) == [
+        'test: output_size 1000 -> 1500 (+50%)']
+    results['cases']['test']['case']['images'] = 5     # e.g. --scale
+    assert mismatched_cases(results, baseline) == ['test']
+    assert compare(results, baseline) == []
+
+
+def test_machine_independent_baseline():
+    case = dict(time=10.0, pages=20, passes=2, pages_per_second=4.0,
+                peak_rss=100.0, output_size=1000, case=CASE.to_dict(),
+                stages=dict(layout=dict(time=9.0, peak_rss=100.0)))
+    results = dict(environment(), rinohtype='1.0', cases=dict(test=case))
+    baseline = machine_independent(results)
+    assert baseline == dict(rinohtype='1.0',
+                            cases=dict(test=dict(case=CASE.to_dict(),
+                                                 pages=20, passes=2,
+                                                 output_size=1000)))
+    assert recorded_environment(results)
+    assert not recorded_environment(baseline)
+    results = deepcopy(results)
+    results['cases']['test'].update(time=100.0, pages=30)
+    results['cases']['test']['stages']['layout']['time'] = 90.0
+    assert compare(results, baseline) == ['test: pages 20 -> 30 (+50%)']
+
+
+def test_environment_differences():
+    results = dict(environment(), cases={})
+    baseline = deepcopy(results)
+    assert environment_differences(results, baseline) == []
+    baseline.update(python='2.7.18', host='elsewhere')
+    assert environment_differences(results, baseline) == [
+        'python 2.7.18 -> {}'.format(results['python']),
+        'host elsewhere -> {}'.format(results['host'])]
+    del baseline['python'], baseline['host']    # recorded by an old version
+    assert len(environment_differences(results, baseline)) == 2
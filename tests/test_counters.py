@@ -0,0 +1,77 @@
+# This file is part of rinohtype, the Python document preparation system.
+#
+# Copyright (c) Brecht Machiels.
+#
+# Use of this source code is subject to the terms of the GNU Affero General
+# Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
+
+
+import json
+
+import pytest
+
+from rinoh.counters import COUNTERS
+from rinoh.document import DocumentTree
+from rinoh.paragraph import Paragraph
+from rinoh.structure import Heading, Section
+from rinoh.templates import Article
+
+
+def create_document():
+    sections = [Section([Heading('Section {}'.format(index)),
+                         Paragraph('A paragraph with\ta tab. ' * 60)])
+                for index in range(6)]
+    return Article(DocumentTree(sections))
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    monkeypatch.setattr(COUNTERS, 'enabled', True)
+    return COUNTERS
+
+
+def test_counters_disabled(tmp_path):
+    assert not COUNTERS.enabled
+    before = COUNTERS.snapshot()
+    document = create_document()
+    document.render(tmp_path / 'document')
+    assert document.counter_report is None
+    assert COUNTERS.snapshot() == before
+    assert not (tmp_path / 'document.counters.json').exists()
+
+
+def test_counters(tmp_path, counters, capsys):
+    document = create_document()
+    document.render(tmp_path / 'document')
+    report = document.counter_report
+    totals = report.totals
+    assert totals['style lookups'] > totals['style cache misses'] > 0
+    assert totals['match lookups'] > totals['match cache misses'] > 0
+    assert totals['selectors evaluated'] > 0
+    assert totals['style sheet lookups'] > 0
+    assert totals['exception SpaceException'] > 0
+    assert totals['exception TabException'] >= 6 * 60 * 2     # two passes
+    assert totals['exception EndOfContainer'] > 0
+    pages = [(rendering_pass, index)
+             for rendering_pass, index, _, _ in report.pages]
+    page_count = document.page_count
+    assert page_count > 1
+    assert pages == [(rendering_pass, index) for rendering_pass in (1, 2)
+                     for index in range(1, page_count + 1)]
+    page_totals = sum((counts for _, _, _, counts in report.pages),
+                      type(totals)())
+    assert page_totals['exception TabException'] \
+        == totals['exception TabException']
+    assert all(count <= totals[name]        # also counted outside of pages
+               for name, count in page_totals.items())
+
+    output = capsys.readouterr().out
+    assert 'Hot path counters:' in output
+    assert 'rendering passes: 2' in output
+    assert 'pages with the most exceptions: ' in output
+    written = json.loads((tmp_path / 'document.counters.json').read_text())
+    assert written['totals']['rendering passes'] == 2
+    assert written['totals']['exceptions']['TabException'] \
+        == totals['exception TabException']
+    assert 0 < written['totals']['style cache hit rate'] < 1
+    assert len(written['pages']) == 2 * page_count
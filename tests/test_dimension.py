@@ -8,7 +8,7 @@
 
 import pytest
 
-from rinoh.dimension import (DimensionAddition,
+from rinoh.dimension import (Dimension, DimensionAddition,
                              PT, INCH, PICA, MM, CM, PERCENT, QUARTERS)
 
 
@@ -87,6 +87,40 @@ def test_late_division():
     assert b == 6
 
 
+def test_late_cached():
+    a = 10*PT
+    b = DimensionAddition(a, 5, 2.5)
+    c = (b - 1) * 2
+    assert b.addends == [a]
+    assert c == 33
+    a.grow(2)
+    assert c == 37
+    a.reset(1)
+    assert c == 15
+
+
+def test_addition_append_pop():
+    cursor = Dimension(0)
+    height = DimensionAddition(cursor)
+    total = height + 10
+    height.append(20*PT)
+    assert total == 30
+    cursor.grow(5)
+    assert total == 35
+    assert height.pop() == 20
+    assert total == 15
+    height.append(4*PT)
+    height.truncate(1)
+    assert total == 15
+
+
+def test_nested_multiplication_folded():
+    a = 10*PT
+    b = -(a / 2)
+    assert b.multiplicand is a
+    assert b == -5
+
+
 def test_units():
     assert 4*INCH / 2 == 2*INCH
     assert 1*CM + 10*MM == 2*CM
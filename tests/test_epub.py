@@ -0,0 +1,110 @@
+# This file is part of rinohtype, the Python document preparation system.
+#
+# Copyright (c) Brecht Machiels.
+#
+# Use of this source code is subject to the terms of the GNU Affero General
+# Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
+
+
+import pickle
+
+from pathlib import Path
+from zipfile import ZipFile
+
+import pytest
+
+from rinoh.frontend.epub import EPubReader, EPubImageFile, BadEPub
+
+
+IMAGE = Path(__file__).parent.parent / 'tests_regression' / 'images' \
+            / 'title.png'
+
+CONTAINER = """<?xml version="1.0"?>
+<container version="1.0"
+           xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles>
+    <rootfile full-path="OEBPS/content.opf"
+              media-type="application/oebps-package+xml"/>
+  </rootfiles>
+</container>
+"""
+
+PACKAGE = """<?xml version="1.0"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="3.0">
+  <manifest>{}</manifest>
+  <spine>{}</spine>
+</package>
+"""
+
+CHAPTER = """<?xml version="1.0"?>
+<html xmlns="http://www.w3.org/1999/xhtml">
+  <head><title>Chapter {0}</title></head>
+  <body>
+    <p>Chapter {0}, <em>first</em> paragraph</p>
+    <p><img src="../images/title.png"/></p>
+  </body>
+</html>
+"""
+
+
+def create_epub(path, chapters):
+    items = ''.join('<item id="c{0}" href="text/ch{0}.xhtml" '
+                    'media-type="application/xhtml+xml"/>'.format(index)
+                    for index in range(chapters))
+    # the spine lists the chapters in reverse order
+    itemrefs = ''.join('<itemref idref="c{}"/>'.format(index)
+                       for index in reversed(range(chapters)))
+    with ZipFile(path, 'w') as epub:
+        epub.writestr('mimetype', 'application/epub+zip')
+        epub.writestr('META-INF/container.xml', CONTAINER)
+        epub.writestr('OEBPS/content.opf', PACKAGE.format(items, itemrefs))
+        for index in range(chapters):
+            epub.writestr('OEBPS/text/ch{}.xhtml'.format(index),
+                          CHAPTER.format(index))
+        epub.write(IMAGE, 'OEBPS/images/title.png')
+    return str(path)
+
+
+def image_file(paragraph):
+    (inline_image, ), = paragraph.content
+    return inline_image.filename_or_file
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_epub_spine_order(tmp_path, workers):
+    epub_path = create_epub(tmp_path / 'book.epub', 4)
+    flowables = EPubReader(workers=workers).parse(epub_path)
+    assert len(flowables) == 8
+    assert [flowable.content.to_string(None)[:9]
+            for flowable in flowables[::2]] \
+        == ['Chapter 3', 'Chapter 2', 'Chapter 1', 'Chapter 0']
+
+
+def test_epub_lazy_image(tmp_path):
+    epub_path = create_epub(tmp_path / 'book.epub', 1)
+    flowables = EPubReader().parse(epub_path)
+    epub_image = image_file(flowables[1])
+    assert isinstance(epub_image, EPubImageFile)
+    assert epub_image.name == 'OEBPS/images/title.png'
+    assert epub_image._file is None
+    assert epub_image.read(8) == IMAGE.read_bytes()[:8]
+    assert epub_image._file is not None
+    unpickled = pickle.loads(pickle.dumps(epub_image))
+    assert unpickled._file is None
+    assert unpickled.read() == IMAGE.read_bytes()
+
+
+def test_epub_file_object(tmp_path):
+    epub_path = create_epub(tmp_path / 'book.epub', 2)
+    with open(epub_path, 'rb') as epub_file:
+        flowables = EPubReader(workers=2).parse(epub_file)
+        assert image_file(flowables[1]).read(8) == IMAGE.read_bytes()[:8]
+    assert len(flowables) == 4
+
+
+def test_bad_epub(tmp_path):
+    path = tmp_path / 'bad.epub'
+    with ZipFile(path, 'w') as epub:
+        epub.writestr('mimetype', 'application/zip')
+    with pytest.raises(BadEPub):
+        EPubReader().parse(str(path))
@@ -0,0 +1,97 @@
+# This file is part of rinohtype, the Python document preparation system.
+#
+# Copyright (c) Brecht Machiels.
+#
+# Use of this source code is subject to the terms of the GNU Affero General
+# Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
+
+
+from copy import copy
+
+from rinoh.document import Document, DocumentTree
+from rinoh.flowable import (Flowable, GroupedFlowables,
+                            GroupedFlowablesState, StaticGroupedFlowables)
+from rinoh.image import Figure, FigureStyle
+from rinoh.paragraph import Paragraph
+from rinoh.templates import Article
+
+
+def create_flowables(count):
+    for index in range(count):
+        yield Paragraph('Paragraph {} '.format(index)
+                        + 'lorem ipsum dolor sit amet ' * 30)
+        if index > 12 and index % 4 == 3:
+            yield Figure([Paragraph('Figure {} '.format(index) + 'x ' * 400)],
+                         style=FigureStyle(float='here'))
+
+
+def test_float_local_reflow(tmp_path, monkeypatch):
+    reflows = []
+    figure_containers = []
+    register_reflow = Document.register_reflow
+    flowable_flow = Flowable.flow
+
+    def record_reflow(self, page, num_flowables=None):
+        reflows.append(num_flowables)
+        register_reflow(self, page, num_flowables)
+
+    def flow(self, container, *args, **kwargs):
+        if isinstance(self, Figure):
+            figure_containers.append(container.name)
+        return flowable_flow(self, container, *args, **kwargs)
+
+    monkeypatch.setattr(Document, 'register_reflow', record_reflow)
+    monkeypatch.setattr(Flowable, 'flow', flow)
+    flowables = list(create_flowables(32))
+    num_figures = sum(isinstance(flowable, Figure) for flowable in flowables)
+    document = Article(DocumentTree(flowables))
+    document.render(tmp_path / 'floats')
+    assert document.reflows
+    assert reflows and None not in reflows      # no complete page reflows
+    # each figure is rendered once (per rendering pass), into a float space
+    assert set(figure_containers) == {'floats'}
+    assert len(figure_containers) == 2 * num_figures
+
+
+def test_float_reflow_checkpoints_capped(tmp_path, monkeypatch):
+    num_checkpoints = []
+    figure_pages = []
+    roll_back = GroupedFlowables._roll_back
+    flowable_flow = Flowable.flow
+
+    def record_roll_back(self, container, checkpoints):
+        num_checkpoints.append(len(checkpoints))
+        return roll_back(self, container, checkpoints)
+
+    def flow(self, container, *args, **kwargs):
+        if isinstance(self, Figure):
+            figure_pages.append(container.page.number)
+        return flowable_flow(self, container, *args, **kwargs)
+
+    def render(name):
+        del num_checkpoints[:], figure_pages[:]
+        document = Article(DocumentTree(list(create_flowables(32))))
+        document.render(tmp_path / name)
+        return len(document.backend_document.pages), list(figure_pages)
+
+    monkeypatch.setattr(GroupedFlowables, '_roll_back', record_roll_back)
+    monkeypatch.setattr(Flowable, 'flow', flow)
+    uncapped = render('uncapped')
+    assert max(num_checkpoints) > 2
+    monkeypatch.setattr(GroupedFlowables, 'max_checkpoints', 2)
+    assert render('capped') == uncapped
+    assert num_checkpoints and max(num_checkpoints) <= 2
+
+
+def test_grouped_flowables_state_copy():
+    paragraphs = [Paragraph('Paragraph {}'.format(index))
+                  for index in range(3)]
+    grouped = StaticGroupedFlowables(paragraphs)
+    state = GroupedFlowablesState(grouped, grouped.flowables(None))
+    state.next_flowable()
+    state_copy = copy(state)
+    assert state_copy.flowables is state.flowables
+    assert state_copy.next_flowable() == (paragraphs[1], None)
+    assert state.next_flowable() == (paragraphs[1], None)
+    assert not state.at_end and state_copy.next_flowable()[0] is paragraphs[2]
+    assert state_copy.at_end
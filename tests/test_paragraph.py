@@ -0,0 +1,39 @@
+# This file is part of rinohtype, the Python document preparation system.
+#
+# Copyright (c) Brecht Machiels.
+#
+# Use of this source code is subject to the terms of the GNU Affero General
+# Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
+
+
+from copy import copy
+
+from rinoh.paragraph import Glyph, GlyphsSpan, Word, Space, Line
+
+
+def chars_to_glyphs(chars):
+    return [Glyph(None, 5.0, char) for char in chars]
+
+
+def test_glyphs_span():
+    span = object()
+    glyphs_span = GlyphsSpan(span, chars_to_glyphs, chars_to_glyphs('a b'))
+    assert str(glyphs_span) == 'a b'
+    assert glyphs_span.width == 15
+    assert glyphs_span.number_of_spaces == 1
+    duplicate = copy(glyphs_span)
+    assert duplicate == glyphs_span
+    assert duplicate.span is span
+    assert duplicate.space is glyphs_span.space
+    assert duplicate.chars_to_glyphs is chars_to_glyphs
+
+
+def test_line_parts_have_no_instance_dict():
+    glyphs_span = GlyphsSpan(None, chars_to_glyphs, chars_to_glyphs('ab'))
+    word = Word([glyphs_span])
+    space = Space(None, chars_to_glyphs)
+    line = Line([], 100, None)
+    assert str(word) == 'ab' and word.width == 10
+    assert space.width == 5
+    for obj in (glyphs_span, word, space, line, glyphs_span[0]):
+        assert not hasattr(obj, '__dict__')
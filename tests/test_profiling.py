@@ -0,0 +1,117 @@
+# This file is part of rinohtype, the Python document preparation system.
+#
+# Copyright (c) Brecht Machiels.
+#
+# Use of this source code is subject to the terms of the GNU Affero General
+# Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
+
+
+import json
+import tracemalloc
+
+from rinoh.document import DocumentTree
+from rinoh.paragraph import Paragraph
+from rinoh.profiling import (Profiler, NullProfiler, MemoryProfiler,
+                             create_profiler, module_name)
+from rinoh.structure import Heading, Section
+from rinoh.templates import Article
+
+
+def create_document(profiler=None):
+    sections = [Section([Heading('Section {}'.format(index)),
+                         Paragraph('A paragraph. ' * 40),
+                         Paragraph('Another paragraph. ' * 40)])
+                for index in range(5)]
+    return Article(DocumentTree(sections), profiler=profiler)
+
+
+def phase_names(node):
+    return [child['name'] for child in node['children']]
+
+
+def test_create_profiler(monkeypatch):
+    monkeypatch.delenv('RINOH_PROFILE', raising=False)
+    assert isinstance(create_profiler(), NullProfiler)
+    assert isinstance(create_profiler(True), Profiler)
+    monkeypatch.setenv('RINOH_PROFILE', '1')
+    assert isinstance(create_profiler(), Profiler)
+    assert isinstance(create_document().profiler, Profiler)
+    memory_profiler = create_profiler(memory=True)
+    assert isinstance(memory_profiler, MemoryProfiler)
+    memory_profiler.stop()
+
+
+def test_profile_disabled(tmp_path, monkeypatch):
+    monkeypatch.delenv('RINOH_PROFILE', raising=False)
+    document = create_document()
+    assert isinstance(document.profiler, NullProfiler)
+    document.render(tmp_path / 'document')
+    assert not list(tmp_path.glob('*.json'))
+
+
+def test_profile(tmp_path):
+    profiler = Profiler()
+    with profiler.phase('parse'):
+        document = create_document(profiler)
+    document.render(tmp_path / 'document')
+    report = json.loads((tmp_path / 'document.profile.json').read_text())
+    phases = report['phases']
+    assert phase_names(phases) == ['parse', 'build_document', 'prepare',
+                                   'pass 1', 'pass 2', 'outlines',
+                                   'cache and style log', 'write']
+    pass_1 = phases['children'][3]
+    assert phase_names(pass_1) == ['part contents']   # no title, no TOC
+    contents, = pass_1['children']
+    assert phase_names(contents) == ['layout', 'place', 'compress']
+    assert contents['children'][0]['calls'] == contents['children'][1]['calls']
+    assert phases['wall'] >= pass_1['wall'] >= contents['wall']
+    flowables = report['flowables']
+    assert flowables['Paragraph']['calls'] >= 10
+    assert flowables['Paragraph']['self_wall'] <= flowables['Paragraph']['wall']
+    section = flowables['Section']
+    assert section['self_wall'] < section['wall']
+
+    speedscope = json.loads((tmp_path / 'document.speedscope.json')
+                            .read_text())
+    frames = [frame['name'] for frame in speedscope['shared']['frames']]
+    profile, = speedscope['profiles']
+    stack = []
+    for event in profile['events']:     # the events are properly nested
+        if event['type'] == 'O':
+            stack.append(event['frame'])
+        else:
+            assert stack.pop() == event['frame']
+    assert not stack
+    assert frames[profile['events'][0]['frame']] == 'parse'
+
+
+def test_memory_report(tmp_path):
+    profiler = MemoryProfiler(top=5)
+    assert tracemalloc.is_tracing()
+    document = create_document(profiler)
+    document.render(tmp_path / 'document')
+    assert not tracemalloc.is_tracing()
+    assert not (tmp_path / 'document.profile.json').exists()
+    report = json.loads((tmp_path / 'document.memory.json').read_text())
+    phases = report['phases']
+    assert phase_names(phases) == ['build_document', 'prepare', 'pass 1',
+                                   'pass 2', 'outlines', 'cache and style log',
+                                   'write']
+    pass_1 = phases['children'][2]
+    assert pass_1['peak'] > 0
+    assert 0 < len(pass_1['top_modules']) <= 5
+    assert all('size' in top and 'count' in top
+               for top in pass_1['top_modules'])
+    assert 'builtins.dict' in [top['type'] for top in pass_1['top_types']]
+    contents, = pass_1['children']
+    assert contents['name'] == 'part contents'
+    assert contents['top_types']
+    layout = contents['children'][0]        # not snapshotted, too deep
+    assert layout['name'] == 'layout' and 'top_modules' not in layout
+    assert phases['peak'] >= pass_1['peak'] >= contents['peak']
+
+
+def test_module_name():
+    import rinoh.profiling
+    assert module_name(rinoh.profiling.__file__) == 'rinoh/profiling.py'
+    assert module_name('/no/such/file.py') == '/no/such/file.py'
@@ -0,0 +1,106 @@
+# This file is part of rinohtype, the Python document preparation system.
+#
+# Copyright (c) Brecht Machiels.
+#
+# Use of this source code is subject to the terms of the GNU Affero General
+# Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
+
+
+import pytest
+
+from rinoh.paragraph import Paragraph
+from rinoh.frontend.rst import ReStructuredTextReader, DoctreeCache
+
+
+DOCUMENT = """\
+Title
+=====
+
+A paragraph with *emphasis*.
+
+.. include:: included.rst
+"""
+
+
+@pytest.fixture
+def cache_directory(tmp_path, monkeypatch):
+    directory = tmp_path / 'cache'
+    monkeypatch.setattr(DoctreeCache, 'default_directory',
+                        staticmethod(lambda: directory))
+    return directory
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'document.rst'
+    path.write_text(DOCUMENT)
+    (tmp_path / 'included.rst').write_text('Included paragraph.\n')
+    return path
+
+
+@pytest.fixture
+def publish_count(monkeypatch):
+    import rinoh.frontend.rst as rst
+    count = []
+    publish_doctree = rst.publish_doctree
+
+    def counting_publish_doctree(*args, **kwargs):
+        count.append(1)
+        return publish_doctree(*args, **kwargs)
+
+    monkeypatch.setattr(rst, 'publish_doctree', counting_publish_doctree)
+    return count
+
+
+def texts(flowable):
+    return [child.content.to_string(None) for child in flowable.children
+            if isinstance(child, Paragraph)]
+
+
+def test_doctree_cache(source, cache_directory, publish_count):
+    reader = ReStructuredTextReader(doctree_cache=True)
+    first = reader.parse(str(source))
+    assert len(publish_count) == 1
+    assert len(list(cache_directory.iterdir())) == 1
+    second = reader.parse(str(source))
+    assert len(publish_count) == 1
+    assert texts(first) == texts(second) \
+        == ['A paragraph with emphasis.', 'Included paragraph.']
+
+
+def test_doctree_cache_source_changed(source, cache_directory,
+                                      publish_count):
+    reader = ReStructuredTextReader(doctree_cache=True)
+    reader.parse(str(source))
+    source.write_text(DOCUMENT.replace('A paragraph', 'Another paragraph'))
+    flowable = reader.parse(str(source))
+    assert len(publish_count) == 2
+    assert texts(flowable)[0] == 'Another paragraph with emphasis.'
+
+
+def test_doctree_cache_include_changed(source, cache_directory,
+                                       publish_count):
+    reader = ReStructuredTextReader(doctree_cache=True)
+    reader.parse(str(source))
+    (source.parent / 'included.rst').write_text('Changed paragraph.\n')
+    flowable = reader.parse(str(source))
+    assert len(publish_count) == 2
+    assert texts(flowable)[1] == 'Changed paragraph.'
+
+
+def test_doctree_cache_disabled(source, cache_directory, publish_count):
+    reader = ReStructuredTextReader()
+    reader.parse(str(source))
+    reader.parse(str(source))
+    assert len(publish_count) == 2
+    assert not cache_directory.exists()
+
+
+def test_doctree_cache_corrupt(source, cache_directory, publish_count):
+    reader = ReStructuredTextReader(doctree_cache=True)
+    reader.parse(str(source))
+    cache_file, = cache_directory.iterdir()
+    cache_file.write_bytes(b'garbage')
+    flowable = reader.parse(str(source))
+    assert len(publish_count) == 2
+    assert texts(flowable)[0] == 'A paragraph with emphasis.'
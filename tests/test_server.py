@@ -0,0 +1,160 @@
+# This file is part of rinohtype, the Python document preparation system.
+#
+# Copyright (c) Brecht Machiels.
+#
+# Use of this source code is subject to the terms of the GNU Affero General
+# Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
+
+
+import json
+import multiprocessing
+import os
+
+from http.client import HTTPConnection
+from threading import Thread
+from urllib.error import HTTPError
+from urllib.request import urlopen, Request
+
+import pytest
+
+from rinoh.job import RenderJob, ResourceCache, render_many
+from rinoh.server import create_server, parse_address
+
+
+RST = '''\
+Title
+=====
+
+A paragraph of text.
+'''
+
+STYLESHEET = '''\
+[STYLESHEET]
+name = Test Style Sheet
+base = sphinx
+'''
+
+
+@pytest.fixture
+def server():
+    server = create_server('localhost:0')
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def request(server, path, data=None):
+    host, port = server.server_address[:2]
+    url = 'http://{}:{}{}'.format(host, port, path)
+    body = None if data is None else json.dumps(data).encode('utf-8')
+    try:
+        with urlopen(Request(url, data=body)) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+def test_parse_address():
+    assert parse_address('localhost:8000') == ('localhost', 8000)
+    assert parse_address('8000') == ('localhost', 8000)
+    assert parse_address('/tmp/rinoh.sock') == '/tmp/rinoh.sock'
+    with pytest.raises(ValueError):
+        parse_address('localhost')
+
+
+def test_resource_cache(tmp_path):
+    (tmp_path / 'test.rts').write_text(STYLESHEET)
+    cache = ResourceCache()
+    job = RenderJob('doc.rst', stylesheet='test.rts', directory=tmp_path)
+    stylesheet = job.template_configuration(cache)['stylesheet']
+    assert stylesheet.name == 'Test Style Sheet'
+    assert job.template_configuration(cache)['stylesheet'] is stylesheet
+    assert len(cache) == 1
+
+
+def test_render_job(server, tmp_path):
+    (tmp_path / 'doc.rst').write_text(RST)
+    status, result = request(server, '/render',
+                             dict(input='doc.rst', directory=str(tmp_path)))
+    assert status == 200
+    assert result['success']
+    assert result['output'] == str(tmp_path / 'doc.pdf')
+    assert (tmp_path / 'doc.pdf').exists()
+    status, result = request(server, '/status')
+    assert result['jobs'] == 1
+
+
+def test_render_job_errors(server, tmp_path):
+    status, result = request(server, '/render', dict(input='missing.rst',
+                                                     directory=str(tmp_path)))
+    assert status == 200
+    assert not result['success']
+    assert 'No such file' in result['error']
+    status, result = request(server, '/render', dict(unknown_argument=1))
+    assert status == 400
+    (tmp_path / 'doc.rst').write_text(RST)
+    status, result = request(server, '/render',
+                             dict(input='doc.rst', template='nonexistent',
+                                  directory=str(tmp_path)))
+    assert not result['success']
+    assert result['error'] == "Template 'nonexistent' not installed"
+
+
+@pytest.mark.parametrize('length', ['abc', '-1'])
+def test_invalid_content_length(server, length):
+    connection = HTTPConnection(*server.server_address[:2])
+    connection.putrequest('POST', '/render')
+    connection.putheader('Content-Length', length)
+    connection.endheaders(b'{}')
+    response = connection.getresponse()
+    assert response.status == 400
+    connection.close()
+    status, result = request(server, '/status')     # the server still works
+    assert status == 200
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_render_many(tmp_path, workers):
+    for name in ('one', 'two', 'three'):
+        (tmp_path / (name + '.rst')).write_text(RST)
+    jobs = [RenderJob(name + '.rst', directory=tmp_path)
+            for name in ('one', 'two', 'missing', 'three')]
+    results = render_many(jobs, workers=workers)
+    assert [result.success for result in results] == [True, True, False, True]
+    assert results[0].output == tmp_path / 'one.pdf'
+    assert 'No such file' in results[2].error
+    assert 'Writing output' in results[3].log
+    statistics = results.statistics()
+    assert statistics['jobs'] == 4
+    assert statistics['failed'] == 1
+    assert statistics['workers'] == workers
+
+
+def test_render_many_warnings(tmp_path):
+    (tmp_path / 'image.rst').write_text(RST + '\n.. image:: missing.png\n')
+    result, = render_many([RenderJob('image.rst', directory=tmp_path)],
+                          workers=1)
+    assert 'Error opening image file' in result.log
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                    reason='the worker processes need to be forked')
+def test_render_many_broken_worker(tmp_path, monkeypatch):
+    def render(job, cache=None):
+        if job.input.stem == 'crash':
+            os._exit(1)             # terminate the worker process abruptly
+        return original_render(job, cache)
+
+    original_render = RenderJob.render
+    monkeypatch.setattr(RenderJob, 'render', render)
+    for name in ('one', 'crash', 'two'):
+        (tmp_path / (name + '.rst')).write_text(RST)
+    jobs = [RenderJob(name + '.rst', directory=tmp_path)
+            for name in ('one', 'crash', 'two')]
+    results = render_many(jobs, workers=2)
+    assert len(results) == 3
+    assert not results[1].success
+    assert results[1].error.startswith('BrokenProcessPool')
+    assert all(result.success or result.error for result in results)
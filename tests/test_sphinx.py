@@ -7,6 +7,7 @@
 
 
 import logging
+import os
 
 from pathlib import Path
 
@@ -18,8 +19,10 @@ from sphinx.errors import SphinxError
 from sphinx.util.docutils import docutils_namespace
 from sphinx.util.i18n import format_date
 
+from rinoh import __version__ as rinoh_version
 from rinoh.document import DocumentTree
-from rinoh.frontend.sphinx import variable_removed_warnings
+from rinoh.frontend.sphinx import (variable_removed_warnings, BuildInfo,
+                                   file_digest, rule_set_files)
 from rinoh.language import IT
 from rinoh.paper import A4
 from rinoh.templates import Book, Article
@@ -393,3 +396,66 @@ def test_sphinx_titles(caplog, tmp_path):
                             rinoh_documents=rinoh_documents)
     titles = app.builder.titles
     assert titles == [('index', "Title"), ('other/', "Other Title")]
+
+
+def test_sphinx_parallel_write(tmp_path, monkeypatch):
+    rinoh_documents = [document_data_dict(doc='a', target='first'),
+                       document_data_dict(doc='b', target='second')]
+    app = create_sphinx_app(tmp_path, rinoh_documents=rinoh_documents)
+    app.parallel = 2
+    app.builder.parallel_ok = True
+    written_path = tmp_path / 'written'
+    written_path.mkdir()
+
+    def write_document(entry):      # called in the forked worker processes
+        (written_path / entry['target']).write_text(str(os.getpid()))
+
+    monkeypatch.setattr(app.builder, 'write_document', write_document)
+    app.builder.write()
+    pids = {path.name: path.read_text() for path in written_path.iterdir()}
+    assert sorted(pids) == ['first', 'second']
+    assert str(os.getpid()) not in pids.values()
+
+
+def test_sphinx_build_info(tmp_path):
+    rinoh_document = document_data_dict()
+    app = create_sphinx_app(tmp_path, rinoh_documents=[rinoh_document])
+    builder = app.builder
+    stylesheet_path = tmp_path / 'confdir' / 'style.rts'
+    stylesheet_path.write_text('[STYLESHEET]\nname=Test\nbase=sphinx\n')
+    build_info = BuildInfo(builder.outdir)
+    fingerprint = dict(rinohtype=rinoh_version,
+                       config=builder.config_digest(rinoh_document),
+                       docs={'index': 0},
+                       files={str(stylesheet_path):
+                                  file_digest(stylesheet_path)})
+    build_info.record('rinoh_doc', fingerprint)
+    assert not build_info.is_up_to_date('rinoh_doc', builder)    # no output
+    (Path(builder.outdir) / 'rinoh_doc.pdf').touch()
+    assert build_info.is_up_to_date('rinoh_doc', builder)
+    build_info.save()
+
+    stored_build_info = BuildInfo(builder.outdir)
+    stored_build_info.load()
+    assert stored_build_info == build_info
+
+    app.env.all_docs['index'] = 1
+    assert not build_info.is_up_to_date('rinoh_doc', builder)
+    app.env.all_docs['index'] = 0
+    stylesheet_path.write_text('[STYLESHEET]\nname=Changed\nbase=sphinx\n')
+    assert not build_info.is_up_to_date('rinoh_doc', builder)
+    build_info.record('rinoh_doc', None)
+    assert not build_info.is_up_to_date('rinoh_doc', builder)
+
+
+def test_sphinx_rule_set_files(tmp_path):
+    app = create_sphinx_app(tmp_path)
+    confdir = tmp_path / 'confdir'
+    (confdir / 'style.rts').write_text('[STYLESHEET]\nname=Test\n'
+                                       'base=sphinx\n')
+    (confdir / 'template.rtt').write_text('[TEMPLATE_CONFIGURATION]\n'
+                                          'template=book\n'
+                                          'stylesheet=style.rts\n')
+    template_cfg = app.builder.template_configuration('template.rtt', LOGGER)
+    files = [path.name for path in rule_set_files(template_cfg)]
+    assert files == ['template.rtt', 'style.rts', 'sphinx.rts']
@@ -16,7 +16,7 @@ from rinoh.flowable import GroupedFlowables, StaticGroupedFlowables
 from rinoh.font import FontWeight, FontSlant, FontWidth
 from rinoh.language import EN
 from rinoh.paragraph import Paragraph, ParagraphStyle
-from rinoh.text import StyledText, SingleStyledText
+from rinoh.text import StyledText, SingleStyledText, MixedStyledText
 from rinoh.style import StyleSheet, StyledMatcher, PARENT_STYLE, NEXT_STYLE
 
 emphasis_selector = StyledText.like('emphasis')
@@ -286,3 +286,38 @@ def test_variable():
     assert paragraph4.get_style('text_align', container) == 'right'
     assert paragraph4.get_style('font_color', container) == HexColor('f00')
     assert paragraph4.get_style('indent_first', container) == 0.5*CM
+
+
+def test_get_style_cached_per_document(monkeypatch):
+    lookups = []
+    get_config_value = Paragraph.get_config_value
+
+    def counting_get_config_value(self, attribute, document):
+        lookups.append(attribute)
+        return get_config_value(self, attribute, document)
+
+    monkeypatch.setattr(Paragraph, 'get_config_value',
+                        counting_get_config_value)
+    document = Document(doctree, ssheet2, EN)
+    for container in (FakeContainer(document), FakeContainer(document)):
+        assert paragraph3.get_style('margin_left', container) == 1*PT
+    assert lookups == ['margin_left']
+    other_document = Document(doctree, ssheet1, EN)
+    assert paragraph3.get_style('margin_left',
+                                FakeContainer(other_document)) == 0
+    assert lookups == ['margin_left', 'margin_left']
+
+
+def test_get_style_inherited_from_new_parent():
+    """A heading's number label is also placed in references to the heading;
+    the values it inherits depend on where it was placed last"""
+    document = Document(doctree, ssheet2, EN)
+    container = FakeContainer(document)
+    label_text = SingleStyledText('2A')
+    label = MixedStyledText([label_text])
+    Paragraph(label)
+    assert label_text.get_style('font_size', container) == 8*PT
+    MixedStyledText([label], style='highlight2')
+    assert label_text.get_style('font_size', container) == 12*PT
+    Paragraph(label)
+    assert label_text.get_style('font_size', container) == 8*PT
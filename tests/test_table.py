@@ -0,0 +1,127 @@
+# This file is part of rinohtype, the Python document preparation system.
+#
+# Copyright (c) Brecht Machiels.
+#
+# Use of this source code is subject to the terms of the GNU Affero General
+# Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
+
+
+import pytest
+
+from rinoh.document import DocumentTree
+from rinoh.flowable import StaticGroupedFlowables
+from rinoh.paragraph import Paragraph
+from rinoh.reference import Field, PAGE_NUMBER, Note, NoteMarkerWithNote
+from rinoh.table import (Table, TableStyle, TableHead, TableBody, TableRow,
+                         TableCell)
+from rinoh.text import MixedStyledText
+from rinoh.templates import Article
+
+
+def cell(text):
+    return TableCell([Paragraph(text)])
+
+
+def create_table(rows, head=None, style=None):
+    def section_rows(rows):
+        return [TableRow([cell(text) for text in row]) for row in rows]
+
+    return Table(TableBody(section_rows(rows)),
+                 head=TableHead(section_rows(head)) if head else None,
+                 style=style)
+
+
+@pytest.fixture
+def measured_cells(monkeypatch):
+    """Records the cells flowed into a container that is never placed"""
+    measured = []
+    flow = TableCell.flow
+
+    def recording_flow(self, container, *args, **kwargs):
+        if container.never_placed:
+            measured.append(self)
+        return flow(self, container, *args, **kwargs)
+
+    monkeypatch.setattr(TableCell, 'flow', recording_flow)
+    return measured
+
+
+def count(cells, cell):
+    return sum(item is cell for item in cells)
+
+
+def render(tmp_path, *flowables):
+    document = Article(DocumentTree(list(flowables)))
+    document.render(tmp_path / 'table')
+    return document
+
+
+def test_cell_widths_measured_once(tmp_path, measured_cells):
+    table = create_table([['a', 'a somewhat longer cell'],
+                          ['a cell', 'b']])
+    document = render(tmp_path, table)
+    cells = [cell for row in table.body for cell in row]
+    # minimum and maximum width, measured in the first rendering pass only
+    assert all(count(measured_cells, cell) == 2 for cell in cells)
+    (minimum, maximum), = document.cell_widths[cells[1]].values()
+    assert 0 < minimum < maximum
+
+
+def test_page_dependent_cell_widths(tmp_path, measured_cells):
+    page_number_cell = TableCell([Paragraph(Field(PAGE_NUMBER))])
+    table = Table(TableBody([TableRow([cell('static'), page_number_cell])]))
+    document = render(tmp_path, table)
+    static_cell = table.body[0][0]
+    assert count(measured_cells, static_cell) == 2
+    assert count(measured_cells, page_number_cell) > 2
+    assert page_number_cell not in document.cell_widths
+
+
+
+def test_streaming_table(tmp_path, measured_cells):
+    style = TableStyle(streaming=True, sample_rows=5, repeat_head=True)
+    table = create_table([['row {}'.format(index), 'cell {}'.format(index)]
+                          for index in range(80)],
+                         head=[['Index', 'Value']], style=style)
+    document = render(tmp_path, table)
+    head_cells = list(table.head[0])
+    body_cells = [cell for row in table.body for cell in row]
+    assert all(count(measured_cells, cell) == 2
+               for cell in head_cells + body_cells[:10])
+    assert not any(count(measured_cells, cell) for cell in body_cells[10:])
+    page_count, = document.part_page_counts.values()
+    assert page_count.count > 1
+
+
+def test_footnote_in_table_cell(tmp_path, monkeypatch):
+    """A row whose footnote doesn't fit on the page moves to the next page,
+    along with its footnote"""
+    row_pages, note_pages = {}, []
+    place_rows = Table._place_rows_and_render_borders
+    note_flow = Note.flow
+
+    def recording_place_rows(container, rendered_rows):
+        for rendered_row in rendered_rows:
+            row_pages[rendered_row.index] = container.page.number
+        return place_rows(container, rendered_rows)
+
+    def recording_note_flow(self, container, *args, footnote=False, **kwargs):
+        result = note_flow(self, container, *args, footnote=footnote,
+                           **kwargs)
+        if footnote:
+            note_pages.append(container.page.number)
+        return result
+
+    monkeypatch.setattr(Table, '_place_rows_and_render_borders',
+                        staticmethod(recording_place_rows))
+    monkeypatch.setattr(Note, 'flow', recording_note_flow)
+    note = Note(StaticGroupedFlowables([Paragraph('A long footnote. ' * 150)]))
+    marker_cell = TableCell([Paragraph(MixedStyledText(['with a footnote',
+                                                        NoteMarkerWithNote(note)
+                                                        ]))])
+    table = Table(TableBody([TableRow([cell('first'), cell('row')]),
+                             TableRow([cell('second'), marker_cell]),
+                             TableRow([cell('third'), cell('row')])]))
+    render(tmp_path, Paragraph('Filler text. ' * 400), table)
+    assert row_pages == {0: 1, 1: 2, 2: 2}
+    assert note_pages[-1] == 2
@@ -12,13 +12,19 @@ import pytest
 
 from rinoh import register_template
 from rinoh.attribute import Attribute, Bool, Var, OverrideDefault
+from rinoh.backend.pdf.reader import PDFReader
 from rinoh.dimension import PT
 from rinoh.document import DocumentTree
+from rinoh.image import Image
+from rinoh.layout import _FlowablesContainer
 from rinoh.paper import A5
-from rinoh.reference import (Field, SECTION_NUMBER, SECTION_TITLE, PAGE_NUMBER,
-                             NUMBER_OF_PAGES)
+from rinoh.paragraph import Paragraph, StaticParagraph
+from rinoh.reference import (Field, Reference, SECTION_NUMBER, SECTION_TITLE,
+                             PAGE_NUMBER, NUMBER_OF_PAGES)
 from rinoh.template import (DocumentTemplate, BodyPageTemplate,
                             ContentsPartTemplate, TemplateConfigurationFile)
+from rinoh.structure import Heading, Section
+from rinoh.templates import Article
 from rinoh.text import SingleStyledText
 
 
@@ -207,3 +213,200 @@ def test_template_configuration_var2():
     page = part.new_page(1, part.chain, new_chapter=False)
     assert page.template_name == 'contents_page'
     assert page.get_config_value('page_size', doc) == A5
+
+
+def render_with_style_log(tmp_path, mode):
+    conf = Article.Configuration('test', style_log_mode=mode)
+    paragraphs = [Paragraph('Paragraph {}'.format(index))
+                  for index in range(3)]
+    document = Article(DocumentTree(paragraphs), configuration=conf)
+    document.render(tmp_path / 'document')
+    log_path = tmp_path / 'document.stylelog'
+    return log_path.read_text() if log_path.exists() else None
+
+
+def test_style_log_full(tmp_path):
+    log = render_with_style_log(tmp_path, 'full')
+    assert log.startswith('-' * 34 + ' page 1 ')
+    assert "  Paragraph('Paragraph 2')" in log
+
+
+def test_style_log_summary(tmp_path):
+    log = render_with_style_log(tmp_path, 'summary')
+    assert "Paragraph('" not in log
+    assert any(line.split() == ['3', 'body'] for line in log.splitlines())
+
+
+def test_style_log_off(tmp_path):
+    assert render_with_style_log(tmp_path, 'off') is None
+
+
+def test_shared_header_footer(tmp_path, monkeypatch):
+    conf = Article.Configuration('test')
+    conf('contents_page', header_text=SingleStyledText('Confidential'),
+         footer_text=SingleStyledText('Draft'))
+    flowed = []
+    flow = StaticParagraph.flow
+
+    def counting_flow(flowable, container, *args, **kwargs):
+        flowed.append(type(flowable).__name__)
+        return flow(flowable, container, *args, **kwargs)
+
+    monkeypatch.setattr(StaticParagraph, 'flow', counting_flow)
+    paragraphs = [Paragraph('Paragraph {} '.format(index) * 100)
+                  for index in range(30)]
+    document = Article(DocumentTree(paragraphs), configuration=conf)
+    document.render(tmp_path / 'document')
+    assert len(document.shared_content) == 2
+    assert len(document.backend_document.pages) > 3
+    # flowed once for all pages, in each of the two rendering passes
+    assert flowed.count('Header') == 2
+    assert flowed.count('Footer') == 2 + 2      # the title page's footer
+    assert b'/Subtype /Form' in (tmp_path / 'document.pdf').read_bytes()
+
+    # the shared headers and footers are logged for each page
+    monkeypatch.setattr(_FlowablesContainer, 'shared_content_key',
+                        property(lambda self: None, lambda self, key: None))
+    document = Article(DocumentTree(paragraphs), configuration=conf)
+    document.render(tmp_path / 'unshared')
+    assert not document.shared_content
+    stylelog = (tmp_path / 'document.stylelog').read_text()
+    assert stylelog.count('Header(') > 3
+    assert stylelog == (tmp_path / 'unshared.stylelog').read_text()
+
+
+def test_placed_pages_released(tmp_path):
+    paragraphs = [Paragraph('Paragraph {} '.format(index) * 100)
+                  for index in range(20)]
+    document = Article(DocumentTree(paragraphs))
+    document.render(tmp_path / 'document')
+    backend_pages = document.backend_document.pages
+    assert len(backend_pages) > 2
+    for backend_page in backend_pages:
+        page = backend_page.rinoh_page
+        assert backend_page.canvas is None
+        assert 'Contents' in backend_page.cos_page
+        assert page.children == [] and page.canvas is None
+        assert page.body is None and page.columns == []
+
+
+def test_render_page_range(tmp_path):
+    def create_document():
+        paragraphs = [Paragraph('Paragraph {} '.format(index) * 100)
+                      for index in range(20)]
+        return Article(DocumentTree(paragraphs))
+
+    document = create_document()
+    document.render(tmp_path / 'document')
+    num_pages = len(document.backend_document.pages)
+    assert num_pages > 4
+    document = create_document()
+    document.render(tmp_path / 'document', pages=(2, 3))
+    assert [page.number for page in document.backend_document.pages] == [2, 3]
+    assert document.page_count == 3                 # stopped after page 3
+    assert (tmp_path / 'document.pages2-3.pdf').exists()
+    cos_pages = document.backend_document.cos_document.catalog['Pages']
+    assert len(cos_pages['Kids']) == cos_pages['Count'] == 2
+
+
+IMAGES_PATH = Path(__file__).parent.parent / 'tests_regression' / 'images'
+
+
+CORE_FONTS = {'Times-Roman', 'Times-Bold', 'Times-Italic', 'Times-BoldItalic',
+              'Helvetica', 'Helvetica-Bold', 'Helvetica-Oblique',
+              'Helvetica-BoldOblique', 'Courier', 'Courier-Bold',
+              'Courier-Oblique', 'Courier-BoldOblique', 'Symbol',
+              'ZapfDingbats'}
+
+
+def all_fonts_usable(pdf):
+    """Whether the fonts used in `pdf` are either embedded or core fonts"""
+    def is_embedded(font):
+        if 'DescendantFonts' in font:       # CID-keyed (glyph IDs)
+            font = font['DescendantFonts'][0]
+        elif str(font['BaseFont']) in CORE_FONTS:
+            return True
+        descriptor = font['FontDescriptor']
+        return any(key in descriptor
+                   for key in ('FontFile', 'FontFile2', 'FontFile3'))
+
+    def pages(node):
+        if 'Kids' in node:
+            for kid in node['Kids'].children():
+                yield from pages(kid)
+        else:
+            yield node
+
+    fonts = [font for page in pages(pdf.catalog['Pages'])
+             for font in page['Resources']['Font'].children()]
+    return fonts and all(is_embedded(font) for font in fonts)
+
+
+@pytest.mark.parametrize('draft', [False, True])
+def test_draft(tmp_path, draft):
+    conf = Article.Configuration('test', draft=draft)
+    flowables = [Paragraph('Paragraph {} '.format(index) * 100)
+                 for index in range(6)]
+    image_paths = [IMAGES_PATH / 'title.png', IMAGES_PATH / 'lensinfo.jpg']
+    flowables[2:2] = [Image(path, width=100*PT) for path in image_paths]
+    document = Article(DocumentTree(flowables), configuration=conf)
+    document.render(tmp_path / 'document')
+    pdf = (tmp_path / 'document.pdf').read_bytes()
+    assert (b'/Subtype /Image' not in pdf) == draft
+    assert all_fonts_usable(PDFReader(str(tmp_path / 'document.pdf')))
+    assert (b'/Outlines' not in pdf) == draft
+    assert (tmp_path / 'document.stylelog').exists() != draft
+    assert (tmp_path / 'document.rtc').exists() != draft
+
+
+def test_page_range_outlines(tmp_path):
+    def create_document():
+        sections = [Section([Heading('Section {}'.format(index)),
+                             Paragraph('Paragraph {} '.format(index) * 300)])
+                    for index in range(8)]
+        return Article(DocumentTree(sections))
+
+    def outline_titles_and_dests(outline):
+        if 'First' not in outline:
+            return
+        entry = outline['First']
+        while True:
+            yield str(entry['Title']), entry['Dest']
+            yield from outline_titles_and_dests(entry)
+            if 'Next' not in entry:
+                break
+            entry = entry['Next']
+
+    create_document().render(tmp_path / 'document')
+    create_document().render(tmp_path / 'document', pages=(4, 5))
+    pdf = PDFReader(str(tmp_path / 'document.pages4-5.pdf'))
+    outlines = list(outline_titles_and_dests(pdf.catalog['Outlines']))
+    assert 0 < len(outlines) < 8
+    assert all(dest in pdf.dests for _, dest in outlines)
+
+
+def test_page_range_links(tmp_path):
+    def create_document():
+        sections = [Section([Heading('Section {}'.format(index)),
+                             Paragraph(['See section ',
+                                        Reference('section-0'), ' and ',
+                                        Reference('section-{}'.format(index)),
+                                        '. ' + 'Filler text. ' * 300])],
+                            id='section-{}'.format(index))
+                    for index in range(8)]
+        return Article(DocumentTree(sections))
+
+    def link_dests(pdf):
+        for page in pdf.catalog['Pages']['Kids'].children():
+            for annotation in page.get('Annots', ()):
+                yield annotation['Dest']
+
+    create_document().render(tmp_path / 'document')
+    full_pdf = PDFReader(str(tmp_path / 'document.pdf'))
+    assert all(dest in full_pdf.dests for dest in link_dests(full_pdf))
+    create_document().render(tmp_path / 'document', pages=(4, 5))
+    pdf = PDFReader(str(tmp_path / 'document.pages4-5.pdf'))
+    dests = list(link_dests(pdf))
+    assert dests        # the links to the sections in the range are kept
+    assert all(dest in pdf.dests for dest in dests)
+    assert 'section-0' not in [str(dest) for dest in dests]
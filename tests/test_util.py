@@ -11,7 +11,9 @@ import pytest
 from rinoh import register_template, register_typeface
 from rinoh.font import Typeface
 from rinoh.fonts.adobe14 import helvetica
+from rinoh.resource import ResourceIndex, find_entry_points
 from rinoh.template import DocumentTemplate
+from rinoh.templates import Article
 
 
 class MyTemplate(DocumentTemplate):
@@ -56,3 +58,39 @@ def test_dynamic_entry_point_conflict():
     with pytest.raises(ValueError) as exc:
         register_typeface('another_typeface', helvetica)
     assert "using 'register_typeface" in str(exc.value)
+
+
+def test_resource_index_scans_once(monkeypatch):
+    index = ResourceIndex()
+    scans = []
+    original_scan = index._scan
+    monkeypatch.setattr(index, '_scan',
+                        lambda: scans.append(1) or original_scan())
+    article, = (ep for ep, _ in index.lookup('rinoh.templates')
+                if ep.name == 'article')
+    assert article.load() is Article
+    index.lookup('rinoh.typefaces')
+    assert len(scans) == 1
+    index.invalidate()
+    index.lookup('rinoh.templates')
+    assert len(scans) == 2
+
+
+def test_resource_index_cache_file(tmp_path, monkeypatch):
+    cache_path = tmp_path / 'resource_index.pickle'
+    index = ResourceIndex(cache_path)
+    templates = [ep.name for ep, _ in index.lookup('rinoh.templates')]
+    assert cache_path.exists()
+
+    other_index = ResourceIndex(cache_path)
+    monkeypatch.setattr(other_index, '_scan', None)     # must not be called
+    assert [ep.name for ep, _
+            in other_index.lookup('rinoh.templates')] == templates
+
+
+def test_find_entry_points_includes_dynamic():
+    register_template('indexed_template', MyTemplate)
+    (entry_point, dist), = find_entry_points('rinoh.templates',
+                                             'Indexed_Template')
+    assert entry_point.load() is MyTemplate
+    assert dist.name == 'rinoh-dynamic'
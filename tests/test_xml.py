@@ -0,0 +1,131 @@
+# This file is part of rinohtype, the Python document preparation system.
+#
+# Copyright (c) Brecht Machiels.
+#
+# Use of this source code is subject to the terms of the GNU Affero General
+# Public License v3. See the LICENSE file or http://www.gnu.org/licenses/.
+
+
+import gc
+
+from io import BytesIO
+
+import pytest
+
+from rinoh.frontend.docbook import DocBookNode, DocBookReader
+from rinoh.frontend.xml import elementtree
+from xml.etree.ElementTree import ParseError
+
+
+DOCBOOK = b"""<?xml version="1.0" encoding="utf-8"?>
+<article xmlns="http://docbook.org/ns/docbook" version="5.0">
+  <title>Title</title><!-- comments are not part of the tree -->
+  <section xml:id="intro">
+    <title>Introduction</title>
+    <para>Some <emphasis>emphasized</emphasis> text.</para>
+  </section>
+</article>
+"""
+
+NS = '{http://docbook.org/ns/docbook}'
+
+
+def parsers():
+    yield elementtree.Parser
+    try:
+        from rinoh.frontend.xml import lxml
+    except ImportError:
+        return
+    yield lxml.Parser
+
+
+@pytest.fixture(params=list(parsers()),
+                ids=lambda parser: parser.__module__.rsplit('.', 1)[-1])
+def parser(request):
+    return request.param()
+
+
+def test_parse_source_lines(parser):
+    document = parser.parse(BytesIO(DOCBOOK))
+    root = document.getroot()
+    assert root.tag == NS + 'article'
+    section = root.find(NS + 'section')
+    para = section.find(NS + 'para')
+    emphasis = para.find(NS + 'emphasis')
+    assert document.sourceline(root) == 2
+    assert document.sourceline(section) == 4
+    assert document.sourceline(emphasis) == 6
+    assert emphasis.text == 'emphasized'
+    assert emphasis.tail == ' text.'
+    assert section.get('{http://www.w3.org/XML/1998/namespace}id') == 'intro'
+
+
+def test_parse_parents(parser):
+    document = parser.parse(BytesIO(DOCBOOK))
+    root = document.getroot()
+    section = root.find(NS + 'section')
+    para = section.find(NS + 'para')
+    assert document.parent(root) is None
+    assert document.parent(section) is root
+    assert document.parent(para) is section
+
+
+def test_parse_filename(tmp_path, parser):
+    path = tmp_path / 'article.xml'
+    path.write_bytes(DOCBOOK)
+    document = parser.parse(str(path), root_directory=str(tmp_path))
+    assert document.filename == 'article.xml'
+    assert document.abs_filename == str(path)
+
+
+def test_iterparse(parser):
+    elements = []
+    for document, element in parser.iterparse(BytesIO(DOCBOOK)):
+        assert document.parent(element) is document.getroot()
+        assert [child for child in document.getroot()][0] is element
+        elements.append((element, element.tag, document.sourceline(element)))
+    assert [(tag, line) for _, tag, line in elements] == [(NS + 'title', 3),
+                                                          (NS + 'section', 4)]
+    section = elements[1][0]
+    assert len(section) == 0        # released
+    assert document.sourceline(section) == 4
+    assert len(document.getroot()) == 0
+
+
+def test_iterparse_releases_side_tables():
+    sections = b''.join(b'<section><para>Text <emphasis>%d</emphasis></para>'
+                        b'</section>' % index for index in range(100))
+    xml = b'<article>' + sections + b'</article>'
+    for document, element in elementtree.Parser().iterparse(BytesIO(xml)):
+        last = element
+    del element
+    gc.collect()
+    assert len(document.getroot()) == 0
+    assert set(document._source_lines) == {document.getroot(), last}
+    assert not document._parents
+
+
+def test_parse_error():
+    with pytest.raises(ParseError):
+        elementtree.Parser().parse(BytesIO(b'<article><title></article>'))
+
+
+def test_mapped_node_location():
+    document = elementtree.Parser().parse(BytesIO(DOCBOOK))
+    article = DocBookNode.map_node(document.getroot(), document=document)
+    section = article.section
+    para = section.para
+    assert para.location == (None, 6, 'para')
+    assert para.parent.tag_name == 'section'
+    assert para.parent.parent.tag_name == 'article'
+    assert para.parent.parent.parent is None
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_docbook_reader(tmp_path, streaming):
+    path = tmp_path / 'article.xml'
+    path.write_bytes(DOCBOOK)
+    flowables = DocBookReader(streaming=streaming).parse(str(path))
+    assert [type(flowable).__name__ for flowable in flowables] \
+        == ['SetMetadataFlowable', 'Section']
+    assert flowables[1].source.location[1:] == (4, 'section')